@@ -0,0 +1,57 @@
+"""posts search index
+
+Revision ID: 7c1e4a9b2d30
+Revises: 1391622df628
+Create Date: 2026-10-17 10:12:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4a9b2d30'
+down_revision: Union[str, None] = '1391622df628'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # array_to_string 은 IMMUTABLE 이 아니라서 인덱스/생성 컬럼에 바로 못 씀 → IMMUTABLE 함수로 감싸줌
+    op.execute("""
+        CREATE OR REPLACE FUNCTION posts_search_text(title text, description text, file_paths text[])
+        RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$
+            SELECT coalesce(title, '') || ' ' || coalesce(description, '') || ' ' || coalesce(array_to_string(file_paths, ' '), '')
+        $$
+    """)
+
+    # 단어 검색용 tsvector (한국어 형태소 사전이 없으므로 'simple' 사전 사용)
+    op.add_column('posts', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('simple'::regconfig, posts_search_text(title, description, file_paths))", persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_posts_search_vector', 'posts', ['search_vector'], postgresql_using='gin')
+
+    # 부분 문자열(한글 제목, 파일명) 검색용 trigram 인덱스 → ILIKE '%검색어%' 를 인덱스로 처리
+    op.execute("""
+        CREATE INDEX ix_posts_search_text_trgm ON posts
+        USING gin (posts_search_text(title, description, file_paths) gin_trgm_ops)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_search_text_trgm', table_name='posts')
+    op.drop_index('ix_posts_search_vector', table_name='posts')
+    op.drop_column('posts', 'search_vector')
+    op.execute('DROP FUNCTION IF EXISTS posts_search_text(text, text, text[])')
@@ -0,0 +1,46 @@
+"""hot query indexes
+
+Revision ID: 9d4f2b6e8a11
+Revises: 7c1e4a9b2d30
+Create Date: 2026-10-17 14:03:27.520418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f2b6e8a11'
+down_revision: Union[str, None] = '7c1e4a9b2d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (인덱스 이름, 테이블, 컬럼) - 목록/keyset 페이지 쿼리의 WHERE + ORDER BY (created_at DESC, id DESC) 모양에 맞춤
+INDEXES = [
+    ('ix_posts_created_at_id', 'posts', [sa.text('created_at DESC'), sa.text('id DESC')]),
+    ('ix_posts_creator_id_created_at_id', 'posts', ['creator_id', 'created_at', 'id']),
+    ('ix_posts_type_category_id_created_at_id', 'posts', ['type_category_id', 'created_at', 'id']),
+    ('ix_posts_region_category_id_created_at_id', 'posts', ['region_category_id', 'created_at', 'id']),
+    ('ix_replies_post_id_created_at_id', 'replies', ['post_id', 'created_at', 'id']),
+    ('ix_progress_detail_roro_progress_id', 'progress_detail_roro', ['progress_id']),
+    ('ix_progress_detail_roro_detail_progress_detail_roro_id', 'progress_detail_roro_detail', ['progress_detail_roro_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY 는 트랜잭션 안에서 실행할 수 없으므로 autocommit 으로 (운영 중에도 쓰기 잠금 없이 생성)
+    # 중간에 실패하면 INVALID 인덱스가 남으므로 DROP INDEX 후 다시 upgrade
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
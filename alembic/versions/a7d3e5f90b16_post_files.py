@@ -0,0 +1,155 @@
+"""post files table
+
+Revision ID: a7d3e5f90b16
+Revises: f1a6c3e8d924
+Create Date: 2026-10-17 20:31:08.664512
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e5f90b16'
+down_revision: Union[str, None] = 'f1a6c3e8d924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# posts.file_paths(ARRAY) → post_files 테이블 (파일 하나당 한 행, 크기/MIME/sha256 같은 메타데이터 포함)
+# 검색은 제목/설명은 posts 의 생성 컬럼/trigram 인덱스로, 파일명은 post_files.original_name 의 trigram 인덱스로
+# 기존 파일의 size/content_type/sha256 은 디스크를 읽어야 하므로 backfill_post_files.py 로 채움
+#
+# 저장 경로(stored_key)는 한 행만 가질 수 있음 (게시글을 지우면 그 경로를 지우므로 - posts_storage.release)
+# 예전 file_paths 에는 같은 경로가 한 글 안에서 반복되거나, keep_file_paths 로 다른 글의 경로가 들어간 경우가 있음
+# → 경로마다 처음 나온 행(가장 먼저 만든 글, 그 글 안의 첫 위치)만 옮기고, 빠진 행은 로그로 남김
+
+log = logging.getLogger('alembic.runtime.migration')
+
+# paths = 예전 배열의 모든 행, kept = 경로마다 첫 행
+_LEGACY_PATHS = """
+    WITH paths AS (
+        SELECT p.id AS post_id, f.ordinality, f.path, p.created_at
+        FROM posts p
+        CROSS JOIN LATERAL unnest(p.file_paths) WITH ORDINALITY AS f(path, ordinality)
+        WHERE f.path IS NOT NULL AND f.path <> ''
+    ),
+    kept AS (
+        SELECT DISTINCT ON (path) * FROM paths
+        ORDER BY path, post_id, ordinality
+    )
+"""
+
+
+def _create_search(columns: str):
+    # 7c1e4a9b2d30 과 같은 구성 - posts_search_text 인자만 다름
+    op.add_column('posts', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(f"to_tsvector('simple'::regconfig, posts_search_text({columns}))", persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_posts_search_vector', 'posts', ['search_vector'], postgresql_using='gin')
+    op.execute(f"""
+        CREATE INDEX ix_posts_search_text_trgm ON posts
+        USING gin (posts_search_text({columns}) gin_trgm_ops)
+    """)
+
+
+def _drop_search():
+    op.drop_index('ix_posts_search_text_trgm', table_name='posts')
+    op.drop_index('ix_posts_search_vector', table_name='posts')
+    op.drop_column('posts', 'search_vector')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'post_files',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('post_id', sa.Integer(), sa.ForeignKey('posts.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('ordinal', sa.Integer(), nullable=False),
+        sa.Column('original_name', sa.String(255), nullable=False),
+        sa.Column('stored_key', sa.String(500), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=True),
+        sa.Column('content_type', sa.String(255), nullable=True),
+        sa.Column('sha256', sa.String(64), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    )
+
+    # 기존 배열 → 행 (순서 유지, 원래 파일명은 저장 경로의 "public/{uuid}_" 를 뗀 부분)
+    # 중복 경로는 DISTINCT ON 으로 첫 행만, ordinal 은 남은 파일끼리 0 부터 다시 매김
+    dropped = op.get_bind().execute(sa.text(_LEGACY_PATHS + """
+        SELECT paths.post_id, paths.path
+        FROM paths
+        LEFT JOIN kept ON kept.post_id = paths.post_id AND kept.ordinality = paths.ordinality
+        WHERE kept.post_id IS NULL
+        ORDER BY paths.post_id, paths.ordinality
+    """)).all()
+    for post_id, path in dropped:
+        log.warning('post_files: post %s 의 중복 경로는 옮기지 않음: %s', post_id, path)
+    if dropped:
+        log.warning('post_files: 중복 경로 %d 개를 건너뜀', len(dropped))
+
+    op.execute(_LEGACY_PATHS + r"""
+        INSERT INTO post_files (post_id, ordinal, original_name, stored_key, created_at)
+        SELECT post_id,
+               row_number() OVER (PARTITION BY post_id ORDER BY ordinality) - 1,
+               left(regexp_replace(path, '^.*/([0-9a-fA-F-]{36}_)?', ''), 255),
+               path, created_at
+        FROM kept
+    """)
+
+    # 인덱스는 데이터를 옮긴 뒤에 (중복을 정리한 상태에서 unique 인덱스 생성, 한 번에 빌드해서 더 빠름)
+    op.create_index('ux_post_files_post_id_ordinal', 'post_files', ['post_id', 'ordinal'], unique=True)
+    op.create_index('ux_post_files_stored_key', 'post_files', ['stored_key'], unique=True)
+    op.create_index(
+        'ix_post_files_original_name_trgm', 'post_files', ['original_name'],
+        postgresql_using='gin', postgresql_ops={'original_name': 'gin_trgm_ops'},
+    )
+
+    # 검색 텍스트에서 file_paths 제거 (생성 컬럼이 참조하므로 검색 컬럼/인덱스를 먼저 지우고 다시 만듦)
+    _drop_search()
+    op.execute('DROP FUNCTION IF EXISTS posts_search_text(text, text, text[])')
+    op.execute("""
+        CREATE OR REPLACE FUNCTION posts_search_text(title text, description text)
+        RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$
+            SELECT coalesce(title, '') || ' ' || coalesce(description, '')
+        $$
+    """)
+    _create_search('title, description')
+
+    op.drop_column('posts', 'file_paths')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('posts', sa.Column('file_paths', postgresql.ARRAY(sa.String()), nullable=True))
+    op.execute("""
+        UPDATE posts p SET file_paths = f.paths
+        FROM (
+            SELECT post_id, array_agg(stored_key ORDER BY ordinal) AS paths
+            FROM post_files GROUP BY post_id
+        ) f
+        WHERE f.post_id = p.id
+    """)
+
+    _drop_search()
+    op.execute('DROP FUNCTION IF EXISTS posts_search_text(text, text)')
+    op.execute("""
+        CREATE OR REPLACE FUNCTION posts_search_text(title text, description text, file_paths text[])
+        RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$
+            SELECT coalesce(title, '') || ' ' || coalesce(description, '') || ' ' || coalesce(array_to_string(file_paths, ' '), '')
+        $$
+    """)
+    _create_search('title, description, file_paths')
+
+    op.drop_table('post_files')
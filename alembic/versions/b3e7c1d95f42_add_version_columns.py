@@ -0,0 +1,34 @@
+"""add version columns
+
+Revision ID: b3e7c1d95f42
+Revises: 9d4f2b6e8a11
+Create Date: 2026-10-17 16:41:09.374120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e7c1d95f42'
+down_revision: Union[str, None] = '9d4f2b6e8a11'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ['posts', 'progress', 'progress_detail_roro']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 상수 DEFAULT 라서 테이블을 다시 쓰지 않음 (기존 행은 모두 version 1)
+    for table in TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_column(table, 'version')
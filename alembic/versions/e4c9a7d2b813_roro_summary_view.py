@@ -0,0 +1,52 @@
+"""roro summary materialized view
+
+Revision ID: e4c9a7d2b813
+Revises: b3e7c1d95f42
+Create Date: 2026-10-17 18:12:45.903217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c9a7d2b813'
+down_revision: Union[str, None] = 'b3e7c1d95f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 대시보드용 RoRo 집계 (도착지/파트너/화주/ETD 월 별 수량, CBM, 매출, 이익)
+# 비어 있는 키는 '' 로 바꿔서 저장 (NULL 이 섞이면 unique 인덱스로 행을 구분할 수 없어 CONCURRENTLY 갱신이 안됨)
+# 갱신은 앱의 스케줄러가 REFRESH MATERIALIZED VIEW CONCURRENTLY 로 (app/reports/reports_refresh.py)
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE MATERIALIZED VIEW roro_summary AS
+        SELECT
+            COALESCE("DESTINATION", '') AS destination,
+            COALESCE("PARTNER", '') AS partner,
+            COALESCE("SHIPPER", '') AS shipper,
+            COALESCE(to_char("ETD", 'YYYY-MM'), '') AS month,
+            count(*) AS bookings,
+            COALESCE(sum("SMALL"), 0) AS small,
+            COALESCE(sum("S_SUV"), 0) AS s_suv,
+            COALESCE(sum("SUV"), 0) AS suv,
+            COALESCE(sum("RV_CARGO"), 0) AS rv_cargo,
+            COALESCE(sum("SPECIAL"), 0) AS special,
+            COALESCE(sum("CBM"), 0) AS cbm,
+            COALESCE(sum("SELL"), 0) AS sell,
+            COALESCE(sum("PROFIT_USD"), 0) AS profit_usd,
+            COALESCE(sum("PROFIT_KRW"), 0) AS profit_krw
+        FROM progress_detail_roro
+        GROUP BY 1, 2, 3, 4
+        WITH DATA
+    """)
+    op.create_index('ux_roro_summary_key', 'roro_summary', ['destination', 'partner', 'shipper', 'month'], unique=True)
+    op.create_index('ix_roro_summary_month', 'roro_summary', ['month'])  # 기간 조회용
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS roro_summary')
@@ -0,0 +1,53 @@
+"""roro ledger indexes
+
+Revision ID: f1a6c3e8d924
+Revises: e4c9a7d2b813
+Create Date: 2026-10-17 19:05:51.226730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6c3e8d924'
+down_revision: Union[str, None] = 'e4c9a7d2b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (인덱스 이름, 컬럼, USING) - 전체 부킹 장부(GET /api/roro) 의 정렬(keyset)과 필터 모양에 맞춤
+INDEXES = [
+    ('ix_progress_detail_roro_created_at_id', [sa.text('created_at DESC'), sa.text('id DESC')], None),
+    ('ix_progress_detail_roro_etd_id', [sa.text('"ETD" DESC'), sa.text('id DESC')], None),
+    ('ix_progress_detail_roro_eta', ['ETA'], None),
+    ('ix_progress_detail_roro_atd', ['ATD'], None),
+    # 거래처/화주/도착지/결제 + 출항일 범위 (예: 다음 주 출항하는 파트너 X 부킹)
+    ('ix_progress_detail_roro_partner_etd', ['PARTNER', 'ETD'], None),
+    ('ix_progress_detail_roro_shipper_etd', ['SHIPPER', 'ETD'], None),
+    ('ix_progress_detail_roro_destination_etd', ['DESTINATION', 'ETD'], None),
+    ('ix_progress_detail_roro_payment_etd', ['PAYMENT', 'ETD'], None),
+    # 배열 포함 여부 (LINE @> ARRAY['...'])
+    ('ix_progress_detail_roro_line', ['LINE'], 'gin'),
+    ('ix_progress_detail_roro_vessel', ['VESSEL'], 'gin'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 운영 중에도 쓰기 잠금 없이 생성 (9d4f2b6e8a11 과 같은 방식)
+    with op.get_context().autocommit_block():
+        for name, columns, using in INDEXES:
+            op.create_index(
+                name, 'progress_detail_roro', columns,
+                postgresql_using=using, postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='progress_detail_roro', postgresql_concurrently=True, if_exists=True)
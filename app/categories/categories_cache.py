@@ -0,0 +1,125 @@
+# app/categories/categories_cache.py
+# 타입/지역 카테고리 프로세스 내 캐시
+# 카테고리는 몇 개 안 되고 거의 바뀌지 않기 때문에 매 요청마다 DB 를 조회하지 않고 메모리에 들고 있음
+# - 서버 시작 시 warm() 으로 미리 적재
+# - 카테고리 생성/삭제 서비스에서 invalidate() 호출 → 다음 조회 때 다시 적재
+# - 워커(프로세스)가 여러 개면 다른 워커의 변경은 알 수 없으므로 TTL 이 지나면 다시 적재, 모르는 id 가 나와도 다시 적재
+
+import asyncio
+import os
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.categories.region_categories import region_categories_models
+from app.categories.type_categories import type_categories_models
+from app.users import users_models
+
+load_dotenv()
+
+CATEGORY_CACHE_TTL_SECONDS = float(os.getenv('CATEGORY_CACHE_TTL_SECONDS', '300'))  # 다른 워커의 변경을 반영하는 최대 지연
+
+
+class CachedUser:
+    __slots__ = ('id', 'username', 'email', 'role')  # 인스턴스마다 __dict__ 를 만들지 않음 (메모리 절약)
+
+    def __init__(self, id: int, username: str, email: str, role: str):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.role = role
+
+
+class CachedCategory:
+    __slots__ = ('id', 'title', 'creator_id', 'creator', 'out')
+
+    def __init__(self, id: int, title: str, creator_id: int | None, creator: CachedUser | None):
+        self.id = id
+        self.title = title
+        self.creator_id = creator_id
+        self.creator = creator
+        # CategoryOut 모양의 응답 dict 를 적재할 때 한 번만 만들어 두고 모든 응답에서 재사용
+        self.out = {
+            'id': id,
+            'title': title,
+            'creator': None if creator is None else {
+                'id': creator.id,
+                'username': creator.username,
+                'email': creator.email,
+                'role': creator.role,
+            },
+        }
+
+
+class CategoryCache:
+
+    def __init__(self, model):
+        self._model = model
+        self._items: dict[int, CachedCategory] = {}
+        self._loaded_at: float | None = None  # None 이면 아직 적재 안 됨(또는 무효화됨)
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < CATEGORY_CACHE_TTL_SECONDS
+
+    async def load(self, db: AsyncSession):
+        # 카테고리 + 작성자를 JOIN 한 번으로 가져옴
+        creator = aliased(users_models.User)
+        result = await db.execute(
+            select(
+                self._model.id,
+                self._model.title,
+                self._model.creator_id,
+                creator.username,
+                creator.email,
+                creator.role,
+            )
+            .outerjoin(creator, self._model.creator_id == creator.id)
+            .order_by(self._model.id)
+        )
+        items = {}
+        for id, title, creator_id, username, email, role in result.all():
+            cached_creator = CachedUser(creator_id, username, email, role) if username is not None else None
+            items[id] = CachedCategory(id, title, creator_id, cached_creator)
+        self._items = items  # 통째로 교체 (읽는 쪽은 항상 완성된 dict 만 봄)
+        self._loaded_at = time.monotonic()
+
+    async def _ensure_loaded(self, db: AsyncSession, force: bool = False):
+        if not force and self._is_fresh():
+            return
+        async with self._lock:  # 동시에 여러 요청이 와도 한 번만 적재
+            if not force and self._is_fresh():
+                return
+            await self.load(db)
+
+    async def all(self, db: AsyncSession) -> list[CachedCategory]:
+        await self._ensure_loaded(db)
+        return list(self._items.values())
+
+    async def get_many(self, db: AsyncSession, ids) -> dict[int, CachedCategory]:
+        await self._ensure_loaded(db)
+        missing = {i for i in ids if i is not None and i not in self._items}
+        if missing:  # 다른 워커에서 새로 만든 카테고리일 수 있으므로 한 번 다시 적재
+            await self._ensure_loaded(db, force=True)
+        return self._items
+
+    async def get(self, db: AsyncSession, id: int | None) -> CachedCategory | None:
+        if id is None:
+            return None
+        return (await self.get_many(db, [id])).get(id)
+
+
+type_categories = CategoryCache(type_categories_models.TypeCategory)
+region_categories = CategoryCache(region_categories_models.RegionCategory)
+
+
+async def warm(db: AsyncSession):
+    # 서버 시작 시 호출 (main.py lifespan)
+    await type_categories.load(db)
+    await region_categories.load(db)
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
+from app import db_routing
 from app.database import get_db
 
 from app.categories.region_categories import region_categories_schemas
@@ -20,10 +21,15 @@ router = APIRouter(
 def get_services(db:AsyncSession =Depends(get_db)) -> RegionCategoriesServices:
     return RegionCategoriesServices(db)
 
+
+# 조회 전용 - 읽기 복제본 세션 (복제본이 없거나 지연되면 primary, app/db_routing.py 참고)
+def get_read_services(db: AsyncSession = Depends(db_routing.get_read_db)) -> RegionCategoriesServices:
+    return RegionCategoriesServices(db)
+
 @router.get('/region', response_model=List[region_categories_schemas.CategoryOut], status_code=200)
 async def list_region_categories(
         _: users_models.User = Depends(dependencies.user_only),
-        service:RegionCategoriesServices=Depends(get_services)
+        service:RegionCategoriesServices=Depends(get_read_services)
 ):
     return await service.list_region_categories(
 
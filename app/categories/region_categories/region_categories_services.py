@@ -1,12 +1,12 @@
 # app/categories/region_categories/region_categories_services.py
 
-from fastapi import Depends, HTTPException
+from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlalchemy import select, delete
 
 from app.categories.region_categories import region_categories_models
 from app.categories.region_categories import region_categories_schemas
+from app import db_writes  # INSERT ... RETURNING 공통 경로
+from app.categories import categories_cache
 from app.users import users_models
 
 
@@ -23,52 +23,41 @@ class RegionCategoriesServices:
     async def list_region_categories(
             self,
     ):
-        base_query = select(region_categories_models.RegionCategory)
-        base_query = base_query.options(
-            selectinload(region_categories_models.RegionCategory.creator),
-        )
-
-        result = await self.db.execute(base_query)
-        region_categories = result.scalars().all()
-        return region_categories
+        # DB 대신 프로세스 내 캐시에서 반환 (categories_cache 참고)
+        return await categories_cache.region_categories.all(self.db)
 
     async def create_region_categories(
             self,
             payload: region_categories_schemas.CategoryCreate,
             current_user: users_models.User,
     ):
-        # Pydantic 객체를 unpack해서 모델 인스턴스 생성
-        new_region_category = region_categories_models.RegionCategory(
-            **payload.model_dump(),
-            creator_id=current_user.id
+        # INSERT ... RETURNING 한 문장으로 저장 (작성자는 요청한 사용자이므로 다시 조회하지 않음)
+        row = await db_writes.insert_returning(
+            self.db,
+            region_categories_models.RegionCategory,
+            {**payload.model_dump(), 'creator_id': current_user.id},
+            [region_categories_models.RegionCategory.id, region_categories_models.RegionCategory.title],
         )
-
-        self.db.add(new_region_category)
         await self.db.commit()
-        result = await self.db.execute(
-            select(region_categories_models.RegionCategory)
-            .options(
-                selectinload(region_categories_models.RegionCategory.creator),  # 작성자 정보  # 지역 관계
-            ).where(region_categories_models.RegionCategory.id==new_region_category.id)
-        )
-        region_category_relations = result.scalar_one()
+        categories_cache.region_categories.invalidate()  # 캐시 무효화 → 다음 조회 때 다시 적재
 
-        return region_category_relations  # JSON 직렬화 -> 응답
+        return {'id': row.id, 'title': row.title, 'creator': db_writes.user_out(current_user)}  # JSON 직렬화 -> 응답
 
     async def delete_region_categories(
             self,
             region_category_id: int,
             current_user: users_models.User,
     ):
-        region_category_id = await self.db.get(region_categories_models.RegionCategory, region_category_id)
-
-        if not region_category_id:
-            raise HTTPException(status_code=404, detail=ERROR_NOT_FOUND)
-
-        if region_category_id.creator_id != current_user.id:
-            raise HTTPException(status_code=403, detail=ERROR_FORBIDDEN)
-        await self.db.execute(
-            delete(region_categories_models.RegionCategory)
-            .where(region_categories_models.RegionCategory.id == region_category_id)
+        # 조회(get) 없이 DELETE ... WHERE id = ? AND creator_id = ? 한 문장으로 (0행이면 404/403 구분)
+        await db_writes.execute_owned(
+            self.db,
+            db_writes.owned_delete(region_categories_models.RegionCategory, region_category_id, current_user.id)
+            .returning(region_categories_models.RegionCategory.id),
+            region_categories_models.RegionCategory,
+            region_category_id,
+            current_user.id,
+            ERROR_NOT_FOUND,
+            ERROR_FORBIDDEN,
         )
         await self.db.commit()
+        categories_cache.region_categories.invalidate()  # 캐시 무효화 → 다음 조회 때 다시 적재
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
+from app import db_routing
 from app.database import get_db
 from app.categories.type_categories import type_categories_schemas, type_categories_models
 from app.categories.type_categories.type_categories_services import TypeCategoriesServices
@@ -20,10 +21,15 @@ def get_services(db:AsyncSession =Depends(get_db)) -> TypeCategoriesServices:
     return TypeCategoriesServices(db)
 
 
+# 조회 전용 - 읽기 복제본 세션 (복제본이 없거나 지연되면 primary, app/db_routing.py 참고)
+def get_read_services(db: AsyncSession = Depends(db_routing.get_read_db)) -> TypeCategoriesServices:
+    return TypeCategoriesServices(db)
+
+
 @router.get('/type', response_model=List[type_categories_schemas.CategoryOut], status_code=200)
 async def list_type_categories(
         _: users_models.User = Depends(dependencies.user_only),
-        service:TypeCategoriesServices=Depends(get_services)
+        service:TypeCategoriesServices=Depends(get_read_services)
 ):
     return await service.list_type_categories(
     )
@@ -1,13 +1,13 @@
 # app/categories/type_categories/type_categories_services.py
 
-from fastapi import  Depends, HTTPException
+from fastapi import  Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
-from sqlalchemy.orm import selectinload
 
 
 
 from app.categories.type_categories import type_categories_schemas, type_categories_models
+from app import db_writes  # INSERT ... RETURNING 공통 경로
+from app.categories import categories_cache
 from app.users import users_models
 
 
@@ -25,50 +25,43 @@ class TypeCategoriesServices:
     async def list_type_categories(
             self,
     ):
-        base_query = (
-            select(type_categories_models.TypeCategory)
-            .options(selectinload(type_categories_models.TypeCategory.creator),
-        ))
-        result = await self.db.execute(base_query)
-        type_categories = result.scalars().all()
-        return type_categories
+        # DB 대신 프로세스 내 캐시에서 반환 (categories_cache 참고)
+        return await categories_cache.type_categories.all(self.db)
 
     async def create_type_categories(
             self,
             payload: type_categories_schemas.CategoryCreate,
             current_user: users_models.User,
     ):
-        # Pydantic 객체를 unpack해서 모델 인스턴스 생성
-        new_type_category = type_categories_models.TypeCategory(**payload.model_dump(), creator_id=current_user.id)
-
-        self.db.add(new_type_category)
-        await self.db.commit()
-        result = await self.db.execute(
-            select(type_categories_models.TypeCategory)
-            .options(
-                selectinload(type_categories_models.TypeCategory.creator),  # 작성자 정보  # 지역 관계
-            ).where(type_categories_models.TypeCategory.id == new_type_category.id)
+        # INSERT ... RETURNING 한 문장으로 저장 (작성자는 요청한 사용자이므로 다시 조회하지 않음)
+        row = await db_writes.insert_returning(
+            self.db,
+            type_categories_models.TypeCategory,
+            {**payload.model_dump(), 'creator_id': current_user.id},
+            [type_categories_models.TypeCategory.id, type_categories_models.TypeCategory.title],
         )
-        type_category_relations = result.scalar_one()
+        await self.db.commit()
+        categories_cache.type_categories.invalidate()  # 캐시 무효화 → 다음 조회 때 다시 적재
 
-        return type_category_relations  # JSON 직렬화 -> 응답
+        return {'id': row.id, 'title': row.title, 'creator': db_writes.user_out(current_user)}  # JSON 직렬화 -> 응답
 
     async def delete_type_categories(
             self,
             type_category_id: int,
             current_user: users_models.User,
     ):
-        type_category = await self.db.get(type_categories_models.TypeCategory, type_category_id)
-
-        if not type_category:
-            raise HTTPException(status_code=404,detail=ERROR_NOT_FOUND)
-
-        if type_category.creator_id != current_user.id:
-            raise HTTPException(status_code=403, detail=ERROR_FORBIDDEN)
-        await self.db.execute(
-            delete(type_categories_models.TypeCategory)
-            .where(type_categories_models.TypeCategory.id == type_category_id)
+        # 조회(get) 없이 DELETE ... WHERE id = ? AND creator_id = ? 한 문장으로 (0행이면 404/403 구분)
+        await db_writes.execute_owned(
+            self.db,
+            db_writes.owned_delete(type_categories_models.TypeCategory, type_category_id, current_user.id)
+            .returning(type_categories_models.TypeCategory.id),
+            type_categories_models.TypeCategory,
+            type_category_id,
+            current_user.id,
+            ERROR_NOT_FOUND,
+            ERROR_FORBIDDEN,
         )
         await self.db.commit()
+        categories_cache.type_categories.invalidate()  # 캐시 무효화 → 다음 조회 때 다시 적재
 
 
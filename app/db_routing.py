@@ -0,0 +1,121 @@
+# app/db_routing.py
+# 조회(GET) 요청을 읽기 전용 복제본으로 보내는 라우팅
+# - get_read_db: 복제본 세션을 주는 의존성 (복제본이 없거나, 지연(lag)이 크거나, 죽었으면 primary 로)
+# - read-your-writes: 쓰기 요청이 성공하면 쿠키로 잠시 동안 그 클라이언트의 조회를 primary 로 고정
+#   (방금 저장한 글이 목록에 안 보이는 문제 방지), 헤더 X-Read-Primary: 1 로도 강제 가능
+#   DB 를 바꾸지 않는 POST(what-if 분석 등)는 dependencies=[Depends(db_routing.read_only)] 로 고정하지 않음
+#
+# 로컬 테스트: Postgres 두 대(primary + streaming replica)를 띄우고
+# DATABASE_URL / DATABASE_REPLICA_URL 을 각각 지정, 복제본을 멈추면 자동으로 primary 로 조회됨
+
+import asyncio
+import logging
+import os
+import time
+
+from dotenv import load_dotenv
+from fastapi import Request
+from sqlalchemy import text
+
+from app import database
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+READ_PRIMARY_COOKIE = 'db_primary_until'
+READ_PRIMARY_HEADER = 'x-read-primary'
+READ_YOUR_WRITES_SECONDS = int(os.getenv('DATABASE_READ_YOUR_WRITES_SECONDS', '5'))  # 쓰기 후 primary 고정 시간
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('DATABASE_REPLICA_MAX_LAG_SECONDS', '5'))  # 이보다 늦으면 primary 로
+REPLICA_CHECK_INTERVAL_SECONDS = float(os.getenv('DATABASE_REPLICA_CHECK_INTERVAL_SECONDS', '2'))  # 상태 확인 주기
+REPLICA_CHECK_TIMEOUT_SECONDS = float(os.getenv('DATABASE_REPLICA_CHECK_TIMEOUT_SECONDS', '1'))
+
+# 복제본이 WAL 을 다 따라잡았으면 0, 아니면 마지막 재생 시각과의 차이(초)
+# (쓰기가 없어서 재생할 게 없을 때 지연으로 잘못 계산되지 않도록 LSN 비교를 먼저 함)
+_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaHealth:
+
+    def __init__(self):
+        self.usable = False
+        self.lag_seconds: float | None = None
+        self._checked_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def _check(self):
+        try:
+            async with database.replica_engine.connect() as conn:
+                lag = await asyncio.wait_for(conn.scalar(_LAG_QUERY), REPLICA_CHECK_TIMEOUT_SECONDS)
+            self.lag_seconds = float(lag or 0)
+            self.usable = self.lag_seconds <= REPLICA_MAX_LAG_SECONDS
+            if not self.usable:
+                logger.warning('replica lag %.1fs > %.1fs, primary 로 조회', self.lag_seconds, REPLICA_MAX_LAG_SECONDS)
+        except Exception:
+            logger.warning('replica 상태 확인 실패, primary 로 조회', exc_info=True)
+            self.lag_seconds = None
+            self.usable = False
+        self._checked_at = time.monotonic()
+
+    async def is_usable(self) -> bool:
+        if database.replica_engine is None:
+            return False
+        if self._checked_at is None or time.monotonic() - self._checked_at >= REPLICA_CHECK_INTERVAL_SECONDS:
+            async with self._lock:  # 동시에 여러 요청이 와도 확인은 한 번만
+                if self._checked_at is None or time.monotonic() - self._checked_at >= REPLICA_CHECK_INTERVAL_SECONDS:
+                    await self._check()
+        return self.usable
+
+
+replica_health = ReplicaHealth()
+
+
+def _pinned_to_primary(request: Request) -> bool:
+    if request.headers.get(READ_PRIMARY_HEADER) == '1':
+        return True
+    until = request.cookies.get(READ_PRIMARY_COOKIE)
+    try:
+        return until is not None and float(until) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request):
+    # 조회 전용 의존성 - 쓰기 서비스에는 반드시 database.get_db 를 사용
+    if not _pinned_to_primary(request) and await replica_health.is_usable():
+        async with database.ReplicaSessionLocal() as session:
+            yield session
+    else:
+        async with database.AsyncSessionLocal() as session:
+            yield session
+
+
+def read_only(request: Request):
+    # 라우터 의존성 - 본문 때문에 POST 지만 DB 는 바꾸지 않는 요청 (성공해도 primary 로 고정하지 않음)
+    # request.state 는 scope 에 저장되므로 미들웨어에서도 보임
+    request.state.db_read_only = True
+
+
+async def read_your_writes_middleware(request: Request, call_next):
+    response = await call_next(request)
+    # 쓰기(POST/PUT/PATCH/DELETE)가 성공하면 잠시 동안 이 클라이언트의 조회는 primary 에서
+    if (
+        database.replica_engine is not None
+        and request.method not in ('GET', 'HEAD', 'OPTIONS')
+        and not getattr(request.state, 'db_read_only', False)
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            key=READ_PRIMARY_COOKIE,
+            value=str(int(time.time()) + READ_YOUR_WRITES_SECONDS),
+            max_age=READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            samesite='lax',
+        )
+    return response
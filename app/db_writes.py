@@ -0,0 +1,113 @@
+# app/db_writes.py
+# 쓰기(INSERT/UPDATE) 공통 경로
+# 저장 후 selectinload 로 다시 조회하지 않고 INSERT/UPDATE ... RETURNING 한 문장으로 저장된 행을 돌려받음
+# - 작성자(creator)는 요청한 사용자(current_user)로, 카테고리는 categories_cache 로 응답을 채움
+# - 수정/삭제는 "id + 작성자 (+ version)" 조건을 UPDATE/DELETE 문에 같이 넣어서 조회(get) 없이 권한까지 한 번에 확인
+#   (0행이면 그때만 조회해서 404/403/409 를 구분)
+#
+# 낙관적 동시성(optimistic concurrency) - version 컬럼이 있는 테이블 (posts, progress, progress_detail_roro)
+# - 조회/저장 응답에 ETag: "<version>" 헤더와 version 필드를 내려줌
+# - 수정/삭제 요청에 If-Match: "<version>" 헤더를 보내면 그 버전일 때만 반영, 그 사이 다른 사람이 수정했으면 409
+#   (헤더가 없거나 * 이면 버전 확인 없이 반영 - 기존 클라이언트 호환)
+# - 수정할 때마다 version = version + 1
+
+from fastapi import HTTPException, Response
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Delete, Update
+
+ERROR_CONFLICT = '다른 사용자가 먼저 수정했습니다. 새로고침 후 다시 시도해주세요.'
+ERROR_BAD_IF_MATCH = 'If-Match 헤더 형식이 올바르지 않습니다.'
+
+
+def returning_columns(model, exclude: tuple[str, ...] = ()) -> list:
+    # 테이블의 모든 컬럼 (검색용 tsvector 처럼 응답에 필요 없는 컬럼은 exclude 로 제외)
+    return [column for column in model.__table__.columns if column.key not in exclude]
+
+
+def user_out(user) -> dict | None:
+    # current_user(Principal) 또는 User 를 UserOut 모양의 dict 로
+    if user is None:
+        return None
+    return {'id': user.id, 'username': user.username, 'email': user.email, 'role': user.role}
+
+
+async def insert_returning(db: AsyncSession, model, values: dict, columns: list | None = None):
+    result = await db.execute(
+        insert(model).values(**values).returning(*(columns or returning_columns(model)))
+    )
+    return result.one()
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def set_etag(response: Response, out):
+    # 응답(dict 또는 ORM 객체)에 version 이 있으면 ETag 헤더로
+    version = out.get('version') if isinstance(out, dict) else getattr(out, 'version', None)
+    if version is not None:
+        response.headers['ETag'] = etag(version)
+
+
+def if_match_version(if_match: str | None) -> int | None:
+    # If-Match: "3" (또는 W/"3") → 3, 헤더가 없거나 * 이면 None (버전 확인 안함)
+    if if_match is None or if_match.strip() == '*':
+        return None
+    value = if_match.strip()
+    if value.startswith('W/'):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=ERROR_BAD_IF_MATCH)
+
+
+def _owned(statement, model, row_id: int, owner_id: int, version: int | None):
+    statement = statement.where(model.id == row_id, model.creator_id == owner_id)
+    if version is not None:
+        statement = statement.where(model.version == version)
+    # 세션에 올라온 ORM 객체가 없으므로 동기화(synchronize_session)는 생략
+    return statement.execution_options(synchronize_session=False)
+
+
+def owned_update(model, row_id: int, owner_id: int, version: int | None = None) -> Update:
+    # UPDATE ... SET version = version + 1 WHERE id = :row_id AND creator_id = :owner_id [AND version = :version]
+    statement = _owned(update(model), model, row_id, owner_id, version)
+    if hasattr(model, 'version'):
+        statement = statement.values(version=model.version + 1)
+    return statement
+
+
+def owned_delete(model, row_id: int, owner_id: int, version: int | None = None) -> Delete:
+    # DELETE ... WHERE id = :row_id AND creator_id = :owner_id [AND version = :version]
+    return _owned(delete(model), model, row_id, owner_id, version)
+
+
+async def raise_write_failed(db: AsyncSession, model, row_id: int, owner_id: int, not_found: str, forbidden: str):
+    # 조건부 UPDATE/DELETE 가 0행일 때만 호출 - 행이 없음(404) / 작성자가 아님(403) / 버전이 다름(409) 구분
+    columns = [model.creator_id] + ([model.version] if hasattr(model, 'version') else [])
+    current = (await db.execute(select(*columns).where(model.id == row_id))).first()
+    if current is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    if current.creator_id != owner_id:
+        raise HTTPException(status_code=403, detail=forbidden)
+    headers = {'ETag': etag(current.version)} if hasattr(model, 'version') else None
+    raise HTTPException(status_code=409, detail=ERROR_CONFLICT, headers=headers)  # 현재 버전을 ETag 로 알려줌
+
+
+async def execute_owned(
+        db: AsyncSession,
+        statement,
+        model,
+        row_id: int,
+        owner_id: int,
+        not_found: str,
+        forbidden: str,
+):
+    # owned_update/owned_delete(...).returning(...) 실행 → 반영된 행 반환 (0행이면 404/403/409)
+    row = (await db.execute(statement)).first()
+    if row is None:
+        await db.rollback()
+        await raise_write_failed(db, model, row_id, owner_id, not_found, forbidden)
+    return row
@@ -0,0 +1,107 @@
+# app/pagination.py
+# 커서(keyset) 페이지네이션 공용 유틸
+# (created_at, id) 를 클라이언트가 해석할 수 없는(opaque) 문자열로 인코딩/디코딩하고,
+# OFFSET 대신 "마지막으로 본 행 다음부터" 조회하도록 쿼리에 조건을 붙여줌
+
+import base64
+import json
+import math
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+ERROR_INVALID_CURSOR = '잘못된 cursor 값입니다.'
+
+
+def encode_cursor(created_at: datetime, row_id: int, direction: str = 'next') -> str:
+    # direction: 'next' = 이 행 이후(더 오래된 글), 'prev' = 이 행 이전(더 최신 글)
+    raw = json.dumps({'c': created_at.isoformat(), 'i': row_id, 'd': direction}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')  # URL 에 그대로 넣을 수 있게 패딩(=) 제거
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int, str]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)  # 제거했던 패딩 복원
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = data.get('d', 'next')
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return datetime.fromisoformat(data['c']), int(data['i']), direction
+    except (ValueError, KeyError, TypeError, AttributeError):  # base64/json/날짜 오류는 전부 ValueError 계열
+        raise HTTPException(status_code=400, detail=ERROR_INVALID_CURSOR)
+
+
+def apply_keyset(query, created_at_col, id_col, cursor: str | None, size: int):
+    # 최신순(created_at desc, id desc) 정렬 기준으로 cursor 다음 페이지 조건을 붙임
+    # (created_at, id) 튜플 비교라서 같은 시각에 생성된 글도 빠지거나 중복되지 않음
+    # size + 1 개를 가져와서 다음 페이지가 있는지 판단 (count 쿼리 없이)
+    direction = 'next'
+    if cursor:
+        created_at, row_id, direction = decode_cursor(cursor)
+        if direction == 'prev':
+            query = query.where(tuple_(created_at_col, id_col) > tuple_(created_at, row_id))
+        else:
+            query = query.where(tuple_(created_at_col, id_col) < tuple_(created_at, row_id))
+
+    if direction == 'prev':
+        # 이전 페이지는 반대로 정렬해서 가까운 것부터 가져온 뒤 keyset_page 에서 다시 뒤집음
+        query = query.order_by(created_at_col.asc(), id_col.asc())
+    else:
+        query = query.order_by(created_at_col.desc(), id_col.desc())
+
+    return query.limit(size + 1), direction
+
+
+def keyset_page(rows, size: int, direction: str, has_prev: bool, key):
+    # size + 1 개로 가져온 rows 를 잘라서 (rows, next_cursor, prev_cursor, has_next) 반환
+    # key(row) -> (created_at, id)
+    has_more = len(rows) > size
+    rows = list(rows[:size])
+
+    if direction == 'prev':
+        rows.reverse()  # 다시 최신순으로
+        has_next, has_prev = True, has_more  # 뒤로 왔으니 다음 페이지는 항상 존재
+    else:
+        has_next = has_more
+
+    if not rows:
+        return rows, None, None, False
+
+    next_cursor = encode_cursor(*key(rows[-1]), 'next') if has_next else None
+    prev_cursor = encode_cursor(*key(rows[0]), 'prev') if has_prev else None
+    return rows, next_cursor, prev_cursor, has_next
+
+
+# ───────────────────────── 전체 개수(count) 전략 ─────────────────────────
+# exact    = SELECT count(*) (정확하지만 큰 테이블에서는 목록 조회보다 비쌈)
+# estimate = EXPLAIN 의 플래너 예상 행 수 (통계 기반, 테이블을 읽지 않음)
+# none     = 집계하지 않음 → total/total_pages 는 None, has_next 로만 다음 페이지 판단
+
+async def count_rows(db: AsyncSession, query, mode: str = 'exact') -> int | None:
+    # query 는 목록 조회와 같은 WHERE 를 가진 SELECT (ORDER BY / LIMIT 없이)
+    if mode == 'none':
+        return None
+    if mode == 'estimate':
+        return await estimate_rows(db, query)
+    return await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+
+
+async def estimate_rows(db: AsyncSession, query) -> int:
+    # EXPLAIN 은 바인드 파라미터를 받을 수 없어서 값이 박힌 SQL 로 컴파일 (값은 SQLAlchemy 가 이스케이프)
+    # text() 로 감싸면 검색어 안의 ':단어' 가 바인드 파라미터로 해석되므로 드라이버에 그대로 전달
+    compiled = query.compile(dialect=db.get_bind().dialect, compile_kwargs={'literal_binds': True})
+    conn = await db.connection()
+    result = await conn.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {compiled}')
+    plan = result.scalar()
+    if isinstance(plan, str):  # asyncpg 는 json 을 문자열로 돌려줌
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def total_pages(total: int | None, size: int) -> int | None:
+    if total is None:
+        return None
+    return math.ceil(total / size)  # ceil 올림 함수 , 전체페이지 수를 계산함.
@@ -0,0 +1,99 @@
+# app/pool_metrics.py
+# DB 커넥션 풀 상태/지표 수집
+# - checkout 대기 시간: 풀에서 커넥션을 얻을 때까지 걸린 시간 (풀이 고갈되면 길어짐)
+# - checkout 보유 시간: 커넥션을 빌려서 반납할 때까지 걸린 시간 (트랜잭션을 오래 잡고 있는 코드 찾기)
+# - 현재 사용중(checked out)/overflow/대기 커넥션 수
+# observers 에 콜백을 등록하면 (이벤트명, 초) 로 호출되므로 외부 지표 시스템에 연결할 수 있음
+
+import time
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolMetrics:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.observers: list[Callable[[str, float], None]] = []
+        self.checkouts = 0
+        self.checkout_timeouts = 0  # pool_timeout 안에 커넥션을 못 얻은 횟수
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.hold_total = 0.0
+        self.hold_max = 0.0
+        self.hold_count = 0
+
+    def _notify(self, name: str, seconds: float):
+        for observer in self.observers:
+            observer(name, seconds)
+
+    def record_checkout_wait(self, seconds: float):
+        self.checkouts += 1
+        self.checkout_wait_total += seconds
+        self.checkout_wait_max = max(self.checkout_wait_max, seconds)
+        self._notify('checkout_wait', seconds)
+
+    def record_hold(self, seconds: float):
+        self.hold_count += 1
+        self.hold_total += seconds
+        self.hold_max = max(self.hold_max, seconds)
+        self._notify('checkout_hold', seconds)
+
+    def snapshot(self, pool) -> dict:
+        return {
+            'name': self.name,
+            'pool_size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+            'checkouts': self.checkouts,
+            'checkout_timeouts': self.checkout_timeouts,
+            'checkout_wait_avg': self.checkout_wait_total / self.checkouts if self.checkouts else 0.0,
+            'checkout_wait_max': self.checkout_wait_max,
+            'hold_avg': self.hold_total / self.hold_count if self.hold_count else 0.0,
+            'hold_max': self.hold_max,
+        }
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    # 기본 async 풀에 checkout 대기 시간 측정만 추가
+    metrics: PoolMetrics | None = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.checkout_timeouts += 1
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_checkout_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        # 커넥션 무효화 등으로 풀이 다시 만들어져도 지표는 이어서 기록
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def instrument(engine: AsyncEngine, name: str) -> PoolMetrics:
+    metrics = PoolMetrics(name)
+    engine.sync_engine.pool.metrics = metrics
+
+    @event.listens_for(engine.sync_engine, 'checkout')
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checkout_at'] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, 'checkin')
+    def _on_checkin(dbapi_connection, connection_record):
+        checkout_at = connection_record.info.pop('checkout_at', None)
+        if checkout_at is not None:
+            metrics.record_hold(time.perf_counter() - checkout_at)
+
+    return metrics
@@ -1,2 +1,2 @@
 # app/posts/__init__.py
-from .posts_models import Post
+from .posts_models import Post, PostFile
@@ -1,10 +1,14 @@
 # app/posts/posts.py
+from typing import Literal
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fastapi import APIRouter, Depends, UploadFile, File, Form # FastAPI 관련 각종 import (의존성, 파일업로드, 예외처리, 응답 등)
+from fastapi import APIRouter, Depends, Header, Request, Response # FastAPI 관련 각종 import (의존성, 예외처리, 응답 등)
 
+from app import db_routing, db_writes
 from app.database import get_db
 from app.posts import posts_schemas  # 선적 스키마
+from app.posts import posts_uploads  # 첨부파일 스트리밍 업로드
 from app.posts.posts_services import PostsServices
 from app.users import dependencies
 from app.users import users_models
@@ -30,6 +34,11 @@ def get_services(db:AsyncSession =Depends(get_db)) -> PostsServices:
     return PostsServices(db)
 
 
+# 조회 전용 - 읽기 복제본 세션 (복제본이 없거나 지연되면 primary, app/db_routing.py 참고)
+def get_read_services(db: AsyncSession = Depends(db_routing.get_read_db)) -> PostsServices:
+    return PostsServices(db)
+
+
 # 전체 포스트 리스트 조회 가능 (페이지네이션기능포함) (로그인된 모든 사용자)
 # 전체 포스트 리스트 조회 가능 (모든 게시글 한 번에 반환)
 @router.get('/posts', response_model=posts_schemas.PostsPageOut, status_code=200)
@@ -39,8 +48,11 @@ async def list_posts(
     type_category: int = None,
     region_category: int = None,
     search: str = None,
+    cursor: str = None,  # 이전 응답의 next_cursor / prev_cursor 를 넘기면 keyset 모드로 조회
+    sort: Literal['latest', 'relevance'] = 'latest',  # relevance = 검색어 관련도순
+    count: Literal['exact', 'estimate', 'none'] = 'exact',  # 전체 개수 집계 방식
     _: users_models.User = Depends(dependencies.user_only),
-    service: PostsServices = Depends(get_services), # 의존성 주입으로 비동기 세션 db 생성
+    service: PostsServices = Depends(get_read_services), # 의존성 주입으로 비동기 세션 db 생성
 ):
     return await service.list_posts(
         page=page,
@@ -48,6 +60,9 @@ async def list_posts(
         type_category=type_category,
         region_category=region_category,
         search=search,
+        cursor=cursor,
+        sort=sort,
+        count=count,
     )
 
 @router.get('/posts/personal', response_model=posts_schemas.PostsPageOut, status_code=200)
@@ -57,8 +72,11 @@ async def list_posts_personal(
     type_category: int = None,
     region_category: int = None,
     search: str = None,
+    cursor: str = None,  # 이전 응답의 next_cursor / prev_cursor 를 넘기면 keyset 모드로 조회
+    sort: Literal['latest', 'relevance'] = 'latest',  # relevance = 검색어 관련도순
+    count: Literal['exact', 'estimate', 'none'] = 'exact',  # 전체 개수 집계 방식
     current_user: users_models.User = Depends(dependencies.user_only), # 의존성 주입으로 비동기 세션 db 생성
-    service: PostsServices = Depends(get_services),
+    service: PostsServices = Depends(get_read_services),
 ):
     return await service.list_post_personal(
         page=page,
@@ -66,6 +84,9 @@ async def list_posts_personal(
         type_category=type_category,
         region_category=region_category,
         search=search,
+        cursor=cursor,
+        sort=sort,
+        count=count,
         current_user=current_user,
     )
 
@@ -73,61 +94,75 @@ async def list_posts_personal(
 @router.get('/posts/{post_id}', response_model=posts_schemas.PostOut, status_code=200)
 async def get_post(
         post_id:int,
+        response: Response,
         _:users_models.User = Depends(dependencies.user_only),
-        service:PostsServices = Depends(get_services),
+        service:PostsServices = Depends(get_read_services),
 ):
-    return await service.get_post(
+    post = await service.get_post(
         post_id=post_id
     )
+    db_writes.set_etag(response, post)  # 수정/삭제 시 If-Match 로 다시 보낼 버전
+    return post
 # 스태프 이상만 생성 (파일업로드 기능도)
-@router.post('/posts', response_model=posts_schemas.PostOut, status_code=201)
+# multipart/form-data 본문(title, description, type_category, region_category, files)은 posts_uploads 가 직접 받음
+# (Form()/File() 로 선언하면 파일을 임시파일에 다 받은 뒤에야 함수가 실행됨)
+@router.post('/posts', response_model=posts_schemas.PostOut, status_code=201,
+             openapi_extra=posts_uploads.openapi_body(posts_schemas.PostCreateForm, 'files'))
 async def create_post(
-        title: str = Form(...),  # 파일 업로드 때문에 따로 Form 으로 설정 (multipart/form-data 형식, json 아님)
-        description: str = Form(...),  # 파일 업로드 때문에 따로 Form 으로 설정 (multipart/form-data 형식, json 아님)
-        type_category: int = Form(...),
-        region_category: int = Form(...),
-        files: list[UploadFile] = File(None),  # 파일이 없는 경우 대비. 기본값은 None입니다. 여러개 업로드
+        request: Request,
+        response: Response,
         current_user: users_models.User = Depends(dependencies.staff_only),
         service:PostsServices = Depends(get_services), # 의존성 주입으로 비동기 세션 db 생성
     ):
-    return await service.create_post(
-        title=title,
-        description=description,
-        type_category=type_category,
-        region_category=region_category,
-        files=files,
+    await service.db.close()  # 인증 조회로 잡은 커넥션은 업로드를 받는 동안 풀에 반납
+    upload = await posts_uploads.receive_upload(request, 'files')
+    form = await posts_uploads.validate_form(upload, posts_schemas.PostCreateForm)
+    post = await service.create_post(
+        title=form.title,
+        description=form.description,
+        type_category=form.type_category,
+        region_category=form.region_category,
+        files=upload.files,
         current_user=current_user,
     )
+    db_writes.set_etag(response, post)
+    return post
 
 # 게시글 수정 (작성자 또는 staff만 가능)
-@router.put('/posts/{post_id}', response_model=posts_schemas.PostOut,status_code=200)  # PUT 요청 시 이 함수 실행, 수정 후 반환 타입은 PostOut 스키마
+# 본문: title, description, type_category, region_category, keep_file_paths(여러 개), new_file_paths(파일 여러 개)
+@router.put('/posts/{post_id}', response_model=posts_schemas.PostOut,status_code=200,
+            openapi_extra=posts_uploads.openapi_body(posts_schemas.PostUpdateForm, 'new_file_paths'))  # PUT 요청 시 이 함수 실행, 수정 후 반환 타입은 PostOut 스키마
 async def update_post(
         post_id: int,  # URL 경로에서 전달받은 게시글 ID (정수형)
-        title: str = Form(None),  # form-data로 전달된 title 값, 없으면 None (수정 안 했다는 뜻)
-        description: str = Form(None),  # form-data로 전달된 description 값, 없으면 None
-        type_category: int = Form(None),
-        region_category: int = Form(None),
-        keep_file_paths: list[str] = Form(None),  # 기존 파일 중 유지하고 싶은 파일 경로 리스트 (없으면 전부 삭제로 처리됨)
-        new_file_paths: list[UploadFile] = File(None),  # 새로 업로드된 파일들 (없을 수도 있음)
+        request: Request,
+        response: Response,
+        if_match: str = Header(None),  # 조회 때 받은 ETag, 그 사이 다른 사람이 수정했으면 409 (없으면 버전 확인 안함)
         current_user: users_models.User = Depends(dependencies.staff_only),  # 로그인한 사용자가 staff 권한인지 검사 (아니면 403 에러)
         service:PostsServices=Depends(get_services), # 의존성 주입으로 비동기 세션 db 생성
     ):
-        return await service.update_post(
+        version = db_writes.if_match_version(if_match)  # 헤더 형식 오류(400)는 본문을 받기 전에
+        await service.db.close()  # 인증 조회로 잡은 커넥션은 업로드를 받는 동안 풀에 반납
+        upload = await posts_uploads.receive_upload(request, 'new_file_paths')
+        form = await posts_uploads.validate_form(upload, posts_schemas.PostUpdateForm, list_fields=('keep_file_paths',))
+        post = await service.update_post(
             post_id=post_id,
-            title=title,
-            description=description,
-            type_category=type_category,
-            region_category=region_category,
-            keep_file_paths=keep_file_paths,
-            new_file_paths=new_file_paths,
+            title=form.title,
+            description=form.description,
+            type_category=form.type_category,
+            region_category=form.region_category,
+            keep_file_paths=form.keep_file_paths,
+            new_file_paths=upload.files,
             current_user=current_user,
-
+            version=version,
         )
+        db_writes.set_etag(response, post)  # 수정된 새 버전
+        return post
 
 # 게시글 삭제
 @router.delete('/posts/{post_id}',status_code=204)  # HTTP DELETE 요청을 처리하는 라우터 설정, /posts/123 같은 URL을 의미하며 응답 상태 코드는 204(No Content)
 async def delete_post(
         post_id: int,  # URL 경로에서 전달된 게시글 ID (정수형)
+        if_match: str = Header(None),  # 조회 때 받은 ETag (없으면 버전 확인 안함)
         current_user: users_models.User = Depends(dependencies.admin_only),
         # admin_only 의존성을 통해 관리자 권한 확인, '_'는 이 값을 사용하지 않겠다는 의미
         service:PostsServices=Depends(get_services) # 의존성 주입으로 비동기 세션 db 생성
@@ -135,17 +170,21 @@ async def delete_post(
         await service.delete_post(
             post_id=post_id,
             current_user=current_user,
+            version=db_writes.if_match_version(if_match),
         )
 
 # 파일 다운로드
-@router.get('/posts/{post_id}/files/{file_index}/download')  # 파일 다운로드는 JSON 형태로 받아오는게 아니기 때문에 response_model을 설정 해줄 핋요 없음
+# HEAD 도 받음 - 이어받기 전에 크기/ETag/Accept-Ranges 만 확인하는 클라이언트용 (본문 없이 헤더만)
+@router.api_route('/posts/{post_id}/files/{file_index}/download', methods=['GET', 'HEAD'])  # 파일 다운로드는 JSON 형태로 받아오는게 아니기 때문에 response_model을 설정 해줄 핋요 없음
 async def download_file(
         post_id: int,
         file_index: int,  # 파일의 ID가 아니라 여러개 파일을 올려놓은 리스트 의 인덱스 번호로 적용
+        request: Request,  # If-None-Match / If-Modified-Since (304), Range / If-Range (206)
         _: users_models.User = Depends(dependencies.user_only),
         service:PostsServices=Depends(get_services) # 의존성 주입으로 비동기 세션 db 생성
     ):
         return await service.download_file(
             post_id=post_id,
             file_index=file_index,
+            request_headers=request.headers,
         )
\ No newline at end of file
@@ -0,0 +1,196 @@
+# app/posts/posts_downloads.py
+# 첨부파일 다운로드 응답 (조건부 GET / 캐시 / Range 헤더)
+# - 저장 경로는 uuid 로 unique 하고 내용은 sha256 으로 저장됨 (posts_storage) → 한 번 올린 파일의 내용은 바뀌지 않음
+#   → ETag 는 "sha256", Cache-Control 은 immutable (브라우저는 다시 요청하지 않고, 요청해도 304 로 본문 없이 응답)
+# - If-None-Match / If-Modified-Since 가 맞으면 304 (DB 값만 비교, 디스크 확인 없음)
+# - Range / If-Range 는 Starlette FileResponse 가 처리 (206, 여러 구간이면 multipart/byteranges, 범위 밖이면 416)
+#   → 끊긴 다운로드를 이어받을 때 처음부터 다시 받지 않음
+# - sha256 이 아직 없는 파일(backfill_post_files.py 실행 전)은 FileResponse 기본 ETag(mtime+크기) + 매번 재검증
+#
+# 리버스 프록시 전송(offload) - .env 의 DOWNLOAD_OFFLOAD 로 선택 (기본은 지금처럼 uvicorn 워커가 직접 전송)
+# - 로그인/게시글/파일 확인과 304 는 여기서 그대로 하고, 본문 없이 헤더로 파일 위치만 알려주면 프록시가 파일을 보냄
+#   → 큰 파일 다운로드가 워커를 붙잡지 않음 (Range/HEAD 도 프록시가 처리)
+# - DOWNLOAD_OFFLOAD=x-accel-redirect (nginx): X-Accel-Redirect: {DOWNLOAD_OFFLOAD_PREFIX}{public/ 아래 경로}
+#     location /protected/ { internal; alias /path/to/shipping-erp-fastapi/public/; }
+# - DOWNLOAD_OFFLOAD=x-sendfile (Apache mod_xsendfile): X-Sendfile: 파일의 절대 경로 (% 인코딩)
+#     XSendFile On / XSendFilePath /path/to/shipping-erp-fastapi/public (XSendFileUnescape 는 기본값 On 그대로)
+# - Content-Type / Content-Disposition / Cache-Control 은 응답 헤더로 넘기고, ETag/Last-Modified 는 프록시가 파일 기준으로 다시 정함
+
+import asyncio
+import calendar
+import inspect
+import mimetypes
+import os
+import secrets
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import quote
+
+import anyio
+from dotenv import load_dotenv
+from fastapi import HTTPException, Response, responses
+from starlette.datastructures import Headers
+
+from app.posts import posts_storage
+
+load_dotenv()
+
+OFFLOAD_NONE = ''
+OFFLOAD_X_ACCEL_REDIRECT = 'x-accel-redirect'
+OFFLOAD_X_SENDFILE = 'x-sendfile'
+OFFLOAD_MODES = (OFFLOAD_NONE, OFFLOAD_X_ACCEL_REDIRECT, OFFLOAD_X_SENDFILE)
+
+DOWNLOAD_OFFLOAD = os.getenv('DOWNLOAD_OFFLOAD', OFFLOAD_NONE).strip().lower()
+DOWNLOAD_OFFLOAD_PREFIX = os.getenv('DOWNLOAD_OFFLOAD_PREFIX', '/protected/')  # nginx internal location
+if DOWNLOAD_OFFLOAD not in OFFLOAD_MODES:  # 오타로 조용히 직접 전송하지 않도록 서버 시작 시 오류
+    raise RuntimeError(f'DOWNLOAD_OFFLOAD 는 {", ".join(repr(m) for m in OFFLOAD_MODES)} 중 하나여야 합니다: {DOWNLOAD_OFFLOAD!r}')
+
+ERROR_FILE_MISSING = '서버에 파일이 없습니다'
+
+CACHE_IMMUTABLE = 'private, max-age=31536000, immutable'  # 로그인한 사용자만 받을 수 있으므로 공유 캐시(프록시)에는 저장 안함
+CACHE_REVALIDATE = 'private, no-cache'
+DEFAULT_CONTENT_TYPE = 'application/octet-stream'  # 범용 바이너리 파일 타입
+
+
+def content_type(stored) -> str:
+    # 업로드 때 받은 Content-Type → 파일명 확장자로 추정 → 범용 바이너리
+    return stored.content_type or mimetypes.guess_type(stored.original_name)[0] or DEFAULT_CONTENT_TYPE
+
+
+def etag(stored) -> str | None:
+    return f'"{stored.sha256}"' if stored.sha256 else None
+
+
+def last_modified(stored) -> str | None:
+    # created_at 은 UTC (datetime.utcnow) - 하드링크라 파일 mtime 은 같은 내용을 처음 올린 시각이므로 DB 값을 씀
+    if stored.created_at is None:
+        return None
+    return formatdate(calendar.timegm(stored.created_at.utctimetuple()), usegmt=True)
+
+
+def _etag_matches(if_none_match: str, current: str) -> bool:
+    # If-None-Match: "a", W/"b" 또는 * (약한 비교 - W/ 는 무시)
+    if if_none_match.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == current for tag in if_none_match.split(','))
+
+
+def _not_modified(stored, request_headers: Headers) -> bool:
+    # RFC 9110 13.2.2 - If-None-Match 가 있으면 If-Modified-Since 는 보지 않음
+    if_none_match = request_headers.get('if-none-match')
+    if if_none_match is not None:
+        current = etag(stored)
+        return current is not None and _etag_matches(if_none_match, current)
+    if_modified_since = request_headers.get('if-modified-since')
+    modified = last_modified(stored)
+    if if_modified_since is None or modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(modified) <= parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False  # 형식이 잘못된 날짜는 무시
+
+
+def cache_headers(stored) -> dict[str, str]:
+    headers = {
+        'Cache-Control': CACHE_IMMUTABLE if stored.sha256 else CACHE_REVALIDATE,
+        'X-Content-Type-Options': 'nosniff',  # 올린 사람이 정한 Content-Type 을 브라우저가 추측해서 바꾸지 않도록
+    }
+    if etag(stored):
+        headers['ETag'] = etag(stored)
+    if last_modified(stored):
+        headers['Last-Modified'] = last_modified(stored)
+    return headers
+
+
+class AttachmentFileResponse(responses.FileResponse):
+    # Starlette 0.46 의 여러 구간(multipart/byteranges) 응답은 boundary 를 Content-Range 헤더에 넣고
+    # Content-Length 를 실제 본문보다 1 바이트 짧게 계산함 (uvicorn(h11) 은 선언보다 많이 보내면 연결을 끊음)
+    # → 여러 구간 응답만 RFC 9110 14.6 형식으로 직접 보냄 (단일 구간/전체 응답은 FileResponse 그대로)
+
+    async def _handle_multiple_ranges(self, send, ranges, file_size, send_header_only):
+        boundary = secrets.token_hex(13)
+        part_type = self.headers['content-type']  # 각 구간 헤더에는 파일의 Content-Type
+        part_headers = [
+            f'--{boundary}\r\nContent-Type: {part_type}\r\nContent-Range: bytes {start}-{end - 1}/{file_size}\r\n\r\n'
+            .encode('latin-1')
+            for start, end in ranges
+        ]
+        closing = f'--{boundary}--\r\n'.encode('latin-1')
+        self.headers['content-type'] = f'multipart/byteranges; boundary={boundary}'
+        self.headers['content-length'] = str(
+            sum(len(header) + (end - start) + 2 for header, (start, end) in zip(part_headers, ranges)) + len(closing)
+        )
+        await send({'type': 'http.response.start', 'status': 206, 'headers': self.raw_headers})
+        if send_header_only:
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            return
+        async with await anyio.open_file(self.path, mode='rb') as file:
+            for header, (start, end) in zip(part_headers, ranges):
+                await send({'type': 'http.response.body', 'body': header, 'more_body': True})
+                await file.seek(start)
+                while start < end:
+                    chunk = await file.read(min(self.chunk_size, end - start))
+                    start += len(chunk)
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                await send({'type': 'http.response.body', 'body': b'\r\n', 'more_body': True})
+        await send({'type': 'http.response.body', 'body': closing, 'more_body': False})
+
+
+# FileResponse 의 내부 메서드를 바꿔 끼우므로 Starlette 를 올렸을 때 이름/인자가 바뀌었으면
+# 조용히 기본 구현(위 버그)으로 돌아가지 않도록 서버 시작 시 오류
+_MULTIPLE_RANGES_PARAMETERS = ['self', 'send', 'ranges', 'file_size', 'send_header_only']
+if (
+    not hasattr(responses.FileResponse, '_handle_multiple_ranges')
+    or list(inspect.signature(responses.FileResponse._handle_multiple_ranges).parameters) != _MULTIPLE_RANGES_PARAMETERS
+):
+    raise RuntimeError('Starlette FileResponse._handle_multiple_ranges 가 바뀌었습니다 - AttachmentFileResponse 를 확인하세요')
+
+
+def content_disposition(filename: str) -> str:
+    # FileResponse 와 같은 형식 (한글 등 ASCII 가 아닌 파일명은 RFC 5987 filename*)
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def offload_headers(path) -> dict[str, str]:
+    # 프록시에게 넘길 파일 위치 헤더
+    if DOWNLOAD_OFFLOAD == OFFLOAD_X_ACCEL_REDIRECT:
+        relative = os.path.relpath(path, posts_storage.UPLOAD_DIR).replace(os.sep, '/')
+        return {'X-Accel-Redirect': DOWNLOAD_OFFLOAD_PREFIX + quote(relative)}
+    return {'X-Sendfile': quote(os.path.abspath(path))}  # 헤더는 latin-1 이라 한글 파일명은 % 인코딩
+
+
+def offload_response(stored, path) -> Response:
+    # 본문 없는 200 - 프록시가 이 응답의 헤더를 보고 파일을 직접 보냄
+    headers = cache_headers(stored)
+    headers.pop('ETag', None)  # 프록시가 파일 기준으로 붙이므로 (nginx 는 upstream 의 ETag 를 무시)
+    headers.pop('Last-Modified', None)
+    headers['Content-Disposition'] = content_disposition(stored.original_name)
+    headers.update(offload_headers(path))
+    response = Response(media_type=content_type(stored), headers=headers)
+    del response.headers['content-length']  # 본문 길이(0)가 아니라 프록시가 파일 크기로 채움
+    return response
+
+
+async def attachment_response(stored, path, request_headers: Headers) -> Response:
+    # stored = post_files 행 (original_name, content_type, sha256, created_at), path = 디스크 경로
+    headers = cache_headers(stored)
+    if _not_modified(stored, request_headers):
+        return Response(status_code=304, headers=headers)
+
+    if not await asyncio.to_thread(path.exists):  # 파일이 없으면 404 (stat 은 디스크 I/O 라 이벤트 루프 밖에서)
+        raise HTTPException(status_code=404, detail=ERROR_FILE_MISSING)
+
+    if DOWNLOAD_OFFLOAD:
+        return offload_response(stored, path)
+
+    # FileResponse = 파일을 메모리에 한 번에 로드하지 않고 청크(chunk) 단위로 전송, 대용량 파일도 효율적으로 전송 가능
+    # ETag/Last-Modified 를 넘기면 FileResponse 는 자체 값(mtime 기반) 대신 이 값을 씀 (If-Range 비교도 이 값으로)
+    return AttachmentFileResponse(
+        path=path,
+        filename=stored.original_name,  # 사용자가 올린 원래 파일명으로 다운로드 (Content-Disposition: attachment)
+        media_type=content_type(stored),
+        headers=headers,
+    )
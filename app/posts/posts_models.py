@@ -1,9 +1,9 @@
 # app/posts/posts_models.py
 # DB에 저장될 사용자 정보를 정의하는 ORM 모델
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
-from sqlalchemy.orm import relationship, backref
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Computed, Index, DDL, event, func
+from sqlalchemy.orm import relationship, backref, deferred
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 from datetime import datetime
 
@@ -18,7 +18,14 @@ class Post(Base):
     description = Column(String, nullable=True)
     created_at = Column(DateTime,default=datetime.utcnow)  # 세계 포준시로 표시함. 한국 표준시로 바꾸려면 프론트엔드에서 실행(UTC로 저장하고, 필요할 때 KST로 변환해서 사용하는 것이 안전.)
     updated_at = Column(DateTime, onupdate=datetime.utcnow, nullable=True)  # 업데이트 시간 (로직에서 await db.commit() 시 자동적용)
-    file_paths = Column(ARRAY(String), nullable=True)  # 업로드된 여러개의 파일을 경로로 저장 #PostgreSQL 의 경우 ARRAY 사용
+    version = Column(Integer, nullable=False, default=1, server_default='1')  # 낙관적 동시성용 버전 (수정할 때마다 +1, 응답의 ETag)
+
+    # 검색용 tsvector (DB가 자동 계산하는 생성 컬럼, 응답에는 필요 없으므로 deferred 로 SELECT 에서 제외)
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('simple'::regconfig, posts_search_text(title, description))", persisted=True),
+        nullable=True,
+    ))
 
     type_category_id = Column(Integer,ForeignKey('type_categories.id',ondelete='SET NULL'),nullable=True)
     type_category = relationship('TypeCategory',back_populates='posts',passive_deletes=True)
@@ -29,9 +36,64 @@ class Post(Base):
     creator_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'),nullable=True)  # 유저가 삭제되어도 posts가 남음 ondelete='SET NULL'을 추가하면 삭제된 유저의 아이디는 null로 표시됨, null 이 됐을때 오류 방지를 위해 nullable=True 를 써줌
     creator = relationship('User', back_populates='posts', passive_deletes=True)  # 유저가 삭제되어도 db에 posts가 남음
 
+    # 첨부파일 (post_files, 순서대로) - 게시글이 삭제되면 DB 가 같이 삭제 (ON DELETE CASCADE)
+    files = relationship('PostFile', back_populates='post', order_by='PostFile.ordinal', passive_deletes=True)
+
     reply = relationship('Reply',back_populates='posts', cascade="all, delete-orphan") #CASCADE로 삭제 하고 고아객체를 남기지 않기 위함. 써주는게 좋음
     progress =relationship('Progress',back_populates='post',uselist=False, cascade="all, delete-orphan") #CASCADE로 삭제 하고 고아객체를 남기지 않기 위함. 써주는게 좋음 , uselist=False 1:1 관계라고 알려주는것
 
 
     # creator_id = Column(Integer, ForeignKey('users.id',ondelete='CASCADE')) #users table의 id 컬럼을 참조, CASCADE 유저가 삭제되면 shipments도 삭제
-    # creator = relationship('User',backref=backref('shipments',cascade='all, delete'),passive_deletes=True)  # creator는 create를 한 사람을 User 객체로 나타내고 user.shipmets를 통해 user 에서도 연결된 posts 를 가져올 수 있음 passive_deletes=True(user 삭제시 shipment 삭제를 DB에 위임)
\ No newline at end of file
+    # creator = relationship('User',backref=backref('shipments',cascade='all, delete'),passive_deletes=True)  # creator는 create를 한 사람을 User 객체로 나타내고 user.shipmets를 통해 user 에서도 연결된 posts 를 가져올 수 있음 passive_deletes=True(user 삭제시 shipment 삭제를 DB에 위임)
+
+
+# 게시글 첨부파일 (alembic a7d3e5f90b16) - 예전 posts.file_paths 배열을 파일 하나당 한 행으로
+# 목록 응답에 크기/MIME/sha256 을 디스크 확인(stat) 없이 바로 내려줄 수 있음
+class PostFile(Base):
+    __tablename__ = 'post_files'
+    __table_args__ = (
+        Index('ux_post_files_post_id_ordinal', 'post_id', 'ordinal', unique=True),  # 게시글별 파일 목록 (순서)
+        Index('ux_post_files_stored_key', 'stored_key', unique=True),
+        # 파일명 부분 문자열 검색 (ILIKE '%검색어%')
+        Index('ix_post_files_original_name_trgm', 'original_name',
+              postgresql_using='gin', postgresql_ops={'original_name': 'gin_trgm_ops'}),
+    )
+
+    id = Column(Integer, primary_key=True)
+    post_id = Column(Integer, ForeignKey('posts.id', ondelete='CASCADE'), nullable=False)
+    ordinal = Column(Integer, nullable=False)  # 게시글 안에서의 순서 (다운로드 file_index 기준)
+    original_name = Column(String(255), nullable=False)  # 사용자가 올린 원래 파일명
+    stored_key = Column(String(500), nullable=False)  # 저장 경로 public/{uuid}_{파일명} (posts_storage 참고)
+    size = Column(BigInteger, nullable=True)  # 아래 3개는 저장소 도입 전 파일이면 backfill_post_files.py 로 채움
+    content_type = Column(String(255), nullable=True)
+    sha256 = Column(String(64), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    post = relationship('Post', back_populates='files')
+
+
+# 검색 인덱스 (alembic 7c1e4a9b2d30 / a7d3e5f90b16 과 동일한 정의, autogenerate 가 삭제하지 않도록 모델에도 선언)
+Index('ix_posts_search_vector', Post.search_vector, postgresql_using='gin')
+Index(
+    'ix_posts_search_text_trgm',
+    func.posts_search_text(Post.title, Post.description).label('search_text'),
+    postgresql_using='gin',
+    postgresql_ops={'search_text': 'gin_trgm_ops'},
+)
+
+# 목록 조회 인덱스 (alembic 9d4f2b6e8a11) - 최신순 keyset 페이지와 작성자/카테고리 필터 + 최신순
+Index('ix_posts_created_at_id', Post.created_at.desc(), Post.id.desc())
+Index('ix_posts_creator_id_created_at_id', Post.creator_id, Post.created_at, Post.id)
+Index('ix_posts_type_category_id_created_at_id', Post.type_category_id, Post.created_at, Post.id)
+Index('ix_posts_region_category_id_created_at_id', Post.region_category_id, Post.created_at, Post.id)
+
+# create_db.py(create_all) 로 테이블을 만들 때도 생성 컬럼/인덱스가 참조하는 확장과 함수가 먼저 있어야 함
+event.listen(Post.__table__, 'before_create', DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+event.listen(Post.__table__, 'before_create', DDL("""
+    CREATE OR REPLACE FUNCTION posts_search_text(title text, description text)
+    RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    AS $$
+        SELECT coalesce(title, '') || ' ' || coalesce(description, '')
+    $$
+"""))
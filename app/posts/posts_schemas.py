@@ -28,10 +28,41 @@ class PostUpdate(PostBase):
     region_category_id: int | None
 
 
+# 게시글 생성/수정 폼 입력값 (multipart/form-data, 파일은 posts_uploads 가 따로 저장)
+class PostCreateForm(BaseModel):
+    title: str
+    description: str
+    type_category: int
+    region_category: int
+
+
+class PostUpdateForm(BaseModel):
+    title: str | None = None  # 없으면 None (수정 안 했다는 뜻)
+    description: str | None = None
+    type_category: int | None = None
+    region_category: int | None = None
+    keep_file_paths: List[str] | None = None  # 기존 파일 중 유지하고 싶은 파일 경로 리스트 (없으면 전부 삭제로 처리됨)
+
+
+# 첨부파일 메타데이터 (post_files) - 디스크 확인 없이 DB 값 그대로
+class PostFileOut(BaseModel):
+    id: int
+    original_name: str
+    stored_key: str  # 저장 경로 (수정 시 keep_file_paths 로 보내는 값)
+    size: int | None  # 저장소 도입 전 파일은 backfill 전까지 None
+    content_type: str | None
+    sha256: str | None
+
+    class Config:
+        from_attributes = True
+
+
 # 데이터를 받아올때 유효성검사를 위한 모델에 사용 (파일 패스가 리스트기때문에)
 class PostOut(PostBase):
     id: int
-    file_paths: list[str] | None
+    version: int  # 수정/삭제 시 If-Match 로 보낼 버전 (응답 헤더 ETag 와 같음)
+    files: List[PostFileOut] = []  # 첨부파일 (다운로드 file_index 순서)
+    file_paths: list[str] | None  # files 의 stored_key 목록 (기존 클라이언트 호환, 파일이 없으면 None)
     created_at: datetime
     updated_at: datetime | None
     creator: users_schemas.UserOut
@@ -45,10 +76,13 @@ class PostOut(PostBase):
 # ShipmentOut 자체를 리스트에 다 담아줌
 class PostsPageOut(BaseModel):
     items: List[PostOut]
-    total: int
+    total: int | None  # count=none 이면 None
     page: int
     size: int
-    total_pages: int
+    total_pages: int | None
+    has_next: bool = False  # count 를 생략해도 다음 페이지가 있는지 알 수 있음
+    next_cursor: str | None = None  # (created_at, id) 를 인코딩한 keyset cursor
+    prev_cursor: str | None = None
 
 class SimplePostOut(BaseModel):
     id: int
@@ -0,0 +1,53 @@
+# app/posts/posts_search.py
+# 게시글 검색 조건/정렬 (alembic 7c1e4a9b2d30 의 GIN 인덱스를 타도록 작성)
+# - search_vector @@ tsquery  → ix_posts_search_vector (단어 검색)
+# - posts_search_text(...) ILIKE '%검색어%'  → ix_posts_search_text_trgm (한글 제목/설명 부분 문자열 검색)
+# - post_files.original_name ILIKE '%검색어%'  → ix_post_files_original_name_trgm (첨부 파일명 검색)
+# 세 조건을 OR 로 묶으면 (특히 post_files 서브쿼리가 들어가면) posts 를 전부 훑는 seq scan 이 되므로
+# 조건마다 인덱스로 게시글 id 를 구하고 UNION 한 id 집합으로 거름 (posts.id IN (... UNION ... UNION ...))
+# 목록 조회와 count 조회가 같은 search_condition() 을 쓰기 때문에 결과 개수가 어긋나지 않음
+
+from sqlalchemy import func, select, union
+
+from app.posts import posts_models
+
+
+def _search_text():
+    # 인덱스 표현식과 완전히 같은 형태여야 trigram 인덱스를 사용함
+    return func.posts_search_text(
+        posts_models.Post.title,
+        posts_models.Post.description,
+    )
+
+
+def _ts_query(search: str):
+    return func.websearch_to_tsquery('simple', search)
+
+
+def _like_pattern(search: str) -> str:
+    # 검색어 안의 %, _ 는 와일드카드가 아니라 글자 그대로 찾도록 이스케이프
+    escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def search_ids(search: str):
+    # 검색어에 맞는 게시글 id (조건마다 각자의 인덱스로 찾은 뒤 합침, 중복은 UNION 이 제거)
+    post = posts_models.Post
+    post_file = posts_models.PostFile
+    return union(
+        select(post.id).where(post.search_vector.op('@@')(_ts_query(search))),
+        select(post.id).where(_search_text().ilike(_like_pattern(search), escape='\\')),
+        select(post_file.post_id).where(post_file.original_name.ilike(_like_pattern(search), escape='\\')),
+    )
+
+
+def search_condition(search: str):
+    return posts_models.Post.id.in_(search_ids(search))
+
+
+def search_rank(search: str):
+    # 단어 일치(ts_rank) + 부분 문자열 유사도(word_similarity) 를 합쳐서 관련도 점수로 사용
+    return (
+        func.ts_rank(posts_models.Post.search_vector, _ts_query(search))
+        + func.word_similarity(search, _search_text())
+    )
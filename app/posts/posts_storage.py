@@ -0,0 +1,133 @@
+# app/posts/posts_storage.py
+# 첨부파일 content-addressed 저장소 (같은 내용의 파일은 디스크에 한 번만 저장)
+# - 실제 내용은 public/objects/<sha256 앞 2자리>/<sha256> 에 한 번만 저장
+# - 게시글이 가리키는 경로(post_files.stored_key 의 public/{uuid}_{파일명})는 그 객체의 하드링크
+#   → 경로 형식/다운로드(download_file)는 그대로, 같은 인보이스를 100개 글에 올려도 디스크는 1개 분량
+# - 참조 수는 파일시스템의 링크 수(st_nlink)로 셈 (객체 자신 1 + 게시글 경로 수)
+#   게시글 경로를 지워서 링크 수가 1(객체만 남음)이 되면 객체도 삭제
+# - 기존 public/ 파일을 저장소로 옮기는 스크립트: migrate_public_to_objects.py
+#
+# 모든 함수는 동기(블로킹) 함수 - 요청 처리 중에는 asyncio.to_thread 로 호출
+
+import hashlib
+import os
+import time
+import uuid
+
+UPLOAD_DIR = 'public'  # 원하는 폴더로 변경 가능
+OBJECTS_DIR = os.path.join(UPLOAD_DIR, 'objects')
+TMP_DIR = os.path.join(OBJECTS_DIR, 'tmp')  # 받는 중인 파일 (sha256 을 알기 전)
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def object_path(sha256: str) -> str:
+    return os.path.join(OBJECTS_DIR, sha256[:2], sha256)
+
+
+def new_temp_path() -> str:
+    os.makedirs(TMP_DIR, exist_ok=True)
+    return os.path.join(TMP_DIR, uuid.uuid4().hex)
+
+
+def new_link_path(filename: str) -> str:
+    # 게시글이 가리키는 경로 (uuid 로 unique 하게, 기존 저장 경로 형식 그대로)
+    return os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}_{filename}")
+
+
+def hash_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _ensure_object(source: str, sha256: str) -> bool:
+    # source 를 객체로 등록 (이미 같은 내용의 객체가 있으면 그대로 두고 False)
+    obj = object_path(sha256)
+    os.makedirs(os.path.dirname(obj), exist_ok=True)
+    try:
+        os.link(source, obj)  # 있으면 FileExistsError (동시에 같은 파일이 올라와도 하나만 등록됨)
+        return True
+    except FileExistsError:
+        return False
+
+
+def commit(temp_path: str, sha256: str, link_path: str) -> bool:
+    # 다 받은 임시파일 → 객체 + 게시글 경로(하드링크), 새 객체를 만들었으면 True (False = 중복이라 추가 디스크 0)
+    for _ in range(3):
+        created = _ensure_object(temp_path, sha256)
+        try:
+            os.link(object_path(sha256), link_path)
+            break
+        except FileNotFoundError:
+            # 그 사이 다른 요청의 release 가 마지막 참조라 객체를 지움 → 다시 등록
+            continue
+    else:
+        raise FileNotFoundError(object_path(sha256))
+    os.remove(temp_path)
+    return created
+
+
+def release(path: str, sha256: str | None = None):
+    # 게시글 경로 삭제 + 더 이상 참조가 없으면 객체도 삭제
+    # 저장소 도입 전 파일(링크 수 1)은 그냥 삭제, sha256 을 모르면 마지막 참조일 때만 내용을 읽어서 계산
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return
+    if sha256 is None and stat.st_nlink == 2:
+        sha256 = hash_file(path)
+    os.remove(path)
+    if sha256 is None:
+        return
+    obj = object_path(sha256)
+    try:
+        obj_stat = os.stat(obj)
+    except FileNotFoundError:
+        return
+    if obj_stat.st_ino == stat.st_ino and obj_stat.st_nlink == 1:
+        os.remove(obj)
+
+
+def release_all(files):
+    # files = (경로, sha256) 목록 - sha256 을 같이 넘기면 마지막 참조여도 파일을 다시 읽지 않음 (DB 에 없으면 None)
+    for path, sha256 in files:
+        release(path, sha256)
+
+
+def discard_temp(temp_path: str):
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+
+def adopt(path: str) -> bool:
+    # 저장소 밖의 기존 파일을 객체의 하드링크로 바꿈 (경로는 그대로), 디스크를 아꼈으면(중복이었으면) True
+    sha256 = hash_file(path)
+    if _ensure_object(path, sha256):
+        return False  # 같은 내용이 처음 - 이 파일 자체가 객체가 됨 (복사 없음)
+    obj = object_path(sha256)
+    if os.stat(obj).st_ino == os.stat(path).st_ino:
+        return False  # 이미 저장소에 들어 있음
+    temp = new_temp_path()
+    os.link(obj, temp)
+    os.replace(temp, path)  # 원자적으로 교체 (중간에 실패해도 원래 파일은 남음)
+    return True
+
+
+def collect_garbage(tmp_max_age_seconds: float = 24 * 3600) -> dict:
+    # 참조가 없는 객체(링크 수 1)와 오래된 임시파일(업로드 중 서버가 죽은 경우) 정리
+    removed = {'objects': 0, 'temp': 0}
+    now = time.time()
+    for root, _, names in os.walk(OBJECTS_DIR):
+        for name in names:
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            if root == TMP_DIR:
+                if now - stat.st_mtime > tmp_max_age_seconds:
+                    os.remove(path)
+                    removed['temp'] += 1
+            elif stat.st_nlink == 1:
+                os.remove(path)
+                removed['objects'] += 1
+    return removed
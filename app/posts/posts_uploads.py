@@ -0,0 +1,251 @@
+# app/posts/posts_uploads.py
+# 게시글 첨부파일 업로드 - multipart/form-data 본문을 스트리밍으로 받아서 바로 저장
+# - FastAPI 의 File()/UploadFile 은 Starlette 가 파일 전체를 임시파일(SpooledTemporaryFile)에 먼저 받은 뒤 넘겨줌
+#   → 저장할 때 shutil.copyfileobj 로 한 번 더 써야 하고(디스크에 두 번 씀), 그 복사가 이벤트 루프를 막음
+# - 여기서는 request.stream() 청크를 python-multipart 파서에 바로 넣고, 파일 내용은 받는 즉시 저장소(public/objects/tmp)에 씀
+#   (디스크 쓰기/해시 계산은 asyncio.to_thread 로 스레드에서 → 큰 파일을 받는 중에도 다른 요청을 처리)
+# - 다 받으면 sha256 으로 content-addressed 저장소에 등록하고 게시글 경로(public/{uuid}_{파일명})를 하드링크로 만듦
+#   (이미 같은 내용이 있으면 받은 파일은 버림 → 중복 파일은 추가 디스크 0, posts_storage 참고)
+# - 받으면서 크기와 sha256 을 계산하고, 파일 하나/요청 전체 크기 제한을 넘으면 바로 413 (쓰던 파일은 삭제)
+# - 라우터가 본문(Form/File)을 선언하지 않으므로 로그인/권한 확인이 본문을 받기 전에 끝남
+
+import asyncio
+import hashlib
+import os
+from dataclasses import dataclass, field
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from app.posts import posts_storage
+
+load_dotenv()
+
+UPLOAD_MAX_FILE_BYTES = int(os.getenv('UPLOAD_MAX_FILE_BYTES', str(300 * 1024 * 1024)))  # 파일 하나 최대 크기 (기본 300MB)
+UPLOAD_MAX_REQUEST_BYTES = int(os.getenv('UPLOAD_MAX_REQUEST_BYTES', str(1024 * 1024 * 1024)))  # 요청 전체 최대 크기 (기본 1GB)
+UPLOAD_MAX_FIELD_BYTES = 1024 * 1024  # 파일이 아닌 입력값(title, description 등) 하나의 최대 크기
+
+ERROR_FILE_TOO_LARGE = f'파일 하나는 최대 {UPLOAD_MAX_FILE_BYTES // (1024 * 1024)}MB 까지 업로드할 수 있습니다.'
+ERROR_REQUEST_TOO_LARGE = f'한 번에 최대 {UPLOAD_MAX_REQUEST_BYTES // (1024 * 1024)}MB 까지 업로드할 수 있습니다.'
+ERROR_FIELD_TOO_LARGE = '입력값이 너무 깁니다.'
+ERROR_BAD_MULTIPART = '잘못된 multipart/form-data 요청입니다.'
+
+
+@dataclass
+class StoredFile:
+    path: str  # 저장된 경로 (post_files.stored_key 에 들어가는 값)
+    filename: str  # 사용자가 올린 원래 파일명
+    content_type: str | None = None
+    size: int = 0
+    sha256: str = ''
+    deduplicated: bool = False  # 같은 내용의 파일이 이미 있어서 새로 저장하지 않음
+    temp_path: str | None = None  # 받는 중인 임시파일 (저장소에 등록되면 None)
+
+
+@dataclass
+class UploadForm:
+    fields: dict[str, list[str]] = field(default_factory=dict)
+    files: list[StoredFile] = field(default_factory=list)
+
+
+def remove_files(files: list[StoredFile]):
+    # 저장 실패(검증 오류/DB 오류 등) 시 이미 쓴 파일 정리 (다른 글이 같은 내용을 참조하고 있으면 객체는 남음)
+    for stored in files:
+        if stored.temp_path is not None:
+            posts_storage.discard_temp(stored.temp_path)
+        else:
+            posts_storage.release(stored.path, stored.sha256)
+
+
+def _open(path: str):
+    return open(path, 'xb')  # uuid 경로라 겹치지 않지만, 혹시 있으면 덮어쓰지 않고 오류
+
+
+def _write(buffer, hasher, data: bytes):
+    # 스레드에서 실행 (hashlib 은 큰 데이터를 계산할 때 GIL 을 놓음)
+    buffer.write(data)
+    hasher.update(data)
+
+
+class _MultipartReceiver:
+    # 파서 콜백은 동기 함수라서 이벤트만 모아두고, 디스크 쓰기는 청크마다 비동기로 처리
+
+    def __init__(self, file_field: str):
+        self.file_field = file_field
+        self.form = UploadForm()
+        self.events: list[tuple[str, object]] = []
+        self.ended = False
+        self._header_field = b''
+        self._header_value = b''
+        self._headers: dict[bytes, bytes] = {}
+        # 현재 파트
+        self._name: str | None = None
+        self._value: bytearray | None = None  # 일반 입력값
+        self._stored: StoredFile | None = None  # 파일
+        self._buffer = None
+        self._hasher = None
+
+    def callbacks(self) -> dict:
+        return {
+            'on_header_field': self._on_header_field,
+            'on_header_value': self._on_header_value,
+            'on_header_end': self._on_header_end,
+            'on_headers_finished': lambda: self.events.append(('headers', self._take_headers())),
+            'on_part_data': lambda data, start, end: self.events.append(('data', data[start:end])),
+            'on_part_end': lambda: self.events.append(('end', None)),
+            'on_end': self._on_end,
+        }
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b''
+        self._header_value = b''
+
+    def _take_headers(self) -> dict[bytes, bytes]:
+        headers, self._headers = self._headers, {}
+        return headers
+
+    def _on_end(self):
+        self.ended = True
+
+    async def process_events(self):
+        events, self.events = self.events, []
+        for kind, value in events:
+            if kind == 'headers':
+                await self._begin_part(value)
+            elif kind == 'data':
+                await self._part_data(value)
+            else:
+                await self._end_part()
+
+    async def _begin_part(self, headers: dict[bytes, bytes]):
+        _, options = parse_options_header(headers.get(b'content-disposition'))
+        self._name = options.get(b'name', b'').decode('utf-8', errors='replace')
+        filename = options.get(b'filename')
+        if filename is None:  # 일반 입력값
+            self._value = bytearray()
+            return
+        # 파일 선택 없이 보낸 빈 파트(filename="")나 받지 않는 이름의 파일은 버림
+        filename = os.path.basename(filename.decode('utf-8', errors='replace').replace('\\', '/'))
+        if not filename or self._name != self.file_field:
+            return
+        content_type = headers.get(b'content-type')
+        self._stored = StoredFile(
+            path=posts_storage.new_link_path(filename),
+            filename=filename,
+            content_type=content_type.decode('latin-1') if content_type else None,
+            temp_path=await asyncio.to_thread(posts_storage.new_temp_path),
+        )
+        self._buffer = await asyncio.to_thread(_open, self._stored.temp_path)
+        self.form.files.append(self._stored)  # 열자마자 등록 (중간에 실패해도 정리되도록)
+        self._hasher = hashlib.sha256()
+
+    async def _part_data(self, data: bytes):
+        if self._stored is not None:
+            self._stored.size += len(data)
+            if self._stored.size > UPLOAD_MAX_FILE_BYTES:
+                raise HTTPException(status_code=413, detail=ERROR_FILE_TOO_LARGE)
+            await asyncio.to_thread(_write, self._buffer, self._hasher, data)
+        elif self._value is not None:
+            if len(self._value) + len(data) > UPLOAD_MAX_FIELD_BYTES:
+                raise HTTPException(status_code=413, detail=ERROR_FIELD_TOO_LARGE)
+            self._value += data
+
+    async def _end_part(self):
+        if self._stored is not None:
+            await asyncio.to_thread(self._buffer.close)
+            self._buffer = None
+            stored = self._stored
+            stored.sha256 = self._hasher.hexdigest()
+            created = await asyncio.to_thread(posts_storage.commit, stored.temp_path, stored.sha256, stored.path)
+            stored.deduplicated, stored.temp_path = not created, None
+        elif self._value is not None:
+            self.form.fields.setdefault(self._name, []).append(self._value.decode('utf-8', errors='replace'))
+        self._name = self._value = self._stored = self._buffer = self._hasher = None
+
+    async def close(self):
+        # 오류로 중간에 끝났을 때 열려 있는 파일 닫기
+        if self._buffer is not None:
+            await asyncio.to_thread(self._buffer.close)
+            self._buffer = None
+
+
+async def _receive_multipart(request: Request, boundary: bytes, file_field: str) -> UploadForm:
+    receiver = _MultipartReceiver(file_field)
+    parser = MultipartParser(boundary, receiver.callbacks())
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > UPLOAD_MAX_REQUEST_BYTES:
+                raise HTTPException(status_code=413, detail=ERROR_REQUEST_TOO_LARGE)
+            parser.write(chunk)
+            await receiver.process_events()
+        parser.finalize()
+        await receiver.process_events()
+        if not receiver.ended:  # 마지막 boundary 전에 본문이 끝남
+            raise HTTPException(status_code=400, detail=ERROR_BAD_MULTIPART)
+    except BaseException as e:  # 413/400, 클라이언트 연결 끊김(ClientDisconnect), 취소 등 → 쓰던 파일 정리
+        await receiver.close()
+        await asyncio.to_thread(remove_files, receiver.form.files)
+        if isinstance(e, MultipartParseError):
+            raise HTTPException(status_code=400, detail=ERROR_BAD_MULTIPART)
+        raise
+    return receiver.form
+
+
+async def receive_upload(request: Request, file_field: str) -> UploadForm:
+    # 요청 본문 → 입력값 + 저장된 파일 (파일은 file_field 이름의 파트만 받음)
+    content_length = request.headers.get('content-length')
+    if content_length and content_length.isdigit() and int(content_length) > UPLOAD_MAX_REQUEST_BYTES:
+        raise HTTPException(status_code=413, detail=ERROR_REQUEST_TOO_LARGE)  # 본문을 받기 전에 거절
+
+    content_type, options = parse_options_header(request.headers.get('content-type'))
+    if content_type == b'multipart/form-data':
+        boundary = options.get(b'boundary')
+        if not boundary:
+            raise HTTPException(status_code=400, detail=ERROR_BAD_MULTIPART)
+        return await _receive_multipart(request, boundary, file_field)
+
+    # 파일 없는 application/x-www-form-urlencoded 요청도 기존처럼 받음
+    form = UploadForm()
+    if content_type == b'application/x-www-form-urlencoded':
+        for name, value in (await request.form()).multi_items():
+            form.fields.setdefault(name, []).append(value)
+    return form
+
+
+async def validate_form(upload: UploadForm, model: type[BaseModel], list_fields: tuple[str, ...] = ()):
+    # 입력값 → pydantic 모델 (Form() 으로 받을 때처럼 오류는 422), 검증에 실패하면 저장한 파일은 삭제 (스레드에서)
+    data = {
+        name: values if name in list_fields else values[-1]
+        for name, values in upload.fields.items()
+        if name in model.model_fields
+    }
+    try:
+        return model.model_validate(data)
+    except ValidationError as e:
+        await asyncio.to_thread(remove_files, upload.files)
+        raise RequestValidationError([{**error, 'loc': ('body', *error['loc'])} for error in e.errors()])
+
+
+def openapi_body(model: type[BaseModel], file_field: str) -> dict:
+    # 본문을 직접 읽는 라우터도 /docs 에 multipart 입력 폼이 보이도록
+    schema = model.model_json_schema()
+    schema['properties'][file_field] = {'type': 'array', 'items': {'type': 'string', 'format': 'binary'}}
+    return {
+        'requestBody': {
+            'required': True,
+            'content': {'multipart/form-data': {'schema': schema}},
+        },
+    }
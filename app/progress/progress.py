@@ -2,8 +2,9 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response
 
+from app import db_routing, db_writes
 from app.database import get_db
 from app.progress.progress_services import ProgressServices
 from app.progress import progress_schemas
@@ -19,52 +20,70 @@ def get_services(db: AsyncSession = Depends(get_db)) -> ProgressServices:
     return ProgressServices(db)
 
 
+# 조회 전용 - 읽기 복제본 세션 (복제본이 없거나 지연되면 primary, app/db_routing.py 참고)
+def get_read_services(db: AsyncSession = Depends(db_routing.get_read_db)) -> ProgressServices:
+    return ProgressServices(db)
+
+
 @router.get('/progress/{post_id}', response_model=progress_schemas.ProgressOut, status_code=200)
 async def get_progress(
         post_id: int,
+        response: Response,
         _: users_models.User = Depends(dependencies.user_only),
-        service: ProgressServices = Depends(get_services)
+        service: ProgressServices = Depends(get_read_services)
 ):
-    return await service.get_progress(
+    progress = await service.get_progress(
         post_id=post_id,
     )
+    db_writes.set_etag(response, progress)  # 수정/삭제 시 If-Match 로 다시 보낼 버전
+    return progress
 
 
 @router.post('/progress/{post_id}', response_model=progress_schemas.ProgressOut, status_code=201)
 async def create_progress(
         payload: progress_schemas.ProgressCreate,
         post_id: int,
+        response: Response,
         current_user: users_models.User = Depends(dependencies.staff_only),
         service: ProgressServices = Depends(get_services)
 ):
-    return await service.create_progress(
+    progress = await service.create_progress(
         current_user,
         payload=payload,
         post_id=post_id,
     )
+    db_writes.set_etag(response, progress)
+    return progress
 
 
 @router.put('/progress/{progress_id}', response_model=progress_schemas.ProgressOut, status_code=201)
 async def update_progress(
         payload: progress_schemas.ProgressUpdate,
         progress_id: int,
+        response: Response,
+        if_match: str = Header(None),  # 조회 때 받은 ETag, 그 사이 다른 사람이 수정했으면 409 (없으면 버전 확인 안함)
         current_user: users_models.User = Depends(dependencies.staff_only),
         service: ProgressServices = Depends(get_services)
 ):
-    return await service.update_progress(
+    progress = await service.update_progress(
         current_user,
         payload=payload,
         progress_id=progress_id,
+        version=db_writes.if_match_version(if_match),
     )
+    db_writes.set_etag(response, progress)  # 수정된 새 버전
+    return progress
 
 
 @router.delete('/progress/{progress_id}', status_code=204)
 async def delete_progress(
         progress_id: int,
+        if_match: str = Header(None),  # 조회 때 받은 ETag (없으면 버전 확인 안함)
         current_user: users_models.User = Depends(dependencies.admin_only),
         service: ProgressServices = Depends(get_services),
 ):
     await service.delete_progress(
         progress_id=progress_id,
         current_user=current_user,
+        version=db_writes.if_match_version(if_match),
     )
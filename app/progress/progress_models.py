@@ -16,6 +16,7 @@ class Progress(Base):
     title = Column(String(50),nullable=True)
     created_at = Column(DateTime,default=datetime.utcnow)  # 세계 포준시로 표시함. 한국 표준시로 바꾸려면 프론트엔드에서 실행(UTC로 저장하고, 필요할 때 KST로 변환해서 사용하는 것이 안전.)
     updated_at = Column(DateTime, onupdate=datetime.utcnow, nullable=True)  # 업데이트 시간 (로직에서 await db.commit() 시 자동적용)
+    version = Column(Integer, nullable=False, default=1, server_default='1')  # 낙관적 동시성용 버전 (수정할 때마다 +1, 응답의 ETag)
 
     post_id = Column(Integer,ForeignKey('posts.id',ondelete='CASCADE'),unique=True,nullable=True)
     post = relationship('Post',back_populates='progress',passive_deletes=True)
@@ -22,6 +22,7 @@ class ProgressUpdate(ProgressBase):
 
 
 class ProgressOut(ProgressBase):
+    version: int  # 수정/삭제 시 If-Match 로 보낼 버전 (응답 헤더 ETag 와 같음)
     created_at:datetime
     updated_at:datetime|None
     creator:users_schemas.UserOut
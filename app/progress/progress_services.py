@@ -1,14 +1,38 @@
 # app/progress/progress_services.py
-from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
+from app import db_writes  # INSERT/UPDATE ... RETURNING 공통 경로
 from app.progress import progress_models, progress_schemas
 from app.progress_detail_roro import progress_detail_roro_models
 from app.users import users_models
 
 ERROR_NOT_FOUND = 'Progress Detail 을 찾을 수 없습니다. (404 Not Found)'
+ERROR_FORBIDDEN = '수정 권한이 없습니다.'
+
+# INSERT/UPDATE ... RETURNING 으로 돌려받을 컬럼
+_PROGRESS_RETURNING = [
+    progress_models.Progress.id,
+    progress_models.Progress.title,
+    progress_models.Progress.created_at,
+    progress_models.Progress.updated_at,
+    progress_models.Progress.version,
+    progress_models.Progress.post_id,
+]
+
+
+def _written_out(row, current_user: users_models.User, progress_detail_roro: list) -> dict:
+    # RETURNING 으로 받은 행 → ProgressOut (작성자는 요청한 사용자, 게시글은 id 만 필요)
+    return {
+        'title': row.title,
+        'created_at': row.created_at,
+        'updated_at': row.updated_at,
+        'version': row.version,
+        'creator': db_writes.user_out(current_user),
+        'progress_detail_roro': progress_detail_roro,
+        'post': {'id': row.post_id},
+    }
 
 
 class ProgressServices:
@@ -39,83 +63,71 @@ class ProgressServices:
             payload: progress_schemas.ProgressCreate,
             post_id: int,
     ):
-        new_progress = progress_models.Progress(
-            payload.model_dump(
-                exclude_unset=True,
-            ),
-            creator_id=current_user.id,
-            post_id=post_id,
+        # INSERT ... RETURNING 한 문장으로 저장된 행을 바로 받음
+        row = await db_writes.insert_returning(
+            self.db,
+            progress_models.Progress,
+            {
+                **payload.model_dump(exclude_unset=True),
+                'creator_id': current_user.id,
+                'post_id': post_id,
+            },
+            _PROGRESS_RETURNING,
         )
-        self.db.add(new_progress)
         await self.db.commit()
 
-        result = await self.db.execute(
-            select(progress_models.Progress)
-            .where(progress_models.Progress.post_id == post_id)
-            .options(
-                selectinload(progress_models.Progress.creator),
-                selectinload(progress_models.Progress.post),
-                selectinload(progress_models.Progress.progress_detail_roro)
-                .selectinload(progress_detail_roro_models.ProgressRoRo.progress_detail_roro_detail),
-            )
-        )
-
-        progress = result.scalar_one_or_none()
-
-        return progress
+        # 방금 만든 progress 에는 RoRo 가 아직 없음
+        return _written_out(row, current_user, [])
 
     async def update_progress(
             self,
             current_user: users_models.User,
             payload: progress_schemas.ProgressUpdate,
             progress_id: int,
+            version: int | None = None,  # If-Match 로 받은 버전 (None 이면 버전 확인 안함)
     ):
-        progress = await self.db.get(
-            progress_models.Progress, progress_id)
-
-        if not progress:
-            raise HTTPException(status_code=404, detail=ERROR_NOT_FOUND)  # 없으면 404 에러
-
-        if progress.creator_id != current_user.id:
-            raise HTTPException(status_code=403, detail="수정 권한이 없습니다.")  # 작성자만 수정 가능
-
-        await self.db.execute(
-            update(progress_models.Progress)
-            .where(progress_models.Progress.id == progress_id)
-            .values(**payload.model_dump(
-                exclude_unset=True, )
-                    ))
+        # 조회(get) 없이 UPDATE ... WHERE id = ? AND creator_id = ? [AND version = ?] RETURNING 한 문장으로 (0행이면 404/403/409 구분)
+        row = await db_writes.execute_owned(
+            self.db,
+            db_writes.owned_update(progress_models.Progress, progress_id, current_user.id, version)
+            .values(**payload.model_dump(exclude_unset=True))
+            .returning(*_PROGRESS_RETURNING),
+            progress_models.Progress,
+            progress_id,
+            current_user.id,
+            ERROR_NOT_FOUND,
+            ERROR_FORBIDDEN,
+        )
         await self.db.commit()
 
+        # 응답에 포함되는 하위 RoRo 목록만 조회 (progress/작성자/게시글은 다시 조회하지 않음)
         result = await self.db.execute(
-            select(progress_models.Progress)
-            .where(progress_models.Progress.id == progress_id)
+            select(progress_detail_roro_models.ProgressRoRo)
+            .where(progress_detail_roro_models.ProgressRoRo.progress_id == progress_id)
             .options(
-                selectinload(progress_models.Progress.creator),
-                selectinload(progress_models.Progress.post),
-                selectinload(progress_models.Progress.progress_detail_roro)
-                .selectinload(progress_detail_roro_models.ProgressRoRo.progress_detail_roro_detail),
+                selectinload(progress_detail_roro_models.ProgressRoRo.creator),
+                selectinload(progress_detail_roro_models.ProgressRoRo.progress_detail_roro_detail),
             )
         )
 
-        progress = result.scalar_one_or_none()
-
-        return progress
+        return _written_out(row, current_user, result.scalars().all())
 
     async def delete_progress(
             self,
             current_user: users_models.User,
             progress_id: int,
+            version: int | None = None,  # If-Match 로 받은 버전 (None 이면 버전 확인 안함)
     ):
-        progress = await self.db.get(progress_models.Progress, progress_id)
-        if not progress:
-            if not progress:
-                raise HTTPException(status_code=404, detail='Progress not found')
-            if progress.creator_id != current_user.id:
-                raise HTTPException(status_code=403, detail='관리자만 삭제할 수 있습니다.')
-
-        await self.db.execute(
-            delete(progress_models.Progress)
-            .where(progress_models.Progress.id == progress_id)
+        # 조회(get) 없이 DELETE ... WHERE id = ? AND creator_id = ? [AND version = ?] 한 문장으로 (0행이면 404/403/409 구분)
+        # (기존에는 권한 확인이 404 분기 안에 들어가 있어서 실행되지 않았음)
+        await db_writes.execute_owned(
+            self.db,
+            db_writes.owned_delete(progress_models.Progress, progress_id, current_user.id, version)
+            .returning(progress_models.Progress.id),
+            progress_models.Progress,
+            progress_id,
+            current_user.id,
+            'Progress not found',
+            '관리자만 삭제할 수 있습니다.',
         )
         await self.db.commit()
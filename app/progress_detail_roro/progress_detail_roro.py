@@ -1,10 +1,11 @@
 # app/progress_detail_roro/progress_detail_roro.py
-from typing import List
+from typing import Annotated, Any, List, Literal
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, Header, Query, Response
 
 from sqlalchemy.ext.asyncio import AsyncSession  # 비동기 SQLAlchemy 세션
 
+from app import db_routing, db_writes
 from app.database import get_db
 from app.progress_detail_roro import progress_detail_roro_schemas
 from app.progress_detail_roro.progress_detail_roro_services import ProgressRoRoServices
@@ -16,43 +17,126 @@ router = APIRouter(
     tags=['ProgressRoRo'],
 )
 
+# progress 구분 없는 전체 부킹 장부 (main.py 에서 따로 등록)
+ledger_router = APIRouter(
+    prefix='/api/roro',
+    tags=['ProgressRoRo'],
+)
+
 
 def get_services(db: AsyncSession = Depends(get_db)) -> ProgressRoRoServices:
     return ProgressRoRoServices(db)
 
 
-@router.get('/roro/{progress_id}', response_model=List[progress_detail_roro_schemas.ProgressDetailRoRoOut], status_code=200)
+# 조회 전용 - 읽기 복제본 세션 (복제본이 없거나 지연되면 primary, app/db_routing.py 참고)
+def get_read_services(db: AsyncSession = Depends(db_routing.get_read_db)) -> ProgressRoRoServices:
+    return ProgressRoRoServices(db)
+
+
+def _split_fields(fields: str | None) -> list[str] | None:
+    return [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+
+
+# 전체 부킹 장부 - 조건 검색 + keyset 페이지네이션 (예: ?etd_from=2025-07-07&etd_to=2025-07-13&partner=X)
+# 다음 페이지는 응답의 next_cursor 를 cursor 로, fields/details 는 아래 progress 별 목록과 같음
+@ledger_router.get('', response_model=progress_detail_roro_schemas.RoRoLedgerPageOut,
+                   response_model_exclude_unset=True, status_code=200)
+async def list_roro_ledger(
+        filters: Annotated[progress_detail_roro_schemas.RoRoLedgerFilters, Query()],
+        size: int = 50,
+        cursor: str | None = None,
+        sort: Literal['latest', 'etd'] = 'latest',  # etd = 출항일 늦은 순 (ETD 없는 부킹 제외)
+        count: Literal['exact', 'estimate', 'none'] = 'none',  # 전체 개수 집계 방식 (기본은 집계 안함)
+        fields: str | None = None,
+        details: bool = False,
+        _: users_models.User = Depends(dependencies.staff_only),
+        service: ProgressRoRoServices = Depends(get_read_services)
+):
+    return await service.list_roro_ledger(
+        filters=filters,
+        size=size,
+        cursor=cursor,
+        sort=sort,
+        count=count,
+        fields=_split_fields(fields),
+        details=details,
+    )
+
+
+# 부킹 목록 - fields 로 필요한 컬럼만 (예: ?fields=BKNo,VESSEL,ETD,ETA,PROFIT_USD&details=false), 없으면 전체
+# 요청하지 않은 필드는 응답에서 빠짐 (id 는 항상 포함)
+@router.get('/roro/{progress_id}', response_model=List[progress_detail_roro_schemas.ProgressDetailRoRoFieldsOut],
+            response_model_exclude_unset=True, status_code=200)
 async def get_progress_roro(
         progress_id: int,
+        fields: str | None = None,  # 쉼표로 구분한 필드 이름
+        details: bool = True,  # 디테일(차량) 목록 포함 여부
         _: users_models.User = Depends(dependencies.staff_only),
-        service: ProgressRoRoServices = Depends(get_services)
+        service: ProgressRoRoServices = Depends(get_read_services)
 ):
     return await service.get_progress_roro(
         progress_id=progress_id,
+        fields=_split_fields(fields),
+        details=details,
     )
 
 @router.post('/roro/{progress_id}',response_model=progress_detail_roro_schemas.ProgressDetailRoRoOut,status_code=201)
 async def create_progress_roro(
         progress_id:int,
         payload:progress_detail_roro_schemas.ProgressDetailRoRoCreate,
+        response: Response,
         current_user:users_models.User=Depends(dependencies.staff_only),
         service:ProgressRoRoServices=Depends(get_services)
 ):
-    return await service.create_progress_roro(
+    progress_roro = await service.create_progress_roro(
         progress_id=progress_id,
         payload=payload,
         current_user=current_user,
     )
+    db_writes.set_etag(response, progress_roro)
+    return progress_roro
+
+# [관리자] 환율 정정 등으로 저장된 이익(PROFIT_USD/PROFIT_KRW) 을 조건(progress, ETD 범위, partner)에 맞게 일괄 재계산
+@router.post('/roro/profit/recompute',response_model=progress_detail_roro_schemas.ProfitRecomputeOut,status_code=200)
+async def recompute_progress_roro_profit(
+        payload:progress_detail_roro_schemas.ProfitRecomputeRequest,
+        _:users_models.User=Depends(dependencies.admin_only),
+        service:ProgressRoRoServices=Depends(get_services)
+):
+    return await service.recompute_profits(payload)
+
+
+# 여러 부킹을 한 번에 생성 (선박 매니페스트 일괄 등록) - 항목별 검증 오류는 errors 로 반환
+# partial=false(기본): 하나라도 오류면 아무것도 저장하지 않고 422 / partial=true: 오류 항목만 빼고 저장
+@router.post('/roro/{progress_id}/batch',response_model=progress_detail_roro_schemas.ProgressDetailRoRoBatchOut,status_code=201)
+async def create_progress_roro_batch(
+        progress_id:int,
+        items:List[Any]=Body(...),  # ProgressDetailRoRoCreate 목록 (항목별로 검증하기 위해 원본 그대로 받음)
+        partial:bool=False,
+        current_user:users_models.User=Depends(dependencies.staff_only),
+        service:ProgressRoRoServices=Depends(get_services)
+):
+    return await service.create_progress_roro_batch(
+        progress_id=progress_id,
+        items=items,
+        current_user=current_user,
+        partial=partial,
+    )
 
 @router.patch('/roro/{progress_roro_id}',response_model=progress_detail_roro_schemas.ProgressDetailRoRoOut,status_code=201)
 async def patch_progress_roro(
         progress_roro_id:int,
         payload:progress_detail_roro_schemas.ProgressDetailRoRoUpdate,
+        response: Response,
+        if_match: str = Header(None),  # 조회 때 받은 version(ETag), 그 사이 다른 스태프가 수정했으면 409 (없으면 버전 확인 안함)
         current_user:users_models.User=Depends(dependencies.staff_only),
         service:ProgressRoRoServices=Depends(get_services)
 ):
-    return await service.patch_progress_roro(
+    progress_roro = await service.patch_progress_roro(
         progress_roro_id=progress_roro_id,
         payload=payload,
         current_user=current_user,
+        version=db_writes.if_match_version(if_match),
     )
+    db_writes.set_etag(response, progress_roro)  # 수정된 새 버전
+    return progress_roro
@@ -1,7 +1,8 @@
 # app/progress_roro/progress_roro_models.py
 # DB에 저장될 사용자 정보를 정의하는 ORM 모델
 
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, ARRAY, Boolean, Float
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, String, Boolean, Float, Index
+from sqlalchemy.dialects.postgresql import ARRAY  # 배열 포함 검색(@>, contains) 은 PostgreSQL ARRAY 에만 있음
 from sqlalchemy.orm import relationship
 
 from datetime import datetime
@@ -54,8 +55,9 @@ class ProgressRoRo(Base):
     created_at = Column(DateTime,
                         default=datetime.utcnow)  # 세계 포준시로 표시함. 한국 표준시로 바꾸려면 프론트엔드에서 실행(UTC로 저장하고, 필요할 때 KST로 변환해서 사용하는 것이 안전.)
     updated_at = Column(DateTime, onupdate=datetime.utcnow, nullable=True)  # 업데이트 시간 (로직에서 await db.commit() 시 자동적용)
+    version = Column(Integer, nullable=False, default=1, server_default='1')  # 낙관적 동시성용 버전 (수정할 때마다 +1, 응답의 ETag)
 
-    progress_id = Column(Integer, ForeignKey('progress.id', ondelete='CASCADE'), nullable=True)
+    progress_id = Column(Integer, ForeignKey('progress.id', ondelete='CASCADE'), nullable=True, index=True)  # progress 별 RoRo 조회용 인덱스
     progress = relationship('Progress', back_populates='progress_detail_roro', passive_deletes=True)
 
     progress_detail_roro_detail = relationship('ProgressRoRoDetail', back_populates='progress_detail_roro', cascade='all, delete-orphan',
@@ -69,6 +71,19 @@ class ProgressRoRo(Base):
     # creator = relationship('User',backref=backref('shipments',cascade='all, delete'),passive_deletes=True)  # creator는 create를 한 사람을 User 객체로 나타내고 user.shipmets를 통해 user 에서도 연결된 posts 를 가져올 수 있음 passive_deletes=True(user 삭제시 shipment 삭제를 DB에 위임)
 
 
+# 전체 부킹 장부 인덱스 (alembic f1a6c3e8d924) - 최신순/출항일순 keyset 페이지, 거래처 등 + 출항일 범위, 배열 포함 검색
+Index('ix_progress_detail_roro_created_at_id', ProgressRoRo.created_at.desc(), ProgressRoRo.id.desc())
+Index('ix_progress_detail_roro_etd_id', ProgressRoRo.ETD.desc(), ProgressRoRo.id.desc())
+Index('ix_progress_detail_roro_eta', ProgressRoRo.ETA)
+Index('ix_progress_detail_roro_atd', ProgressRoRo.ATD)
+Index('ix_progress_detail_roro_partner_etd', ProgressRoRo.PARTNER, ProgressRoRo.ETD)
+Index('ix_progress_detail_roro_shipper_etd', ProgressRoRo.SHIPPER, ProgressRoRo.ETD)
+Index('ix_progress_detail_roro_destination_etd', ProgressRoRo.DESTINATION, ProgressRoRo.ETD)
+Index('ix_progress_detail_roro_payment_etd', ProgressRoRo.PAYMENT, ProgressRoRo.ETD)
+Index('ix_progress_detail_roro_line', ProgressRoRo.LINE, postgresql_using='gin')
+Index('ix_progress_detail_roro_vessel', ProgressRoRo.VESSEL, postgresql_using='gin')
+
+
 class ProgressRoRoDetail(Base):
     __tablename__ = 'progress_detail_roro_detail'
     id = Column(Integer, primary_key=True, index=True)
@@ -77,6 +92,6 @@ class ProgressRoRoDetail(Base):
     EL = Column(Boolean, nullable=True)
     HBL = Column(String(50), nullable=True)
 
-    progress_detail_roro_id=Column(Integer,ForeignKey('progress_detail_roro.id',ondelete='CASCADE'),nullable=True)
+    progress_detail_roro_id=Column(Integer,ForeignKey('progress_detail_roro.id',ondelete='CASCADE'),nullable=True, index=True)  # RoRo 별 상세(차량) 조회용 인덱스
     progress_detail_roro = relationship('ProgressRoRo',back_populates='progress_detail_roro_detail',passive_deletes=True)
 
@@ -0,0 +1,68 @@
+# app/progress_detail_roro/progress_detail_roro_profit.py
+# RoRo 부킹 이익(PROFIT_USD / PROFIT_KRW) 계산
+# 생성/수정/일괄생성/재계산에서 같은 공식을 쓰도록 한 곳에 모아둠
+# 부킹 여러 건을 NumPy 배열로 한 번에 계산 (환율 정정 후 수천 건 재계산용)
+#
+# 매입(달러) = SMALL*BUY_SMALL + S_SUV*BUY_S_SUV + SUV*BUY_SUV + RV_CARGO*BUY_RV_CARGO + SPECIAL*BUY_SPECIAL + CBM*BUY_CBM
+# 기타(원화) = HC + WFG + SECURITY + CARRIER + PARTNER_FEE*RATE
+# PROFIT_USD = (SELL - 매입) + 기타 // RATE - OTHER
+# PROFIT_KRW = (SELL - 매입) * RATE + 기타 + OTHER
+# (비어 있는 값은 0 으로 계산)
+# RATE 가 비어 있거나 0 이면 PROFIT_USD 는 계산할 수 없으므로 None (PROFIT_KRW 는 그대로 계산)
+
+import math
+
+import numpy as np
+
+# 공식에 쓰이는 컬럼 (재계산 job 에서 이 순서로 SELECT)
+PROFIT_FIELDS = (
+    'SMALL', 'BUY_SMALL', 'S_SUV', 'BUY_S_SUV', 'SUV', 'BUY_SUV', 'RV_CARGO', 'BUY_RV_CARGO',
+    'SPECIAL', 'BUY_SPECIAL', 'CBM', 'BUY_CBM', 'SELL', 'HC', 'WFG', 'SECURITY', 'CARRIER',
+    'PARTNER_FEE', 'OTHER', 'RATE',
+)
+
+
+def profit_arrays(columns: dict[str, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    # 컬럼별 float64 배열(None 은 0 으로 채운 상태) → (PROFIT_USD, PROFIT_KRW) 배열, RATE 가 0 인 자리의 USD 는 NaN
+    c = columns
+    rate = c['RATE']
+    buy = (
+        c['SMALL'] * c['BUY_SMALL']
+        + c['S_SUV'] * c['BUY_S_SUV']
+        + c['SUV'] * c['BUY_SUV']
+        + c['RV_CARGO'] * c['BUY_RV_CARGO']
+        + c['SPECIAL'] * c['BUY_SPECIAL']
+        + c['CBM'] * c['BUY_CBM']
+    )  # 달러
+    other = c['HC'] + c['WFG'] + c['SECURITY'] + c['CARRIER'] + c['PARTNER_FEE'] * rate  # 원화
+    margin = c['SELL'] - buy
+
+    zero_rate = rate == 0
+    safe_rate = np.where(zero_rate, 1.0, rate)  # 0 으로 나누지 않도록 (결과는 아래에서 NaN 으로 덮어씀)
+    usd = margin + np.floor_divide(other, safe_rate) - c['OTHER']  # floor_divide = 파이썬 // 와 같은 내림 나눗셈
+    usd = np.where(zero_rate, np.nan, usd)
+    krw = margin * rate + other + c['OTHER']
+    return usd, krw
+
+
+def columns_from_rows(rows, fields=PROFIT_FIELDS) -> dict[str, np.ndarray]:
+    # 객체(pydantic/ORM/Row) 목록 → 컬럼별 float64 배열 (None 은 0)
+    return {
+        field: np.fromiter(((getattr(row, field) or 0) for row in rows), dtype=np.float64, count=len(rows))
+        for field in fields
+    }
+
+
+def compute_profits(items, rates: list[float | None] | None = None) -> list[tuple[float | None, float]]:
+    # 여러 부킹의 (PROFIT_USD, PROFIT_KRW) 를 한 번에 계산 (rates 를 주면 각 부킹의 RATE 대신 사용 - 환율 정정)
+    items = list(items)
+    if not items:
+        return []
+    columns = columns_from_rows(items)
+    if rates is not None:
+        columns['RATE'] = np.fromiter(((rate or 0) for rate in rates), dtype=np.float64, count=len(items))
+    usd, krw = profit_arrays(columns)
+    return [
+        (None if math.isnan(u) else u, k)
+        for u, k in zip(usd.tolist(), krw.tolist())
+    ]
@@ -20,7 +20,7 @@ class ProgressDetailRoRoDetailCreate(ProgressDetailRoRoDetailBase):
 
 
 class ProgressDetailRoRoDetailUpdate(ProgressDetailRoRoDetailBase):
-    pass
+    id: int | None = None  # 기존 디테일이면 id, 새로 추가하는 행이면 None
 
 
 class ProgressDetailRoRoDetailOut(ProgressDetailRoRoDetailBase):
@@ -73,11 +73,12 @@ class ProgressDetailRoRoCreate(ProgressDetailRoRoBase):
 
 
 class ProgressDetailRoRoUpdate(ProgressDetailRoRoBase):
-    pass
+    progress_detail_roro_detail: List[ProgressDetailRoRoDetailUpdate] = Field(default_factory=list)
 
 
 class ProgressDetailRoRoOut(ProgressDetailRoRoBase):
     id: int
+    version: int  # 수정 시 If-Match 로 보낼 버전
     created_at: datetime
     updated_at: datetime | None
     creator: users_schemas.UserOut
@@ -85,3 +86,69 @@ class ProgressDetailRoRoOut(ProgressDetailRoRoBase):
 
     class Config:
         from_attributes = True
+
+
+# 목록 조회 응답 - fields= 로 고른 컬럼만 내려주므로 모든 필드가 선택 (요청하지 않은 필드는 응답에서 빠짐)
+class ProgressDetailRoRoFieldsOut(ProgressDetailRoRoBase):
+    id: int
+    progress_id: int | None = None
+    version: int | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    creator: users_schemas.UserOut | None = None
+    progress_detail_roro_detail: List[ProgressDetailRoRoDetailOut] | None = None  # details=false 면 빠짐
+
+    class Config:
+        from_attributes = True
+
+
+# 전체 부킹 장부 조회 조건 (모두 선택, 여러 개면 AND) - 날짜 범위는 그 날 전체 포함
+class RoRoLedgerFilters(BaseModel):
+    etd_from: date | None = None
+    etd_to: date | None = None
+    eta_from: date | None = None
+    eta_to: date | None = None
+    atd_from: date | None = None
+    atd_to: date | None = None
+    partner: str | None = None
+    shipper: str | None = None
+    destination: str | None = None
+    payment: str | None = None
+    line: str | None = None  # LINE 배열에 이 값이 들어 있는 부킹
+    vessel: str | None = None  # VESSEL 배열에 이 값이 들어 있는 부킹
+    progress_id: int | None = None
+
+
+class RoRoLedgerPageOut(BaseModel):
+    items: List[ProgressDetailRoRoFieldsOut]
+    total: int | None  # count=none(기본) 이면 None
+    size: int
+    has_next: bool = False
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class BatchItemError(BaseModel):
+    index: int  # 요청 목록에서의 위치 (0부터)
+    errors: List[dict]  # pydantic 검증 오류 형식 (loc, msg, type)
+
+
+class ProgressDetailRoRoBatchOut(BaseModel):
+    items: List[ProgressDetailRoRoOut]  # 저장된 부킹 (요청 순서대로, 오류 항목 제외)
+    errors: List[BatchItemError] = Field(default_factory=list)  # partial=true 일 때 저장되지 않은 항목
+
+
+# 관리자 이익 재계산 (환율 정정 등) - 조건은 모두 선택, 여러 개면 AND
+class ProfitRecomputeRequest(BaseModel):
+    progress_id: int | None = None
+    etd_from: date | None = None  # ETD(출항일) 범위
+    etd_to: date | None = None
+    partner: str | None = None
+    rate: float | None = None  # 값을 주면 대상 부킹의 RATE 를 이 환율로 바꾸고 재계산
+
+
+class ProfitRecomputeOut(BaseModel):
+    matched: int  # 조건에 맞는 부킹 수
+    updated: int  # 이익이 실제로 바뀐 부킹 수
+    zero_rate: int  # RATE 가 비어 있거나 0 이라 PROFIT_USD 를 None 으로 저장한 부킹 수
+    chunks: int
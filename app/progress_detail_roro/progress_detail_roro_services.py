@@ -1,15 +1,54 @@
 # app/progress_roro/progress_roro_services.py
 
+import os
+from datetime import datetime, time
+
+from dotenv import load_dotenv
 from sqlalchemy.ext.asyncio import AsyncSession  # 비동기 DB 세션을 위한 import
-from sqlalchemy.orm import selectinload  # 관계 테이블을 효율적으로 같이 불러오는 옵션
-from sqlalchemy import select, update  # SQL 쿼리문 생성용 import
+from sqlalchemy import select, update, insert, delete, bindparam  # SQL 쿼리문 생성용 import
 
+from pydantic import ValidationError
 from fastapi import HTTPException  # FastAPI의 예외처리 (에러 발생 시 클라이언트로 코드/메시지 반환)
 
+from app import db_writes  # INSERT/UPDATE ... RETURNING 공통 경로
+from app import pagination  # keyset(cursor) 페이지네이션
 from app.progress_detail_roro import progress_detail_roro_models, progress_detail_roro_schemas  # 모델/스키마 import
+from app.progress_detail_roro import progress_detail_roro_profit  # 이익 계산 공식
 from app.users import users_models  # 사용자 모델 import
 
+load_dotenv()
+
 ERROR_NOT_FOUND = 'Progress를 찾을 수 없습니다.'  # 에러 메시지 상수화
+ERROR_FORBIDDEN = '수정 권한이 없습니다.'
+ERROR_UNKNOWN_FIELDS = '조회할 수 없는 필드입니다:'
+
+LEDGER_MAX_SIZE = 200  # 장부 조회 한 페이지 최대 부킹 수
+BATCH_MAX_ITEMS = 500  # 일괄 생성 한 번에 받을 수 있는 최대 부킹 수
+PROFIT_RECOMPUTE_CHUNK_SIZE = int(os.getenv('PROFIT_RECOMPUTE_CHUNK_SIZE', '1000'))  # 재계산 시 한 번에 읽고 UPDATE 할 부킹 수
+
+# 디테일(차량) 응답에 필요한 컬럼
+_DETAIL_COLUMNS = [
+    progress_detail_roro_models.ProgressRoRoDetail.id,
+    progress_detail_roro_models.ProgressRoRoDetail.MODEL,
+    progress_detail_roro_models.ProgressRoRoDetail.CHASSISNo,
+    progress_detail_roro_models.ProgressRoRoDetail.EL,
+    progress_detail_roro_models.ProgressRoRoDetail.HBL,
+]
+
+# 목록 조회에서 fields= 로 고를 수 있는 필드 (디테일 목록은 details 로 따로 선택)
+_LIST_FIELDS = tuple(
+    f for f in progress_detail_roro_schemas.ProgressDetailRoRoFieldsOut.model_fields
+    if f != 'progress_detail_roro_detail'
+)
+
+
+def _written_out(row, current_user: users_models.User, details) -> dict:
+    # RETURNING 으로 받은 마스터 행 + 디테일 행 → ProgressDetailRoRoOut (작성자는 요청한 사용자)
+    return {
+        **row._mapping,
+        'creator': db_writes.user_out(current_user),
+        'progress_detail_roro_detail': list(details),  # Row / ORM 객체 모두 from_attributes 로 검증됨
+    }
 
 
 class ProgressRoRoServices:
@@ -17,21 +56,142 @@ class ProgressRoRoServices:
     def __init__(self, db: AsyncSession):
         self.db = db  # 인스턴스의 db로 저장
 
-    # [READ] ProgressRoRo 여러 건 조회 (progress_id 기준, 자식까지)
-    async def get_progress_roro(self, progress_id: int):
-        # ProgressRoRo 테이블에서 progress_id가 일치하는 데이터 조회 쿼리 생성
-        base_query = await self.db.execute(
-            select(progress_detail_roro_models.ProgressRoRo)
-            # creator, progress_detail_roro_detail, progress 관계도 한 번에 select (N+1 쿼리 방지)
-            .options(
-                selectinload(progress_detail_roro_models.ProgressRoRo.creator),
-                selectinload(progress_detail_roro_models.ProgressRoRo.progress)
-                .selectinload(progress_detail_roro_models.ProgressRoRo.progress_detail_roro_detail),
-            )
-            .where(progress_detail_roro_models.ProgressRoRo.progress_id == progress_id)
+    @staticmethod
+    def _profit(payload) -> tuple[float | None, float]:
+        # RATE 가 비어 있거나 0 이면 PROFIT_USD 는 None (progress_detail_roro_profit 참고)
+        return progress_detail_roro_profit.compute_profits([payload])[0]
+
+    # [READ] ProgressRoRo 여러 건 조회 (progress_id 기준)
+    # ORM 객체를 만들지 않고 필요한 컬럼만 SELECT (요약 그리드는 BKNo, VESSEL, ETD, ETA, 이익 정도만 씀)
+    # - fields: 내려줄 필드 목록 (None 이면 전체, id 는 항상 포함), creator 를 고르면 users 를 JOIN
+    # - details: 디테일(차량) 목록 포함 여부 (포함하면 IN 조회 한 번 더)
+    async def get_progress_roro(self, progress_id: int, fields: list[str] | None = None, details: bool = True):
+        roro = progress_detail_roro_models.ProgressRoRo
+        stmt, fields = self._fields_query(fields)
+        result = await self.db.execute(stmt.where(roro.progress_id == progress_id).order_by(roro.id))
+        return await self._rows_out(result.all(), fields, details)  # 프론트엔드로 리턴
+
+    # [READ] 전체 부킹 장부 (progress 구분 없이 조건으로 조회, keyset 페이지네이션)
+    # sort: latest = 등록 최신순 (created_at desc, id desc) / etd = 출항일 늦은 순 (ETD 가 없는 부킹은 제외)
+    async def list_roro_ledger(
+            self,
+            filters: progress_detail_roro_schemas.RoRoLedgerFilters,
+            size: int = 50,
+            cursor: str | None = None,  # 이전 응답의 next_cursor / prev_cursor
+            sort: str = 'latest',
+            count: str = 'none',  # 'exact' / 'estimate' / 'none' (app/pagination.py 참고)
+            fields: list[str] | None = None,
+            details: bool = False,
+    ):
+        roro = progress_detail_roro_models.ProgressRoRo
+        size = min(max(size, 1), LEDGER_MAX_SIZE)
+        conditions = self._ledger_filters(filters)
+        if sort == 'etd':
+            conditions.append(roro.ETD.is_not(None))
+        stmt, fields, direction = self._ledger_query(conditions, size, cursor, sort, fields)
+
+        rows, next_cursor, prev_cursor, has_next = pagination.keyset_page(
+            (await self.db.execute(stmt)).all(),
+            size=size,
+            direction=direction,
+            has_prev=bool(cursor),
+            key=lambda r: (r.sort_key, r.id),
         )
-        base_query = base_query.scalars().all()  # 결과를 리스트로 반환 (여러 개 반환)
-        return base_query  # 프론트엔드로 리턴
+        total = await pagination.count_rows(self.db, select(roro.id).where(*conditions), count)
+        return {
+            'items': await self._rows_out(rows, fields, details),
+            'total': total,
+            'size': size,
+            'has_next': has_next,
+            'next_cursor': next_cursor,
+            'prev_cursor': prev_cursor,
+        }
+
+    @classmethod
+    def _ledger_query(cls, conditions: list, size: int, cursor: str | None, sort: str, fields: list[str] | None):
+        # 장부 한 페이지 SELECT → (SELECT 문, 정리된 fields, 방향) - 인덱스 사용 여부는 tests/test_query_plans.py 에서 확인
+        roro = progress_detail_roro_models.ProgressRoRo
+        sort_column = roro.ETD if sort == 'etd' else roro.created_at
+        stmt, fields = cls._fields_query(fields)
+        # 정렬 키는 fields 에 없어도 cursor 를 만들 수 있도록 따로 SELECT
+        stmt = stmt.add_columns(sort_column.label('sort_key')).where(*conditions)
+        stmt, direction = pagination.apply_keyset(stmt, sort_column, roro.id, cursor, size)
+        return stmt, fields, direction
+
+    @staticmethod
+    def _ledger_filters(filters: progress_detail_roro_schemas.RoRoLedgerFilters) -> list:
+        # 목록과 count 가 같이 쓰는 WHERE 조건 (날짜 범위는 그 날 전체를 포함)
+        roro = progress_detail_roro_models.ProgressRoRo
+        conditions = []
+        for column, date_from, date_to in (
+                (roro.ETD, filters.etd_from, filters.etd_to),
+                (roro.ETA, filters.eta_from, filters.eta_to),
+                (roro.ATD, filters.atd_from, filters.atd_to),
+        ):
+            if date_from is not None:
+                conditions.append(column >= datetime.combine(date_from, time.min))
+            if date_to is not None:
+                conditions.append(column <= datetime.combine(date_to, time.max))
+        for column, value in (
+                (roro.PARTNER, filters.partner),
+                (roro.SHIPPER, filters.shipper),
+                (roro.DESTINATION, filters.destination),
+                (roro.PAYMENT, filters.payment),
+                (roro.progress_id, filters.progress_id),
+        ):
+            if value is not None:
+                conditions.append(column == value)
+        # LINE/VESSEL 은 배열 - 값이 들어 있는지 (@> 연산자, GIN 인덱스 사용)
+        if filters.line is not None:
+            conditions.append(roro.LINE.contains([filters.line]))
+        if filters.vessel is not None:
+            conditions.append(roro.VESSEL.contains([filters.vessel]))
+        return conditions
+
+    @staticmethod
+    def _fields_query(fields: list[str] | None):
+        # fields → (SELECT 문, 정리된 fields) / 모르는 필드면 400
+        roro = progress_detail_roro_models.ProgressRoRo
+        if fields is None:
+            fields = list(_LIST_FIELDS)
+        unknown = [f for f in fields if f not in _LIST_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f'{ERROR_UNKNOWN_FIELDS} {", ".join(unknown)}')
+        fields = ['id'] + [f for f in dict.fromkeys(fields) if f != 'id']  # 중복 제거 (순서 유지)
+
+        stmt = select(*(getattr(roro, f) for f in fields if f != 'creator'))
+        if 'creator' in fields:
+            user = users_models.User
+            stmt = stmt.add_columns(
+                user.id.label('creator_id'), user.username, user.email, user.role,
+            ).outerjoin(user, user.id == roro.creator_id)
+        return stmt, fields
+
+    async def _rows_out(self, rows, fields: list[str], details: bool) -> list[dict]:
+        # _fields_query 결과 행 → ProgressDetailRoRoFieldsOut 모양의 dict (요청한 필드만)
+        items = []
+        for row in rows:
+            item = {f: row._mapping[f] for f in fields if f != 'creator'}
+            if 'creator' in fields:
+                item['creator'] = None if row.creator_id is None else {
+                    'id': row.creator_id, 'username': row.username, 'email': row.email, 'role': row.role,
+                }
+            items.append(item)
+
+        if details and items:
+            # 디테일은 부킹 id 목록으로 한 번에 조회해서 나눠 담음 (N+1 방지)
+            detail = progress_detail_roro_models.ProgressRoRoDetail
+            by_parent = {item['id']: [] for item in items}
+            result = await self.db.execute(
+                select(detail.progress_detail_roro_id, *_DETAIL_COLUMNS)
+                .where(detail.progress_detail_roro_id.in_(list(by_parent)))
+                .order_by(detail.id)
+            )
+            for row in result.all():
+                by_parent[row.progress_detail_roro_id].append(row)
+            for item in items:
+                item['progress_detail_roro_detail'] = by_parent[item['id']]
+        return items
 
     # [CREATE] ProgressRoRo(마스터)와 ProgressRoRoDetail(디테일) 생성
     async def create_progress_roro(
@@ -41,53 +201,112 @@ class ProgressRoRoServices:
             progress_id: int,  # 상위 progress 연결용 id
     ):
 
-        small = (payload.SMALL or 0) * (payload.BUY_SMALL or 0) # 달러
-        s_suv = (payload.S_SUV or 0) * (payload.BUY_S_SUV or 0) # 달러
-        suv = (payload.SUV or 0) * (payload.BUY_SUV or 0) # 달러
-        rv_cargo = (payload.RV_CARGO or 0) * (payload.BUY_RV_CARGO or 0) # 달러
-        special = (payload.SPECIAL or 0) * (payload.BUY_SPECIAL or 0) # 달러
-        cbm = (payload.CBM or 0) * (payload.BUY_CBM or 0) # 달러
-        other = (payload.HC or 0) + (payload.WFG or 0) + (payload.SECURITY or 0) + (payload.CARRIER or 0) + (
-                    (payload.PARTNER_FEE or 0) * (payload.RATE or 0)) # 원화
-        pu = ((payload.SELL or 0) - (small + s_suv + suv + rv_cargo + special + cbm)) + (other // (payload.RATE or 0)) - (payload.OTHER or 0)
-        pw = ((payload.SELL or 0) - (small + s_suv + suv + rv_cargo + special + cbm)) * (payload.RATE or 0) + other + (
-                    payload.OTHER or 0)
-
-        # ProgressRoRo(마스터) 객체 생성, 입력값을 모두 풀어서 넣음 (빈 칸은 자동 제외)
-        new_progress = progress_detail_roro_models.ProgressRoRo(
-            **payload.model_dump(
-                exclude_unset=True,
-                exclude={'progress_detail_roro_detail', 'PROFIT_USD', 'PROFIT_KRW'}),
-            # 입력받은 필드만 dict로 변환
-            PROFIT_USD=pu,
-            PROFIT_KRW=pw,
-            creator_id=current_user.id,  # 작성자 id 추가
-            progress_id=progress_id  # 상위 progress 연결
+        pu, pw = self._profit(payload)  # PROFIT_USD, PROFIT_KRW
+
+        # ProgressRoRo(마스터) INSERT ... RETURNING, 입력값을 모두 풀어서 넣음 (빈 칸은 자동 제외)
+        row = await db_writes.insert_returning(
+            self.db,
+            progress_detail_roro_models.ProgressRoRo,
+            {
+                **payload.model_dump(
+                    exclude_unset=True,
+                    exclude={'progress_detail_roro_detail', 'PROFIT_USD', 'PROFIT_KRW'}),
+                # 입력받은 필드만 dict로 변환
+                'PROFIT_USD': pu,
+                'PROFIT_KRW': pw,
+                'creator_id': current_user.id,  # 작성자 id 추가
+                'progress_id': progress_id,  # 상위 progress 연결
+            },
         )
-        self.db.add(new_progress)  # 세션에 마스터 객체 추가 (아직 DB반영X)
-        await self.db.flush()  # 실제 DB에 반영(commit 전), id 자동 생성 → 이후 디테일과 연결하려면 id 필요
-
-        # progress_detail_roro_detail(디테일) 배열을 반복, 각각 객체 생성 후 추가
-        for detail in payload.progress_detail_roro_detail:
-            detail_obj = progress_detail_roro_models.ProgressRoRoDetail(
-                **detail.model_dump(exclude_unset=True),  # 입력받은 필드만
-                progress_detail_roro_id=new_progress.id  # 마스터 id로 연결
+
+        # progress_detail_roro_detail(디테일) 배열을 INSERT 한 문장(multi-row VALUES)으로 저장하고 RETURNING 으로 받음
+        details = []
+        if payload.progress_detail_roro_detail:
+            result = await self.db.execute(
+                insert(progress_detail_roro_models.ProgressRoRoDetail)
+                .values([
+                    {**detail.model_dump(), 'progress_detail_roro_id': row.id}  # 마스터 id로 연결
+                    for detail in payload.progress_detail_roro_detail
+                ])
+                .returning(*_DETAIL_COLUMNS)
             )
-            self.db.add(detail_obj)  # 세션에 디테일 추가
+            details = result.all()
 
         await self.db.commit()  # 모든 insert를 실제 DB에 저장
 
-        # 새로 저장한 마스터/디테일을 selectinload로 한 번에 모두 다시 불러와서 반환 (프론트엔드 상태 동기화용)
-        result = await self.db.execute(
-            select(progress_detail_roro_models.ProgressRoRo)
-            .options(
-                selectinload(progress_detail_roro_models.ProgressRoRo.creator),
-                selectinload(progress_detail_roro_models.ProgressRoRo.progress),
-                selectinload(progress_detail_roro_models.ProgressRoRo.progress_detail_roro_detail),
-            ).where(progress_detail_roro_models.ProgressRoRo.progress_id == progress_id)
-        )
-        progress_roro = result.scalars().first()  # 리스트로 반환
-        return progress_roro
+        # 다시 조회하지 않고 RETURNING 결과 + current_user 로 응답 (프론트엔드 상태 동기화용)
+        return _written_out(row, current_user, details)
+
+    # [CREATE - 일괄] 여러 부킹(마스터 + 디테일)을 한 트랜잭션으로 생성 (선박 매니페스트 한 번에 등록)
+    async def create_progress_roro_batch(
+            self,
+            items: list,  # 검증 전 원본 dict 목록 (항목별로 검증해서 오류를 따로 알려주기 위함)
+            current_user: users_models.User,
+            progress_id: int,
+            partial: bool = False,  # True 면 오류 항목만 빼고 나머지는 저장, False 면 하나라도 오류면 전부 저장 안함
+    ):
+        if len(items) > BATCH_MAX_ITEMS:
+            raise HTTPException(status_code=413, detail=f'한 번에 최대 {BATCH_MAX_ITEMS}건까지 등록할 수 있습니다.')
+
+        # 1. 항목별 검증 (오류가 나도 다른 항목은 계속 검증)
+        errors = []
+        valid: list[tuple[int, progress_detail_roro_schemas.ProgressDetailRoRoCreate]] = []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, progress_detail_roro_schemas.ProgressDetailRoRoCreate.model_validate(item)))
+            except ValidationError as e:
+                errors.append({'index': index, 'errors': e.errors(include_url=False, include_context=False)})
+
+        # 2. 이익은 배치 전체를 한 번에 계산 (NumPy 배열 연산)
+        profits = progress_detail_roro_profit.compute_profits([payload for _, payload in valid])
+        bookings = [(payload, profit) for (_, payload), profit in zip(valid, profits)]
+
+        if errors and not partial:
+            raise HTTPException(status_code=422, detail=errors)
+        if not bookings:
+            return {'items': [], 'errors': errors}
+
+        # 3. 마스터 multi-row INSERT ... RETURNING (입력 순서대로 id 를 돌려받음)
+        masters = (await self.db.execute(
+            insert(progress_detail_roro_models.ProgressRoRo.__table__).returning(
+                *db_writes.returning_columns(progress_detail_roro_models.ProgressRoRo),
+                sort_by_parameter_order=True,
+            ),
+            [
+                {
+                    **payload.model_dump(exclude={'progress_detail_roro_detail', 'PROFIT_USD', 'PROFIT_KRW'}),
+                    'PROFIT_USD': pu,
+                    'PROFIT_KRW': pw,
+                    'creator_id': current_user.id,
+                    'progress_id': progress_id,
+                }
+                for payload, (pu, pw) in bookings
+            ],
+        )).all()
+
+        # 4. 모든 부킹의 디테일(차량)을 multi-row INSERT ... RETURNING 한 번으로
+        details_by_master: dict[int, list] = {master.id: [] for master in masters}
+        detail_params = [
+            {**detail.model_dump(), 'progress_detail_roro_id': master.id}
+            for master, (payload, _) in zip(masters, bookings)
+            for detail in payload.progress_detail_roro_detail
+        ]
+        if detail_params:
+            detail_table = progress_detail_roro_models.ProgressRoRoDetail.__table__
+            inserted = (await self.db.execute(
+                insert(detail_table).returning(
+                    *_DETAIL_COLUMNS, detail_table.c.progress_detail_roro_id, sort_by_parameter_order=True),
+                detail_params,
+            )).all()
+            for detail in inserted:
+                details_by_master[detail.progress_detail_roro_id].append(detail)
+
+        await self.db.commit()  # 전부 한 트랜잭션으로 저장
+
+        return {
+            'items': [_written_out(master, current_user, details_by_master[master.id]) for master in masters],
+            'errors': errors,
+        }
 
     # [UPDATE/PATCH] ProgressRoRo(마스터) + ProgressRoRoDetail(디테일) 동기화
     async def patch_progress_roro(
@@ -95,83 +314,151 @@ class ProgressRoRoServices:
             payload: progress_detail_roro_schemas.ProgressDetailRoRoUpdate,  # 변경할 데이터
             current_user: users_models.User,  # 권한 체크용 유저 정보
             progress_roro_id: int,  # 수정할 ProgressRoRo id
+            version: int | None = None,  # If-Match 로 받은 버전 (None 이면 버전 확인 안함)
     ):
-        # patch_progress_roro 내부에서
-        small = (payload.SMALL or 0) * (payload.BUY_SMALL or 0)
-        s_suv = (payload.S_SUV or 0) * (payload.BUY_S_SUV or 0)
-        suv = (payload.SUV or 0) * (payload.BUY_SUV or 0)
-        rv_cargo = (payload.RV_CARGO or 0) * (payload.BUY_RV_CARGO or 0)
-        special = (payload.SPECIAL or 0) * (payload.BUY_SPECIAL or 0)
-        cbm = (payload.CBM or 0) * (payload.BUY_CBM or 0)
-        other = (payload.HC or 0) + (payload.WFG or 0) + (payload.SECURITY or 0) + (payload.CARRIER or 0) + (
-                (payload.PARTNER_FEE or 0) * (payload.RATE or 0))
-        pu = ((payload.SELL or 0) - (small + s_suv + suv + rv_cargo + special + cbm)) + (
-                    other // (payload.RATE or 0)) - (payload.OTHER or 0)
-        pw = ((payload.SELL or 0) - (small + s_suv + suv + rv_cargo + special + cbm)) * (payload.RATE or 0) + other + (
-                payload.OTHER or 0)
-
-        # 1. 우선 마스터 객체를 DB에서 가져옴
-        progress = await self.db.get(progress_detail_roro_models.ProgressRoRo, progress_roro_id)
-        if not progress:
-            raise HTTPException(status_code=404, detail=ERROR_NOT_FOUND)  # 없으면 404 에러
-
-        if progress.creator_id != current_user.id:
-            raise HTTPException(status_code=403, detail="수정 권한이 없습니다.")  # 작성자만 수정 가능
-
-        # 2. ProgressRoRo(마스터) 필드 먼저 업데이트 (디테일은 제외하고)
-        await self.db.execute(
-            update(progress_detail_roro_models.ProgressRoRo)
-            .where(progress_detail_roro_models.ProgressRoRo.id == progress_roro_id)
+        pu, pw = self._profit(payload)  # PROFIT_USD, PROFIT_KRW
+
+        # 1~2. ProgressRoRo(마스터) 필드 업데이트 (디테일은 제외하고)
+        # 조회(get) 없이 UPDATE ... WHERE id = ? AND creator_id = ? [AND version = ?] RETURNING 한 문장으로
+        # (0행이면 404/403/409 구분 - 같은 부킹을 다른 스태프가 먼저 수정했으면 409 로 덮어쓰기 방지)
+        row = await db_writes.execute_owned(
+            self.db,
+            db_writes.owned_update(progress_detail_roro_models.ProgressRoRo, progress_roro_id, current_user.id, version)
             .values(**payload.model_dump(
                 exclude_unset=True,
                 exclude={'progress_detail_roro_detail', 'PROFIT_USD', 'PROFIT_KRW'}),
                     PROFIT_USD=pu,
                     PROFIT_KRW=pw,
                     )
+            .returning(*db_writes.returning_columns(progress_detail_roro_models.ProgressRoRo)),
+            progress_detail_roro_models.ProgressRoRo,
+            progress_roro_id,
+            current_user.id,
+            ERROR_NOT_FOUND,
+            ERROR_FORBIDDEN,
         )
 
-        # 3. 디테일 동기화
-        incoming_ids = set()  # 프론트에서 보낸 id들만 저장 (기존 유지/수정 용도)
-        if not payload.progress_detail_roro_detail:
-            payload.progress_detail_roro_detail = []  # None이면 빈 배열로
-
-        for detail in payload.progress_detail_roro_detail:
-            if detail.id:
-                # 이미 DB에 있던 디테일이면 → update
-                await self.db.execute(
-                    update(progress_detail_roro_models.ProgressRoRoDetail)
-                    .where(progress_detail_roro_models.ProgressRoRoDetail.id == detail.id)
-                    .values(**detail.model_dump(exclude_unset=True))
-                )
-                incoming_ids.add(detail.id)  # 유지/수정 id 등록
-            else:
-                # id가 없으면 신규 추가 (insert)
-                new_detail = progress_detail_roro_models.ProgressRoRoDetail(
-                    **detail.model_dump(exclude_unset=True),
-                    progress_detail_roro_id=progress_roro_id
+        # 3. 디테일 동기화 (마스터 UPDATE 가 행 잠금을 잡고 있으므로 같은 부킹의 동시 수정은 여기서 순서대로 처리됨)
+        details = await self._sync_details(progress_roro_id, payload.progress_detail_roro_detail or [])
+
+        await self.db.commit()  # 모든 변경사항 실제 DB에 반영
+
+        # 4. 다시 조회하지 않고 마스터는 RETURNING 결과, 디테일은 동기화 결과로 응답 (최신 상태 프론트에 동기화)
+        return _written_out(row, current_user, details)
+
+    async def _sync_details(
+            self,
+            progress_roro_id: int,
+            incoming: list[progress_detail_roro_schemas.ProgressDetailRoRoDetailUpdate],
+    ) -> list[dict]:
+        # 디테일(차량) 동기화를 행 단위가 아니라 집합 단위로 (200대여도 최대 4문장)
+        # 1) 기존 디테일 조회 → 2) 메모리에서 diff 계산
+        # 3) DELETE 한 번 (프론트에 없는 행) / UPDATE executemany 한 번 (값이 바뀐 행) / multi-row INSERT 한 번 (새 행)
+        table = progress_detail_roro_models.ProgressRoRoDetail.__table__
+        fields = ('MODEL', 'CHASSISNo', 'EL', 'HBL')
+
+        existing = {
+            r.id: r for r in (await self.db.execute(
+                select(*_DETAIL_COLUMNS)
+                .where(progress_detail_roro_models.ProgressRoRoDetail.progress_detail_roro_id == progress_roro_id)
+            )).all()
+        }
+
+        kept: dict[int, dict] = {}  # id → 응답용 값
+        changed = []  # UPDATE 대상
+        created = []  # INSERT 대상 (id 가 없거나, 이미 삭제되어 DB 에 없는 id)
+        for detail in incoming:
+            values = detail.model_dump(include=set(fields))
+            current = existing.get(detail.id) if detail.id else None
+            if current is None:
+                created.append({**values, 'progress_detail_roro_id': progress_roro_id})
+                continue
+            kept[current.id] = {'id': current.id, **values}
+            if any(getattr(current, f) != values[f] for f in fields):  # 값이 바뀐 행만 UPDATE
+                changed.append({'b_id': current.id, **{f'b_{f}': values[f] for f in fields}})
+
+        # 프론트에 없는 디테일만 삭제 (차대번호 등 실수로 잘못된 행만 삭제됨)
+        if existing.keys() - kept.keys():
+            await self.db.execute(
+                delete(table).where(
+                    table.c.progress_detail_roro_id == progress_roro_id,
+                    table.c.id.not_in(list(kept)),
                 )
-                self.db.add(new_detail)
+            )
 
-        # 4. 삭제: DB에는 있는데, 프론트에 없는 디테일만 삭제 (차대번호 등 실수로 잘못된 행만 삭제됨)
-        db_details = await self.db.execute(
-            select(progress_detail_roro_models.ProgressRoRoDetail).where(
-                progress_detail_roro_models.ProgressRoRoDetail.progress_detail_roro_id == progress_roro_id
+        if changed:  # executemany - 한 번의 왕복으로 여러 행 UPDATE
+            await self.db.execute(
+                update(table)
+                .where(table.c.id == bindparam('b_id'))
+                .values({f: bindparam(f'b_{f}') for f in fields}),  # 컬럼명과 같은 bindparam 이름은 쓸 수 없어서 b_ 접두사
+                changed,
             )
-        )
-        db_details = db_details.scalars().all()
-        for db_detail in db_details:
-            if db_detail.id not in incoming_ids:
-                await self.db.delete(db_detail)  # 프론트에 없는 id면 삭제
 
-        await self.db.commit()  # 모든 변경사항 실제 DB에 반영
+        inserted = []
+        if created:  # INSERT ... VALUES (...), (...), ... RETURNING - 새 id 를 한 번에 받음
+            inserted = (await self.db.execute(
+                insert(table).values(created).returning(*(table.c[c] for c in ('id',) + fields))
+            )).mappings().all()
+
+        return sorted([*kept.values(), *map(dict, inserted)], key=lambda d: d['id'])
+
+    # [관리자] 조건에 맞는 부킹의 PROFIT_USD/PROFIT_KRW 재계산 (환율 정정 후 PATCH 를 반복하지 않도록)
+    # id 순서로 chunk 단위로 읽어서 NumPy 로 계산 → executemany UPDATE → chunk 마다 commit (긴 트랜잭션/잠금 방지)
+    async def recompute_profits(self, payload: progress_detail_roro_schemas.ProfitRecomputeRequest):
+        roro = progress_detail_roro_models.ProgressRoRo
+        table = roro.__table__
+
+        filters = []
+        if payload.progress_id is not None:
+            filters.append(roro.progress_id == payload.progress_id)
+        if payload.etd_from is not None:
+            filters.append(roro.ETD >= datetime.combine(payload.etd_from, time.min))
+        if payload.etd_to is not None:
+            filters.append(roro.ETD <= datetime.combine(payload.etd_to, time.max))
+        if payload.partner is not None:
+            filters.append(roro.PARTNER == payload.partner)
 
-        # 5. 갱신된 마스터/디테일을 다시 selectinload로 한 번에 조회 후 반환 (최신 상태 프론트에 동기화)
-        result = await self.db.execute(
-            select(progress_detail_roro_models.ProgressRoRo).options(
-                selectinload(progress_detail_roro_models.ProgressRoRo.creator),
-                selectinload(progress_detail_roro_models.ProgressRoRo.progress),
-                selectinload(progress_detail_roro_models.ProgressRoRo.progress_detail_roro_detail),
-            ).where(progress_detail_roro_models.ProgressRoRo.id == progress_roro_id)
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam('b_id'))
+            .values(
+                PROFIT_USD=bindparam('b_usd'),
+                PROFIT_KRW=bindparam('b_krw'),
+                RATE=bindparam('b_rate'),
+                version=table.c.version + 1,  # 값이 바뀌었으므로 If-Match 로 수정 중인 화면은 409
+            )
         )
-        updated_progress_roro = result.scalars().first()  # 단일 객체 반환
-        return updated_progress_roro  # 프론트엔드로 응답
+
+        matched = updated = zero_rate = chunks = 0
+        last_id = 0
+        while True:
+            rows = (await self.db.execute(
+                select(
+                    roro.id, roro.PROFIT_USD, roro.PROFIT_KRW,
+                    *(getattr(roro, f) for f in progress_detail_roro_profit.PROFIT_FIELDS),
+                )
+                .where(*filters, roro.id > last_id)
+                .order_by(roro.id)
+                .limit(PROFIT_RECOMPUTE_CHUNK_SIZE)
+            )).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            chunks += 1
+            matched += len(rows)
+
+            rates = [row.RATE if payload.rate is None else payload.rate for row in rows]
+            profits = progress_detail_roro_profit.compute_profits(rows, rates)  # chunk 전체를 배열 연산 한 번으로
+
+            changed = []
+            for row, rate, (u, k) in zip(rows, rates, profits):
+                zero_rate += u is None
+                if (u, k, rate) != (row.PROFIT_USD, row.PROFIT_KRW, row.RATE):  # 바뀐 부킹만 UPDATE
+                    changed.append({'b_id': row.id, 'b_usd': u, 'b_krw': k, 'b_rate': rate})
+
+            if changed:
+                await self.db.execute(statement, changed)
+                updated += len(changed)
+            await self.db.commit()
+
+        return {'matched': matched, 'updated': updated, 'zero_rate': zero_rate, 'chunks': chunks}
@@ -1,4 +1,5 @@
 # app/replies/replies.py
+from typing import Literal
 
 from fastapi import APIRouter, Depends
 
@@ -7,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession  # 비동기 SQLAlchemy 세션
 
 
 
+from app import db_routing
 from app.database import get_db
 from app.replies import replies_schemas
 from app.replies.replies_services import RepliesServices
@@ -31,18 +33,25 @@ def get_services(db:AsyncSession =Depends(get_db)) -> RepliesServices:
     return RepliesServices(db)
 
 
+# 조회 전용 - 읽기 복제본 세션 (복제본이 없거나 지연되면 primary, app/db_routing.py 참고)
+def get_read_services(db: AsyncSession = Depends(db_routing.get_read_db)) -> RepliesServices:
+    return RepliesServices(db)
+
+
 @router.get('/{post_id}', response_model=replies_schemas.ReplyPageOut, status_code=200)
 async def list_replies(
         post_id: int,  # URL에서 post_id를 가져옴
         page: int = 1,  # page 를 기본값을 1을줌
         size: int = 10,  # 리스트 사이즈를 10개를줌
+        count: Literal['exact', 'estimate', 'none'] = 'exact',  # 전체 개수 집계 방식
         _:users_models.User=Depends(dependencies.user_only),
-        service: RepliesServices = Depends(get_services)
+        service: RepliesServices = Depends(get_read_services)
     ):
         return await service.list_replies(
             post_id=post_id,
             page=page,
             size=size,
+            count=count,
         )
 @router.post('/{post_id}', response_model=replies_schemas.ReplyOut, status_code=201)
 async def create_reply(
@@ -1,7 +1,7 @@
 # app/replies/replies_models.py
 # DB에 저장될 사용자 정보를 정의하는 ORM 모델
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 
@@ -12,6 +12,10 @@ from app.database import Base
 
 class Reply(Base):
     __tablename__ = 'replies'
+    __table_args__ = (
+        # 게시글별 댓글 목록 (post_id = ? ORDER BY created_at DESC, id DESC) - alembic 9d4f2b6e8a11
+        Index('ix_replies_post_id_created_at_id', 'post_id', 'created_at', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     description = Column(String, nullable=True)
@@ -33,7 +33,8 @@ class ReplyOut(ReplyBase):
 
 class ReplyPageOut(BaseModel):
     items: List[ReplyOut]
-    total: int
+    total: int | None  # count=none 이면 None
     page: int
     size: int
-    total_pages: int
\ No newline at end of file
+    total_pages: int | None
+    has_next: bool = False
\ No newline at end of file
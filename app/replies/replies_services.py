@@ -1,14 +1,12 @@
 # app/replies/replies_services.py
 
-import math
-
-from fastapi import HTTPException
-
 from sqlalchemy.ext.asyncio import AsyncSession  # 비동기 SQLAlchemy 세션
-from sqlalchemy import select, update, delete, func, or_  # SQL 쿼리 빌더, 함수, OR 검색 등
+from sqlalchemy import select, or_  # SQL 쿼리 빌더, OR 검색 등
 from sqlalchemy.orm import selectinload
 
 
+from app import pagination
+from app import db_writes  # INSERT/UPDATE ... RETURNING 공통 경로
 from app.replies import replies_schemas, replies_models
 from app.users import users_models, dependencies
 
@@ -17,6 +15,28 @@ ERROR_NOT_FOUND='댓글 찾을 수 없습니다. (404 Not Found)'
 ERROR_FORBIDDEN='작성자만 수정 및 삭제할 수 있습니다.'
 
 
+# INSERT/UPDATE ... RETURNING 으로 돌려받을 컬럼 (ReplyOut 에 필요한 것만)
+_REPLY_RETURNING = [
+    replies_models.Reply.id,
+    replies_models.Reply.description,
+    replies_models.Reply.created_at,
+    replies_models.Reply.updated_at,
+    replies_models.Reply.post_id,
+]
+
+
+def _written_out(row, current_user: users_models.User) -> dict:
+    # RETURNING 으로 받은 행 → ReplyOut (작성자는 요청한 사용자, 게시글은 id 만 필요하므로 다시 조회하지 않음)
+    return {
+        'id': row.id,
+        'description': row.description,
+        'created_at': row.created_at,
+        'updated_at': row.updated_at,
+        'creator': db_writes.user_out(current_user),
+        'posts': {'id': row.post_id},
+    }
+
+
 class RepliesServices:
 
     def __init__(self, db:AsyncSession):
@@ -27,6 +47,7 @@ class RepliesServices:
             post_id: int,  # URL에서 ship_id를 가져옴
             page: int = 1,  # page 를 기본값을 1을줌
             size: int = 10,  # 리스트 사이즈를 10개를줌
+            count: str = 'exact',  # 'exact' = count(*), 'estimate' = 플래너 예상치, 'none' = 집계 안함(has_next 만)
     ):
         # 파라미터 방어(음수/0 등) - 장고처럼 ValueError만큼 유연하지 않음(숫자 아닌 값 오면 FastAPI가 422로 막음)
         if page < 1:  # page가 1보다 작으면
@@ -44,16 +65,18 @@ class RepliesServices:
 
         # offset = 건너뛸 개수를 의미함 페이지가 2면 page -1  =  1 * 10 이니까 10번 전까지 건너뛰고 시작 한다는듯 (결국 시작 위치를 의미함)
 
-        base_query = select(replies_models.Reply).where(
-            replies_models.Reply.post_id == post_id)  # 선적(게시글) 전체 SELECT 쿼리 생성
+        filters = [replies_models.Reply.post_id == post_id]  # 목록 조회와 count 조회가 같이 쓰는 조건
+
+        base_query = select(replies_models.Reply).where(*filters)  # 선적(게시글) 전체 SELECT 쿼리 생성
 
 
         # 검색어 있을 때만 필터링
         # → 모든 게시글을 최신순으로 페이지네이션해서 반환
 
         base_query = base_query.order_by(
-            replies_models.Reply.created_at.desc()
-        ).offset(offset).limit(size)  # limit = size <-항상 요청한 페이지당 최대 개수만큼만 반환 사이즈는 무조건 10(게시글이 10개만나옴)
+            replies_models.Reply.created_at.desc(),
+            replies_models.Reply.id.desc(),  # 같은 시각에 생성된 댓글 순서 고정
+        ).offset(offset).limit(size + 1)  # 다음 페이지 유무 확인을 위해 1개 더 가져옴
 
         # 관계(relationship) 이 있는 db를 불러오기 위함 post가 아닌 creator,category 이런데서
         base_query = base_query.options(
@@ -64,6 +87,8 @@ class RepliesServices:
         result = await self.db.execute(base_query)  # 쿼리 실행해서 결과 받아옴
 
         replies = result.scalars().all()  # 전체 레코드 가져오기
+        has_next = len(replies) > size
+        replies = replies[:size]
 
         # if not replies:  프론트에서 해결하는게 더 좋음 이런 상황에서는 (댓글이 실제로 없을 수도 있으니까)
         #     raise HTTPException(status_code=404,detail='댓글이 없습니다!')
@@ -82,15 +107,20 @@ class RepliesServices:
             # 결과: [0, 1, 4, 9, 16]
         ]
 
-        total_count_query = select(func.count()).where(replies_models.Reply.post_id == post_id)
-        total_count = await self.db.scalar(total_count_query)  # 전체 게시글 개수 집계
+        # 전체 댓글 개수 집계 (count 모드에 따라 정확/추정/생략)
+        total_count = await pagination.count_rows(
+            self.db,
+            select(replies_models.Reply.id).where(*filters),
+            count,
+        )
 
         return {
             "items": items,  # 실제 데이터 (리스트)
-            "total": total_count,  # 전체 게시글 수
+            "total": total_count,  # 전체 게시글 수 (count=none 이면 None)
             "page": page,  # 현재 페이지
             "size": size,  # 페이지당 게시글 수
-            "total_pages": math.ceil(total_count / size)  # ceil 올림 함수 , 전체페이지 수를 계산함.
+            "total_pages": pagination.total_pages(total_count, size),  # ceil 올림 함수 , 전체페이지 수를 계산함.
+            "has_next": has_next,  # 다음 페이지 존재 여부
         }
 
 
@@ -102,30 +132,21 @@ class RepliesServices:
             post_id: int,
     ):
 
-        new_reply = replies_models.Reply(
-            **payload.model_dump(),
-            # - title / description  model_dump()는 받아온 title과 description을 각각의 객체로 나눠줌. exclude 여기서 사실 안해도됨 어짜피 filepath 가 payload에 포함 안돼있음
-            creator_id=current_user.id,  # - 작성자의 Foreignkey
-            post_id=post_id,
+        # INSERT ... RETURNING 한 문장으로 저장된 행을 바로 받음
+        row = await db_writes.insert_returning(
+            self.db,
+            replies_models.Reply,
+            {
+                **payload.model_dump(),
+                'creator_id': current_user.id,  # - 작성자의 Foreignkey
+                'post_id': post_id,
+            },
+            _REPLY_RETURNING,
         )
-
-        self.db.add(new_reply)  # INSERT 준비
         await self.db.commit()  # 트랜잭션 커밋(비동기 await)
 
-        # 관계필드까지 모두 미리 조회해서 응답으로 반환
-
-        #  프론트에서 저장후 바로 상세페이지(get)로 리다이렉트 되는데 그곳에서 get이 get에 있는 selectinload 보다 get을 먼저 실행하게되서 오류가남 (트랜잭션이 물리적으로 완전히 반영되기 전에 GET이 먼저 실행)
-        result = await self.db.execute(
-            select(replies_models.Reply)
-            .options(
-                selectinload(replies_models.Reply.creator),  # 작성자 정보  # 지역 관계
-                selectinload(replies_models.Reply.posts)
-            )
-            .where(replies_models.Reply.id == new_reply.id)
-        )
-        reply_with_relations = result.scalar_one()
-
-        return reply_with_relations  # JSON 직렬화 -> 응답
+        # 관계필드는 다시 조회하지 않고 current_user 와 post_id 로 채움
+        return _written_out(row, current_user)  # JSON 직렬화 -> 응답
 
 
 
@@ -137,51 +158,37 @@ class RepliesServices:
             reply_id: int,
     ):
 
-        reply = await self.db.get(replies_models.Reply, reply_id)
-        if not reply:
-            raise HTTPException(status_code=404, detail=ERROR_NOT_FOUND)
-        if reply.creator_id != current_user.id:
-            raise HTTPException(status_code=403, detail=ERROR_FORBIDDEN)
-
-        await self.db.execute(
-            update(replies_models.Reply)
-            .where(replies_models.Reply.id == reply_id)
-            .values(
-                **payload.model_dump(exclude_unset=True),
-            )
+        # 조회(get) 없이 UPDATE ... WHERE id = ? AND creator_id = ? RETURNING 한 문장으로 (0행이면 404/403 구분)
+        row = await db_writes.execute_owned(
+            self.db,
+            db_writes.owned_update(replies_models.Reply, reply_id, current_user.id)
+            .values(**payload.model_dump(exclude_unset=True))
+            .returning(*_REPLY_RETURNING),
+            replies_models.Reply,
+            reply_id,
+            current_user.id,
+            ERROR_NOT_FOUND,
+            ERROR_FORBIDDEN,
         )
-
         await self.db.commit()  # 트랜잭션 커밋(비동기 await)
 
-        # 관계필드까지 모두 미리 조회해서 응답으로 반환
-
-        #  프론트에서 저장후 바로 상세페이지(get)로 리다이렉트 되는데 그곳에서 get이 get에 있는 selectinload 보다 get을 먼저 실행하게되서 오류가남 (트랜잭션이 물리적으로 완전히 반영되기 전에 GET이 먼저 실행)
-        result = await self.db.execute(
-            select(replies_models.Reply)
-            .options(
-                selectinload(replies_models.Reply.creator),  # 작성자 정보  # 지역 관계
-                selectinload(replies_models.Reply.posts)
-            )
-            .where(replies_models.Reply.id == reply_id)
-        )
-        reply_with_relations = result.scalar_one()
-
-        return reply_with_relations  # JSON 직렬화 -> 응답
+        return _written_out(row, current_user)  # JSON 직렬화 -> 응답
 
     async def delete_reply(
             self,
             current_user: users_models.User,
             reply_id: int,
     ):
-        reply = await self.db.get(replies_models.Reply, reply_id)
-        if not reply:
-            raise HTTPException(status_code=404, detail='Reply not found')
-        if reply.creator_id != current_user.id:
-            raise HTTPException(status_code=403, detail='작성자만 삭제할 수 있습니다.')
-        await self.db.execute(
-            delete(replies_models.Reply)
-            .where(replies_models.Reply.id == reply_id)
+        # 조회(get) 없이 DELETE ... WHERE id = ? AND creator_id = ? 한 문장으로 (0행이면 404/403 구분)
+        await db_writes.execute_owned(
+            self.db,
+            db_writes.owned_delete(replies_models.Reply, reply_id, current_user.id)
+            .returning(replies_models.Reply.id),
+            replies_models.Reply,
+            reply_id,
+            current_user.id,
+            'Reply not found',
+            '작성자만 삭제할 수 있습니다.',
         )
 
         await self.db.commit()
-
@@ -0,0 +1,57 @@
+# app/reports/reports.py
+
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database, db_routing
+from app.reports import reports_refresh, reports_schemas
+from app.reports.reports_services import ReportsServices
+from app.users import users_models, dependencies
+
+router = APIRouter(
+    prefix='/api/reports',
+    tags=['Reports'],
+)
+
+MONTH_PATTERN = r'^\d{4}-(0[1-9]|1[0-2])$'  # YYYY-MM
+
+
+# 리포트는 모두 조회 전용 - 읽기 복제본 세션 (복제본이 없거나 지연되면 primary, app/db_routing.py 참고)
+def get_read_services(db: AsyncSession = Depends(db_routing.get_read_db)) -> ReportsServices:
+    return ReportsServices(db)
+
+
+# what-if 이익 분석 (예: 지난 분기를 환율 1350 으로 계산하면? BUY_SUV 가 5% 오르면?)
+# 조회 전용이지만 가정값이 중첩된 JSON 이라 POST 로 받음 (DB 는 변경하지 않음)
+@router.post('/roro/what-if', response_model=reports_schemas.WhatIfOut, status_code=200,
+             dependencies=[Depends(db_routing.read_only)])  # 쓰기가 아니므로 read-your-writes 고정 안함
+async def roro_what_if(
+        payload: reports_schemas.WhatIfRequest,
+        _: users_models.User = Depends(dependencies.staff_only),
+        service: ReportsServices = Depends(get_read_services),
+):
+    return await service.roro_what_if(payload)
+
+
+# 대시보드용 RoRo 집계 - 집계 뷰(roro_summary)만 읽음 (최대 REPORTS_REFRESH_SECONDS 만큼 늦을 수 있음)
+# group_by 로 묶을 키 선택 (예: ?group_by=PARTNER&group_by=month), month_from/month_to 는 YYYY-MM
+@router.get('/roro-summary', response_model=reports_schemas.RoRoSummaryOut, status_code=200)
+async def roro_summary(
+        group_by: List[reports_schemas.SummaryGroupField] = Query(['DESTINATION', 'PARTNER', 'SHIPPER', 'month']),
+        month_from: str | None = Query(None, pattern=MONTH_PATTERN),
+        month_to: str | None = Query(None, pattern=MONTH_PATTERN),
+        destination: str | None = None,
+        partner: str | None = None,
+        shipper: str | None = None,
+        _: users_models.User = Depends(dependencies.staff_only),
+        service: ReportsServices = Depends(get_read_services),
+):
+    return await service.roro_summary(group_by, month_from, month_to, destination, partner, shipper)
+
+
+# 집계 뷰 즉시 갱신 (이익 재계산 직후 등) - 다른 곳에서 갱신 중이면 refreshed 가 false
+@router.post('/roro-summary/refresh', status_code=200)
+async def refresh_roro_summary(_: users_models.User = Depends(dependencies.admin_only)):
+    return {'refreshed': await reports_refresh.refresh_view(database.engine, 'roro_summary')}
@@ -0,0 +1,57 @@
+# app/reports/reports_refresh.py
+# 집계 materialized view 갱신 스케줄러
+# - 서버 시작시(lifespan) 백그라운드 작업으로 띄우고 REPORTS_REFRESH_SECONDS 마다 REFRESH MATERIALIZED VIEW CONCURRENTLY
+#   (CONCURRENTLY: 갱신 중에도 대시보드 조회가 막히지 않음 - 뷰에 unique 인덱스가 있어야 함)
+# - 워커/서버가 여러 대여도 같은 시점에 한 곳에서만 갱신하도록 pg_try_advisory_xact_lock 으로 잠금
+#   (잠금을 못 얻으면 다른 곳에서 갱신 중이므로 이번 주기는 건너뜀, 트랜잭션이 끝나면 자동으로 풀림)
+#
+# REPORTS_REFRESH_SECONDS=0 이면 스케줄러를 띄우지 않음 (관리자 API 로만 갱신)
+
+import asyncio
+import logging
+import os
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REPORTS_REFRESH_SECONDS = float(os.getenv('REPORTS_REFRESH_SECONDS', '300'))  # 갱신 주기 (= 대시보드 최대 지연)
+
+# 갱신할 뷰 (뷰마다 advisory lock 키를 따로 사용)
+SUMMARY_VIEWS = {
+    'roro_summary': 0x5250_0001,
+}
+
+
+async def refresh_view(engine: AsyncEngine, view: str) -> bool:
+    # 갱신했으면 True, 다른 곳에서 갱신 중이라 건너뛰었으면 False
+    lock_key = SUMMARY_VIEWS[view]
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        if not await conn.scalar(text('SELECT pg_try_advisory_xact_lock(:key)'), {'key': lock_key}):
+            logger.info('%s 갱신 건너뜀 (다른 곳에서 갱신 중)', view)
+            return False
+        await conn.execute(text(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {view}'))
+    logger.info('%s 갱신 완료 %.1fms', view, (time.perf_counter() - started) * 1000)
+    return True
+
+
+async def refresh_all(engine: AsyncEngine) -> dict[str, bool]:
+    return {view: await refresh_view(engine, view) for view in SUMMARY_VIEWS}
+
+
+async def run_scheduler(engine: AsyncEngine, interval: float = REPORTS_REFRESH_SECONDS):
+    # lifespan 에서 asyncio.create_task 로 실행, 종료 시 cancel
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_all(engine)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception('집계 뷰 갱신 실패 (다음 주기에 다시 시도)')
@@ -0,0 +1,69 @@
+# app/reports/reports_schemas.py
+# 리포트/분석 API 요청과 응답에 사용될 Pydantic 모델
+
+from datetime import date
+from typing import Dict, List, Literal
+
+from pydantic import BaseModel, Field
+
+from app.progress_detail_roro.progress_detail_roro_profit import PROFIT_FIELDS
+
+ProfitField = Literal[PROFIT_FIELDS]  # 가정값을 바꿀 수 있는 컬럼 (이익 공식에 쓰이는 숫자 컬럼)
+GroupField = Literal['PARTNER', 'DESTINATION', 'month']
+
+
+class WhatIfRequest(BaseModel):
+    # 대상 부킹 (모두 선택, 여러 개면 AND)
+    etd_from: date | None = None  # ETD(출항일) 범위, 예: 지난 분기
+    etd_to: date | None = None
+    partner: str | None = None
+    destination: str | None = None
+    progress_id: int | None = None
+
+    group_by: List[GroupField] = Field(default_factory=lambda: ['month'])  # month = ETD 기준 YYYY-MM
+    values: Dict[ProfitField, float] = Field(default_factory=dict)  # 값 고정, 예: {"RATE": 1350}
+    multipliers: Dict[ProfitField, float] = Field(default_factory=dict)  # 배수, 예: {"BUY_SUV": 1.05}
+
+
+class WhatIfGroupOut(BaseModel):
+    key: Dict[str, str | None]  # group_by 컬럼별 값
+    bookings: int
+    sell: float
+    profit_usd: float  # 현재 입력값 기준
+    profit_krw: float
+    scenario_profit_usd: float  # 가정값 적용 후
+    scenario_profit_krw: float
+    delta_profit_usd: float
+    delta_profit_krw: float
+    zero_rate: int  # 가정값 적용 후 RATE 가 0 이라 USD 합계에서 빠진 부킹 수
+
+
+class WhatIfOut(BaseModel):
+    bookings: int
+    groups: List[WhatIfGroupOut]
+
+
+SummaryGroupField = Literal['DESTINATION', 'PARTNER', 'SHIPPER', 'month']
+
+
+class RoRoSummaryRow(BaseModel):
+    # group_by 에 없는 키는 None (합쳐서 집계), 값이 비어 있는 부킹의 키도 None
+    DESTINATION: str | None = None
+    PARTNER: str | None = None
+    SHIPPER: str | None = None
+    month: str | None = None  # ETD 기준 YYYY-MM
+    bookings: int
+    SMALL: int
+    S_SUV: int
+    SUV: int
+    RV_CARGO: int
+    SPECIAL: int
+    CBM: float
+    SELL: int
+    PROFIT_USD: float
+    PROFIT_KRW: float
+
+
+class RoRoSummaryOut(BaseModel):
+    group_by: List[SummaryGroupField]
+    rows: List[RoRoSummaryRow]
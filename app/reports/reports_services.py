@@ -0,0 +1,118 @@
+# app/reports/reports_services.py
+
+from datetime import datetime, time
+
+import numpy as np
+from sqlalchemy import select, func, table, column, Integer, Float, String
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.progress_detail_roro import progress_detail_roro_models
+from app.progress_detail_roro.progress_detail_roro_profit import PROFIT_FIELDS
+from app.reports import reports_analytics, reports_schemas
+
+# 집계 materialized view (alembic e4c9a7d2b813) - Base.metadata 에 넣지 않음 (autogenerate 가 테이블로 만들지 않도록)
+SUMMARY_SUM_COLUMNS = ('small', 's_suv', 'suv', 'rv_cargo', 'special', 'cbm', 'sell', 'profit_usd', 'profit_krw')
+RORO_SUMMARY = table(
+    'roro_summary',
+    column('destination', String),
+    column('partner', String),
+    column('shipper', String),
+    column('month', String),
+    column('bookings', Integer),
+    *(column(name, Float if name in ('cbm', 'profit_usd', 'profit_krw') else Integer) for name in SUMMARY_SUM_COLUMNS),
+)
+
+
+class ReportsServices:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def roro_what_if(self, payload: reports_schemas.WhatIfRequest):
+        roro = progress_detail_roro_models.ProgressRoRo
+
+        # 컬럼마다 array_agg 로 배열 하나씩 → 결과는 1행 (행마다 Row/튜플을 만들지 않고 asyncpg 가 배열을 바로 list 로 디코딩)
+        # 숫자 컬럼은 NULL 을 0 으로(float8), 그룹 키는 NULL 을 '' 로 바꿔서 가져옴 → 파이썬에서 행마다 None 확인할 필요 없음
+        numeric = [func.array_agg(func.coalesce(getattr(roro, f), 0).cast(Float)) for f in PROFIT_FIELDS]
+        key_columns = {
+            'PARTNER': func.coalesce(roro.PARTNER, ''),
+            'DESTINATION': func.coalesce(roro.DESTINATION, ''),
+            'month': func.coalesce(func.to_char(roro.ETD, 'YYYY-MM'), ''),
+        }
+        group_by = list(dict.fromkeys(payload.group_by))  # 중복 제거 (순서 유지)
+
+        filters = []
+        if payload.etd_from is not None:
+            filters.append(roro.ETD >= datetime.combine(payload.etd_from, time.min))
+        if payload.etd_to is not None:
+            filters.append(roro.ETD <= datetime.combine(payload.etd_to, time.max))
+        if payload.partner is not None:
+            filters.append(roro.PARTNER == payload.partner)
+        if payload.destination is not None:
+            filters.append(roro.DESTINATION == payload.destination)
+        if payload.progress_id is not None:
+            filters.append(roro.progress_id == payload.progress_id)
+
+        # 같은 SELECT 안의 array_agg 들은 같은 행 순서로 모이므로 i 번째 원소끼리 같은 부킹
+        row = (await self.db.execute(
+            select(*numeric, *(func.array_agg(key_columns[k]) for k in group_by)).where(*filters)
+        )).one()  # 대상이 없으면 배열 대신 NULL
+
+        width = len(numeric)
+        columns = {f: np.array(row[i] or [], dtype=np.float64) for i, f in enumerate(PROFIT_FIELDS)}
+        keys = {k: np.array(row[i] or [], dtype=str) for i, k in enumerate(group_by, start=width)}
+
+        return reports_analytics.what_if(columns, keys, payload.values, payload.multipliers)
+
+    async def roro_summary(
+            self,
+            group_by: list[str],
+            month_from: str | None = None,
+            month_to: str | None = None,
+            destination: str | None = None,
+            partner: str | None = None,
+            shipper: str | None = None,
+    ):
+        # progress_detail_roro 를 직접 읽지 않고 집계 뷰(roro_summary)만 읽음 → 부킹 수와 상관없이 빠름
+        view = RORO_SUMMARY
+        keys = {
+            'DESTINATION': view.c.destination,
+            'PARTNER': view.c.partner,
+            'SHIPPER': view.c.shipper,
+            'month': view.c.month,
+        }
+        group_by = list(dict.fromkeys(group_by))  # 중복 제거 (순서 유지)
+        group_columns = [keys[k].label(k) for k in group_by]
+
+        filters = []
+        if month_from is not None:
+            filters.append(view.c.month >= month_from)
+        if month_to is not None:
+            filters.append(view.c.month <= month_to)
+            filters.append(view.c.month != '')  # ETD 가 없는 부킹('')은 기간 조회에서 제외
+        if destination is not None:
+            filters.append(view.c.destination == destination)
+        if partner is not None:
+            filters.append(view.c.partner == partner)
+        if shipper is not None:
+            filters.append(view.c.shipper == shipper)
+
+        # 뷰는 4개 키 전체로 집계되어 있으므로 group_by 에 맞춰 한 번 더 합침
+        stmt = (
+            select(
+                *group_columns,
+                func.sum(view.c.bookings).label('bookings'),
+                *(func.sum(view.c[column]).label(column.upper()) for column in SUMMARY_SUM_COLUMNS),
+            )
+            .where(*filters)
+            .group_by(*group_columns)
+            .order_by(*group_columns)
+        )
+        rows = (await self.db.execute(stmt)).mappings().all()
+        return {
+            'group_by': group_by,
+            'rows': [
+                {k: (v or None) if k in keys else v for k, v in row.items()}  # '' → None
+                for row in rows
+            ],
+        }
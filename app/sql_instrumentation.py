@@ -0,0 +1,136 @@
+# app/sql_instrumentation.py
+# 요청(request) 단위 SQL 계측
+# - 요청마다 실행된 SQL 개수, DB 총 시간, 가장 느린 SQL 을 기록
+# - 응답 헤더 Server-Timing 으로 노출 (브라우저 개발자도구 Network → Timing 탭에서 확인)
+# - 요청이 끝나면 JSON 한 줄로 로그 (logger: app.sql_instrumentation)
+# - 같은 모양(파라미터만 다른)의 SQL 이 한 요청에서 여러 번 실행되면 N+1 의심으로 경고 로그
+#
+# SQL_INSTRUMENTATION=false 로 끌 수 있음 (이벤트 리스너 자체를 등록하지 않음)
+
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from dotenv import load_dotenv
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'true').lower() in ('1', 'true', 'yes')
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', '5'))  # 같은 모양 SQL 이 이 횟수 이상이면 N+1 의심
+SQL_LOG_STATEMENT_LENGTH = 300  # 로그에 남길 SQL 최대 길이
+
+
+class RequestSqlStats:
+    __slots__ = ('count', 'total_seconds', 'slowest_seconds', 'slowest_statement', 'shapes')
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: str | None = None
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+        self.shapes[statement_shape(statement)] += 1
+
+    def suspected_n_plus_one(self) -> list[tuple[str, int]]:
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= SQL_N_PLUS_ONE_THRESHOLD]
+
+
+# 현재 요청의 통계 (요청 밖 - 서버 시작시 캐시 적재 등 - 에서는 None 이라 기록 안함)
+_current: ContextVar[RequestSqlStats | None] = ContextVar('request_sql_stats', default=None)
+
+_PARAM = re.compile(r'\$\d+|%\(\w+\)s|\b\d+\b')
+_PARAM_LIST = re.compile(r'\?(?:\s*,\s*\?)+')
+_SPACES = re.compile(r'\s+')
+
+
+def statement_shape(statement: str) -> str:
+    # 파라미터/숫자 리터럴을 ? 로, IN (?, ?, ?) 같은 목록은 하나로 합쳐서 "모양"만 비교
+    shape = _PARAM.sub('?', statement)
+    shape = _PARAM_LIST.sub('?', shape)
+    return _SPACES.sub(' ', shape).strip()
+
+
+def _truncate(statement: str | None) -> str | None:
+    if statement is None:
+        return None
+    statement = _SPACES.sub(' ', statement).strip()
+    return statement if len(statement) <= SQL_LOG_STATEMENT_LENGTH else statement[:SQL_LOG_STATEMENT_LENGTH] + '...'
+
+
+def instrument(engine: AsyncEngine):
+    if not SQL_INSTRUMENTATION:
+        return
+
+    # 시작 시각은 실행 컨텍스트(SQL 한 번 실행)에 저장 - 커넥션(conn.info)에 쌓으면 실패한 SQL 의 시각이
+    # after 없이 남아서, 풀에서 재사용되는 커넥션의 다음 SQL 시간이 엉뚱한 시작 시각과 짝지어짐
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None and context is not None:
+            context._sql_started_at = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        started = getattr(context, '_sql_started_at', None)
+        if stats is None or started is None:
+            return
+        stats.record(statement, time.perf_counter() - started)
+
+
+async def sql_stats_middleware(request: Request, call_next):
+    if not SQL_INSTRUMENTATION:
+        return await call_next(request)
+
+    stats = RequestSqlStats()
+    token = _current.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+    elapsed = time.perf_counter() - started
+
+    response.headers.append('Server-Timing', ', '.join([
+        f'db;dur={stats.total_seconds * 1000:.1f};desc="{stats.count} queries"',
+        f'db-slowest;dur={stats.slowest_seconds * 1000:.1f}',
+        f'app;dur={elapsed * 1000:.1f}',
+    ]))
+
+    suspected = stats.suspected_n_plus_one()
+    logger.info(json.dumps({
+        'event': 'request_sql',
+        'method': request.method,
+        'path': request.url.path,
+        'status': response.status_code,
+        'duration_ms': round(elapsed * 1000, 1),
+        'db_queries': stats.count,
+        'db_ms': round(stats.total_seconds * 1000, 1),
+        'db_slowest_ms': round(stats.slowest_seconds * 1000, 1),
+        'db_slowest_statement': _truncate(stats.slowest_statement),
+        'n_plus_one_suspected': len(suspected) > 0,
+    }, ensure_ascii=False))
+    for shape, n in suspected:
+        logger.warning(json.dumps({
+            'event': 'n_plus_one_suspected',
+            'method': request.method,
+            'path': request.url.path,
+            'repeats': n,
+            'statement': _truncate(shape),
+        }, ensure_ascii=False))
+    return response
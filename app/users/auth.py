@@ -14,9 +14,10 @@ from datetime import datetime, timedelta  # 시간 및 시간계산용
 from dotenv import load_dotenv  # .env 파일에서 환경 변수 읽어옴
 import os  # 표준 라이브러리: 환경 변수 접근
 
-from app import database, utils  # 같은 app 디렉토리의 모듈 import
+from app import database, db_routing, utils  # 같은 app 디렉토리의 모듈 import
 from app.users import users_models  # users/models.py (DB 테이블/ORM)
 from app.users import users_schemas  # users/schemas.py (Pydantic 스키마)
+from app.users import users_cache  # 인증된 사용자 TTL 캐시
 
 # .env 파일을 불러와서 환경 변수로 등록
 load_dotenv()
@@ -25,6 +26,9 @@ load_dotenv()
 SECRET_KEY = os.getenv('SECRET_KEY')  # JWT 서명을 위한 비밀 키 (.env에서 가져옴, 토큰 위조 방지에 반드시 필요)
 ALGORITHM = os.getenv('ALGORITHM')    # JWT 서명 알고리즘 (예: HS256, .env에서 지정)
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES'))  # 토큰 만료시간(분, .env에서 지정)
+# true 면 access token 안의 서명된 uid/role/name 클레임만으로 인증 (DB/캐시 조회 없음)
+# 단, role 변경/유저 삭제가 토큰 만료 전까지 반영되지 않으므로 기본은 false
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv('AUTH_TRUST_TOKEN_CLAIMS', 'false').lower() == 'true'
 
 router = APIRouter()  # FastAPI 라우터 인스턴스 생성
 
@@ -39,6 +43,26 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)  # JWT 토큰을 비밀키와 알고리즘으로 암호화
     return encoded_jwt  # 암호화된 JWT 문자열을 반환
 
+# access token 에 넣을 클레임 (sub = email, 나머지는 AUTH_TRUST_TOKEN_CLAIMS 일 때 DB 없이 권한 체크용)
+def principal_claims(principal: users_cache.Principal) -> dict:
+    return {'sub': principal.email, 'uid': principal.id, 'role': principal.role, 'name': principal.username}
+
+# email 로 principal 조회 (캐시 → 없으면 DB 조회 후 캐시에 저장)
+async def load_principal(db: AsyncSession, email: str) -> users_cache.Principal | None:
+    principal = users_cache.principals.get(email)
+    if principal is not None:
+        return principal
+    result = await db.execute(
+        select(users_models.User.id, users_models.User.email, users_models.User.role, users_models.User.username)
+        .where(users_models.User.email == email)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    principal = users_cache.Principal(id=row.id, email=row.email, role=row.role, username=row.username)
+    users_cache.principals.set(principal)
+    return principal
+
 # ========================= 회원가입 API =========================
 @router.post("/signup", response_model=users_schemas.UserOut)
 async def signup(
@@ -50,7 +74,7 @@ async def signup(
     if existing_user:
         raise HTTPException(status_code=400, detail="이미 존재하는 이메일입니다.")
 
-    hashed_pw = utils.hash_password(user.password)  # 비밀번호 해싱(복호화 불가, 안전하게 저장)
+    hashed_pw = await utils.hash_password_async(user.password)  # 비밀번호 해싱(복호화 불가, 안전하게 저장), 이벤트 루프 밖에서 실행
     new_user = users_models.User(username=user.username, email=user.email, hashed_password=hashed_pw)
     db.add(new_user)
     await db.commit()
@@ -66,11 +90,23 @@ async def login(
     result = await db.execute(select(users_models.User).where(users_models.User.email == form_data.username))
     db_user = result.scalar_one_or_none()
 
-    if not db_user or not utils.verify_password(form_data.password, db_user.hashed_password):
+    if not db_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="이메일 또는 비밀번호가 잘못되었습니다.")
 
+    # bcrypt 비교는 전용 executor 에서 실행 (이벤트 루프를 막지 않음)
+    is_valid, new_hash = await utils.verify_and_update_password(form_data.password, db_user.hashed_password)
+    if not is_valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="이메일 또는 비밀번호가 잘못되었습니다.")
+
+    if new_hash:  # BCRYPT_ROUNDS 가 바뀌었으면 새 cost 로 재해시된 값 저장
+        db_user.hashed_password = new_hash
+        await db.commit()
+
+    principal = users_cache.Principal.from_user(db_user)
+    users_cache.principals.set(principal)  # 로그인 직후 요청들이 DB 를 다시 조회하지 않도록 미리 캐시
+
     access_token = create_access_token(
-        data={"sub": db_user.email},
+        data=principal_claims(principal),
         expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     refresh_token = create_access_token(
@@ -89,8 +125,8 @@ async def login(
     )
     return response
 
-@router.post("/refresh")
-async def refresh_token(request: Request):
+@router.post("/refresh", dependencies=[Depends(db_routing.read_only)])  # 토큰만 재발급 (DB 변경 없음)
+async def refresh_token(request: Request, db: AsyncSession = Depends(database.get_db)):
     refresh_token = request.cookies.get("refresh_token")
     if not refresh_token:
         raise HTTPException(status_code=401, detail="Refresh token이 없습니다.")
@@ -103,13 +139,17 @@ async def refresh_token(request: Request):
     except (JWTError, ValidationError):
         raise HTTPException(status_code=401, detail="Refresh token이 유효하지 않습니다")
 
+    principal = await load_principal(db, email)  # 최신 role 로 클레임을 다시 만듦 (삭제된 유저면 재발급 안함)
+    if principal is None:
+        raise HTTPException(status_code=401, detail="사용자를 찾을 수 없습니다.")
+
     new_access_token = create_access_token(
-        data={"sub": email},
+        data=principal_claims(principal),
         expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     return {"access_token": new_access_token, "token_type": "bearer"}
 
-@router.post("/logout")
+@router.post("/logout", dependencies=[Depends(db_routing.read_only)])
 async def logout():
     response = JSONResponse({"msg": "logged out"})
     response.delete_cookie("refresh_token")
@@ -131,8 +171,11 @@ async def get_current_user(
     except (JWTError, ValidationError):
         raise HTTPException(status_code=401, detail="토큰이 유효하지 않습니다")
 
-    result = await db.execute(select(users_models.User).where(users_models.User.email == email))
-    user = result.scalar_one_or_none()
+    # 서명된 클레임을 신뢰하도록 설정된 경우 DB/캐시 조회 없이 바로 principal 생성
+    if AUTH_TRUST_TOKEN_CLAIMS and all(key in payload for key in ('uid', 'role', 'name')):
+        return users_cache.Principal(id=payload['uid'], email=email, role=payload['role'], username=payload['name'])
+
+    user = await load_principal(db, email)  # 캐시에 있으면 DB 조회 안함
     if user is None:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
     return user
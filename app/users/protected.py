@@ -4,6 +4,7 @@
 
 from fastapi import APIRouter, Depends
 
+from app import database, utils
 from app.users import users_models
 from app.users import users_schemas
 from app.users.dependencies import admin_only, staff_only
@@ -24,4 +25,16 @@ async def protected_route(
 # 어드민 페이지를 만들기 위함
 @router.get("/admin-only", response_model=users_schemas.UserOut)
 async def only_admin_route(current_user: users_models.User = Depends(admin_only)):
-    return current_user  # 관리자만 접근 가능
\ No newline at end of file
+    return current_user  # 관리자만 접근 가능
+
+
+# 비밀번호 해시 executor 상태 (대기/실행 시간, 503 거절 횟수)
+@router.get("/admin/metrics/password-hash")
+async def password_hash_metrics(_: users_models.User = Depends(admin_only)):
+    return utils.password_hash_stats()
+
+
+# DB 커넥션 풀 상태 (사용중/overflow 커넥션 수, checkout 대기/보유 시간)
+@router.get("/admin/db/pool")
+async def db_pool_metrics(_: users_models.User = Depends(admin_only)):
+    return database.pool_stats()
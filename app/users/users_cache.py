@@ -0,0 +1,79 @@
+# app/users/users_cache.py
+# 인증된 사용자(principal) TTL 캐시
+# get_current_user 가 매 요청마다 users 테이블을 조회하지 않도록 토큰 subject(email) 기준으로 잠깐 보관
+# - 크기 제한(LRU) + TTL
+# - 같은 프로세스에서 ORM 으로 role 변경/유저 삭제 시 자동 무효화 (아래 mapper 이벤트)
+# - DB 를 직접 수정한 경우는 TTL 이 지나야 반영됨
+
+import os
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from sqlalchemy import event, inspect
+
+from app.users import users_models
+
+load_dotenv()
+
+USER_CACHE_TTL_SECONDS = float(os.getenv('USER_CACHE_TTL_SECONDS', '60'))
+USER_CACHE_MAX_SIZE = int(os.getenv('USER_CACHE_MAX_SIZE', '10000'))
+
+
+class Principal:
+    # 인증/권한 체크와 응답(UserOut)에 필요한 값만 들고 있는 가벼운 사용자 객체 (ORM 세션과 무관)
+    __slots__ = ('id', 'email', 'role', 'username')
+
+    def __init__(self, id: int, email: str, role: str, username: str):
+        self.id = id
+        self.email = email
+        self.role = role
+        self.username = username
+
+    @classmethod
+    def from_user(cls, user: users_models.User) -> 'Principal':
+        return cls(id=user.id, email=user.email, role=user.role, username=user.username)
+
+
+class PrincipalCache:
+
+    def __init__(self, ttl: float, max_size: int):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._items: OrderedDict[str, tuple[float, Principal]] = OrderedDict()  # email -> (만료시각, principal)
+
+    def get(self, email: str) -> Principal | None:
+        entry = self._items.get(email)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            self._items.pop(email, None)
+            return None
+        self._items.move_to_end(email)  # 최근 사용 → LRU 뒤로
+        return principal
+
+    def set(self, principal: Principal):
+        self._items[principal.email] = (time.monotonic() + self._ttl, principal)
+        self._items.move_to_end(principal.email)
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)  # 가장 오래 안 쓴 항목부터 제거
+
+    def invalidate(self, email: str):
+        self._items.pop(email, None)
+
+    def clear(self):
+        self._items.clear()
+
+
+principals = PrincipalCache(ttl=USER_CACHE_TTL_SECONDS, max_size=USER_CACHE_MAX_SIZE)
+
+
+# ORM 으로 유저가 수정/삭제되면 캐시에서 제거 (email 이 바뀐 경우 이전 email 도 제거)
+# update(User) 같은 Core 문장으로 바꿀 때는 이벤트가 안 뜨므로 principals.invalidate() 를 직접 호출해야 함
+@event.listens_for(users_models.User, 'after_update')
+@event.listens_for(users_models.User, 'after_delete')
+def _invalidate_user(mapper, connection, target):
+    principals.invalidate(target.email)
+    for old_email in inspect(target).attrs.email.history.deleted or ():
+        principals.invalidate(old_email)
@@ -1,12 +1,35 @@
 # app/utils.py
 # 비밀번호를 암호화(해시)하고, 비교할 수 있는 유틸 함수
 
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
 from passlib.context import CryptContext
 
+load_dotenv()
+
+# bcrypt cost(rounds). 값을 바꾸면 기존 해시는 로그인 성공 시 새 cost 로 자동 재해시됨
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+# bcrypt 는 CPU 를 오래 쓰는 동기 함수라서 이벤트 루프 밖(전용 executor)에서 실행
+PASSWORD_HASH_EXECUTOR = os.getenv('PASSWORD_HASH_EXECUTOR', 'thread')  # thread | process
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))  # 동시에 해시할 수 있는 개수
+PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', '32'))  # 실행중+대기중 한도, 넘으면 503
+
 # bcrypt 해싱 알고리즘을 사용할 수 있도록 설정
 # 'CryptContext`는 여러 암호화 알고리즘을 쉽게 쓸 수 있게 도와주는 도구(여기서는 `bcrypt`만 사용)
 # `deprecated="auto"`는 자동으로 안전한 알고리즘만 사용
-pwd_context = CryptContext(schemes=['bcrypt'],deprecated='auto')
+# min/max rounds 를 같게 두면 cost 가 다른 해시는 needs_update 로 판단되어 verify_and_update 에서 재해시됨
+pwd_context = CryptContext(
+    schemes=['bcrypt'],
+    deprecated='auto',
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
 # 비밀번호 해시 생성 함수 ,`bcrypt`로 암호화된 해시 문자열로 변환(예:  "1234" → "$2b$12$aIfgJ3G...")
 def hash_password(password:str)->str:
@@ -16,4 +39,88 @@ def hash_password(password:str)->str:
 # 입력한 비밀번호와 저장된 해시를 비교하는 함수 , 평문 비밀번호와 해시된 값을 비교해서  같은 비밀번호인지 확인
 def verify_password(plain_password:str, hashed_password:str)->bool:
     # .verify 메서드가 비밀번호, 해시비밀번호를 비교해서 논리값으로 반환
-    return pwd_context.verify(plain_password,hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password,hashed_password)
+
+
+# ───────────────────────── 비동기(이벤트 루프 밖) 버전 ─────────────────────────
+
+_executor: Executor | None = None
+_pending = 0  # 실행중 + 대기중 작업 수 (이벤트 루프 스레드에서만 변경하므로 락 불필요)
+_stats = {
+    'completed': 0,
+    'rejected': 0,  # 한도 초과로 503 반환한 횟수
+    'wait_seconds_total': 0.0,  # executor 큐에서 기다린 시간
+    'wait_seconds_max': 0.0,
+    'execute_seconds_total': 0.0,  # 실제 bcrypt 계산 시간
+    'execute_seconds_max': 0.0,
+}
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if PASSWORD_HASH_EXECUTOR == 'process':
+            _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash')
+    return _executor
+
+
+def _run(op: str, args: tuple):
+    # executor 안에서 실행 (process 모드에서도 pickle 가능하도록 모듈 최상위 함수)
+    started = time.perf_counter()
+    if op == 'hash':
+        result = pwd_context.hash(*args)
+    else:
+        result = pwd_context.verify_and_update(*args)
+    return result, time.perf_counter() - started
+
+
+async def _submit(op: str, *args):
+    global _pending
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        _stats['rejected'] += 1
+        raise HTTPException(
+            status_code=503,
+            detail='로그인 요청이 많습니다. 잠시 후 다시 시도해주세요.',
+            headers={'Retry-After': '1'},
+        )
+
+    _pending += 1
+    submitted = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        result, execute_seconds = await loop.run_in_executor(_get_executor(), _run, op, args)
+    finally:
+        _pending -= 1
+
+    wait_seconds = max(time.perf_counter() - submitted - execute_seconds, 0.0)
+    _stats['completed'] += 1
+    _stats['wait_seconds_total'] += wait_seconds
+    _stats['wait_seconds_max'] = max(_stats['wait_seconds_max'], wait_seconds)
+    _stats['execute_seconds_total'] += execute_seconds
+    _stats['execute_seconds_max'] = max(_stats['execute_seconds_max'], execute_seconds)
+    return result
+
+
+async def hash_password_async(password: str) -> str:
+    return await _submit('hash', password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    # (일치 여부, 새 해시) 반환. 새 해시가 None 이 아니면 cost 가 바뀐 것이므로 DB 에 저장해야 함
+    return await _submit('verify', plain_password, hashed_password)
+
+
+def password_hash_stats() -> dict:
+    completed = _stats['completed']
+    return {
+        'executor': PASSWORD_HASH_EXECUTOR,
+        'workers': PASSWORD_HASH_WORKERS,
+        'bcrypt_rounds': BCRYPT_ROUNDS,
+        'pending': _pending,
+        'max_pending': PASSWORD_HASH_MAX_PENDING,
+        **_stats,
+        'wait_seconds_avg': _stats['wait_seconds_total'] / completed if completed else 0.0,
+        'execute_seconds_avg': _stats['execute_seconds_total'] / completed if completed else 0.0,
+    }
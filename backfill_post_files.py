@@ -0,0 +1,73 @@
+# backfill_post_files.py (post_files 메타데이터 채우는 스크립트)
+# alembic a7d3e5f90b16 은 기존 posts.file_paths 를 post_files 행으로 옮기면서 경로/원래 파일명만 채움
+# 크기(size), sha256, content_type 은 디스크의 파일을 읽어야 해서 이 스크립트로 채움 (서버를 띄운 채로 실행해도 됨)
+# - 디스크에 없는 파일은 건너뜀 (값은 NULL 로 남음)
+#
+# 사용법: python backfill_post_files.py [--batch 500]
+
+import argparse
+import asyncio
+import mimetypes
+import os
+
+from sqlalchemy import select, update, bindparam, or_
+
+from app.database import AsyncSessionLocal
+from app.posts import posts_models, posts_storage
+
+
+def _metadata(row) -> dict | None:
+    # 파일 하나의 크기/sha256/content_type (스레드에서 실행)
+    try:
+        size = os.path.getsize(row.stored_key)
+        sha256 = row.sha256 or posts_storage.hash_file(row.stored_key)
+    except FileNotFoundError:
+        return None
+    content_type = row.content_type or mimetypes.guess_type(row.original_name)[0] or 'application/octet-stream'
+    return {'b_id': row.id, 'b_size': size, 'b_sha256': sha256, 'b_content_type': content_type}
+
+
+async def backfill(batch: int) -> dict:
+    post_file = posts_models.PostFile
+    done = {'updated': 0, 'missing': 0}
+    last_id = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            rows = (await db.execute(
+                select(post_file.id, post_file.stored_key, post_file.original_name,
+                       post_file.content_type, post_file.sha256)
+                .where(post_file.id > last_id,
+                       or_(post_file.size.is_(None), post_file.sha256.is_(None), post_file.content_type.is_(None)))
+                .order_by(post_file.id)
+                .limit(batch)
+            )).all()
+            if not rows:
+                return done
+            last_id = rows[-1].id
+
+            values = [await asyncio.to_thread(_metadata, row) for row in rows]
+            found = [v for v in values if v is not None]
+            done['missing'] += len(values) - len(found)
+            if found:
+                # executemany UPDATE 한 번으로 (batch 단위 커밋)
+                await db.execute(
+                    update(post_file.__table__)
+                    .where(post_file.__table__.c.id == bindparam('b_id'))
+                    .values(size=bindparam('b_size'), sha256=bindparam('b_sha256'),
+                            content_type=bindparam('b_content_type')),
+                    found,
+                )
+                await db.commit()
+                done['updated'] += len(found)
+            print(done)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='post_files 의 size/sha256/content_type 채우기')
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+    print(asyncio.run(backfill(args.batch)))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,25 +2,61 @@
 # FastAPI 서버의 기본 진입점
 
 
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app import db_routing, sql_instrumentation
+from app.database import AsyncSessionLocal, engine
+from app.categories import categories_cache
+from app.reports import reports_refresh
 
 from app.users.auth import router as auth_router
 from app.users.protected import router as protected_router
 from app.posts.posts import router as post_router
 from app.progress.progress import router as progress_router
 from app.progress_detail_roro.progress_detail_roro import router as progress_detail_router
+from app.progress_detail_roro.progress_detail_roro import ledger_router as roro_ledger_router
 from app.replies.replies import router as reply_router
 from app.categories.region_categories.region_categories import router as region_category_router
 from app.categories.type_categories.type_categories import router as type_category_router
+from app.reports.reports import router as reports_router
 
 # 아래 코드: models.py의 모든 모델을 실제 DB 테이블로 생성 / 비동기에선 쓰지 않음
 # models.Base.metadata.create_all(bind=engine)
 
 
+logger = logging.getLogger(__name__)
+
+
+# 서버 시작/종료 시 실행할 작업
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 카테고리 캐시 미리 적재 (실패해도 첫 조회 때 다시 적재하므로 서버는 그대로 띄움)
+    try:
+        async with AsyncSessionLocal() as db:
+            await categories_cache.warm(db)
+    except Exception:
+        logger.exception('카테고리 캐시 적재 실패')
+
+    # 대시보드 집계 뷰 주기적 갱신 (여러 워커가 떠 있어도 advisory lock 으로 한 곳에서만 갱신)
+    refresh_task = None
+    if reports_refresh.REPORTS_REFRESH_SECONDS > 0:
+        refresh_task = asyncio.create_task(reports_refresh.run_scheduler(engine))
+    yield
+    if refresh_task is not None:
+        refresh_task.cancel()
+        try:
+            await refresh_task
+        except asyncio.CancelledError:
+            pass
+
+
 # FastAPI 인스턴스 생성
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(auth_router)
 app.include_router(protected_router)
 
@@ -28,12 +64,21 @@ app.include_router(post_router)
 
 app.include_router(progress_router)
 app.include_router(progress_detail_router)
+app.include_router(roro_ledger_router)
 
 app.include_router(reply_router)
 app.include_router(type_category_router)
 app.include_router(region_category_router)
 
+app.include_router(reports_router)
+
+
+
+# 쓰기 성공 후 잠시 동안 조회를 primary 로 고정 (read-your-writes)
+app.middleware('http')(db_routing.read_your_writes_middleware)
 
+# 요청별 SQL 개수/DB 시간을 Server-Timing 헤더와 로그로 남김 (N+1 의심 쿼리 경고)
+app.middleware('http')(sql_instrumentation.sql_stats_middleware)
 
 # CORS 설정 (프론트엔드 호스트와 연결)
 app.add_middleware(
@@ -42,6 +87,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # 모든 HTTP 메서드 허용
     allow_headers=["*"],  # 모든 헤더 허용
+    expose_headers=["Server-Timing", "ETag"],  # 프론트엔드에서 응답 헤더를 읽을 수 있도록 (ETag → 수정 시 If-Match)
 )
 
 
@@ -0,0 +1,51 @@
+# migrate_public_to_objects.py (기존 첨부파일을 content-addressed 저장소로 옮기는 스크립트)
+# public/ 바로 아래의 기존 파일을 public/objects/ 의 객체 하드링크로 바꿈 (app/posts/posts_storage.py 참고)
+# - 경로(post_files.stored_key)는 그대로라서 DB 수정 없음, 서버를 띄운 채로 실행해도 됨
+# - 같은 내용의 파일이 여러 개면 하나만 남고 나머지는 그 파일의 하드링크가 됨 (디스크 절약)
+#
+# 사용법: python migrate_public_to_objects.py [--dry-run] [--gc]
+#   --dry-run  바꾸지 않고 중복 현황만 출력
+#   --gc       참조가 없는 객체와 오래된 임시파일도 정리
+
+import argparse
+import os
+from collections import defaultdict
+
+from app.posts import posts_storage
+
+
+def scan():
+    for entry in os.scandir(posts_storage.UPLOAD_DIR):
+        if entry.is_file(follow_symlinks=False) and not entry.name.startswith('.'):
+            yield entry.path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='public/ 첨부파일을 content-addressed 저장소로 옮김')
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--gc', action='store_true')
+    args = parser.parse_args()
+
+    if args.dry_run:
+        groups = defaultdict(list)
+        for path in scan():
+            groups[posts_storage.hash_file(path)].append(path)
+        duplicated = sum(len(paths) - 1 for paths in groups.values())
+        saved = sum(os.path.getsize(paths[0]) * (len(paths) - 1) for paths in groups.values())
+        print(f'files={sum(map(len, groups.values()))} unique={len(groups)} duplicated={duplicated} saved_bytes={saved}')
+        return
+
+    files = deduplicated = saved = 0
+    for path in scan():
+        files += 1
+        if posts_storage.adopt(path):
+            deduplicated += 1
+            saved += os.path.getsize(path)
+    print(f'files={files} deduplicated={deduplicated} saved_bytes={saved}')
+
+    if args.gc:
+        print(posts_storage.collect_garbage())
+
+
+if __name__ == '__main__':
+    main()
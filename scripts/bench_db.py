@@ -0,0 +1,70 @@
+# scripts/bench_db.py (벤치마크 스크립트 공통 - 임시 스키마 DB)
+# BENCH_DATABASE_URL(없으면 DATABASE_URL) 의 DB 에 bench_{pid} 스키마를 만들고 그 안에 테이블을 만들어서 측정
+# → 기존 테이블/데이터는 건드리지 않음, 끝나면 스키마째 삭제 (운영 DB 대신 개발/테스트 DB 에서 실행할 것)
+
+import contextlib
+import os
+import statistics
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base, DatabaseSettings
+# create_all 이 모든 테이블을 만들도록 모델 등록 (alembic/env.py 와 같은 목록)
+from app.users import users_models  # noqa: F401
+from app.posts import posts_models  # noqa: F401
+from app.progress import progress_models  # noqa: F401
+from app.progress_detail_roro import progress_detail_roro_models  # noqa: F401
+from app.replies import replies_models  # noqa: F401
+from app.categories.type_categories import type_categories_models  # noqa: F401
+from app.categories.region_categories import region_categories_models  # noqa: F401
+
+load_dotenv()
+
+
+def database_url() -> str:
+    return os.getenv('BENCH_DATABASE_URL') or DatabaseSettings.from_env().url
+
+
+@contextlib.asynccontextmanager
+async def scratch_engine(pool_size: int = 5):
+    # search_path 를 임시 스키마로 - 앱 코드의 쿼리(스키마 이름 없음)가 그대로 임시 테이블을 씀
+    url = database_url()
+    schema = f'bench_{os.getpid()}'
+    admin = create_async_engine(url, poolclass=NullPool)
+    async with admin.begin() as conn:
+        await conn.execute(text(f'CREATE SCHEMA {schema}'))
+    engine = create_async_engine(
+        url,
+        pool_size=pool_size,
+        connect_args={'server_settings': {'search_path': f'{schema},public'}},  # 확장(pg_trgm 등)은 public 에서
+    )
+    try:
+        async with engine.begin() as conn:
+            # checkfirst=False: public 에 같은 이름의 테이블이 있어도 임시 스키마에 새로 만듦
+            await conn.run_sync(Base.metadata.create_all, checkfirst=False)
+        yield engine
+    finally:
+        await engine.dispose()
+        async with admin.begin() as conn:
+            await conn.execute(text(f'DROP SCHEMA {schema} CASCADE'))
+        await admin.dispose()
+
+
+async def timed(call, repeat: int) -> tuple[float, float]:
+    # (중앙값 ms, 최소 ms) - 첫 실행(캐시/플랜 준비)은 버림
+    await call()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), min(samples)
+
+
+async def analyze(engine: AsyncEngine):
+    async with engine.begin() as conn:
+        await conn.execute(text('ANALYZE'))
@@ -0,0 +1,132 @@
+# scripts/bench_posts_listing.py (게시글 목록 조회 벤치마크)
+# GET /posts 한 페이지를 예전 방식(ORM Post 객체 + selectinload 로 작성자/카테고리/카테고리 작성자/첨부파일 하이드레이션,
+# PostOut 을 만들고 응답 모델에서 다시 검증)과 지금 방식(PostsServices._list_posts - _post_out_query() JOIN 1번 +
+# 카테고리 캐시 + 첨부파일 IN 조회, Row → dict)으로 비교
+# - 페이지 크기(기본 10/50/200)마다 시간(중앙값/최소 ms)과 tracemalloc 메모리(최대 peak / 응답을 들고 있는 동안 남은 alloc)
+# - 요청마다 새 세션 (identity map 재사용 없음), 두 방식 모두 count(*) 포함, 마지막에 PostsPageOut 으로 검증
+#
+# 사용법: BENCH_DATABASE_URL=postgresql+asyncpg://... python -m scripts.bench_posts_listing [--posts 20000] [--sizes 10 50 200] [--repeat 20]
+
+import argparse
+import asyncio
+import tracemalloc
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from app.categories import categories_cache
+from app.categories.region_categories import region_categories_models
+from app.categories.type_categories import type_categories_models
+from app.posts import posts_models, posts_schemas
+from app.posts.posts_services import PostsServices
+from scripts.bench_db import analyze, scratch_engine, timed
+
+# 사용자 50, 타입/지역 카테고리 각 10, 게시글의 1/3 에 첨부파일 1~2개
+SEED = [
+    """
+    INSERT INTO users (id, username, email, hashed_password, role)
+    SELECT i, 'user' || i, 'user' || i || '@example.com', 'x', 'user' FROM generate_series(1, 50) i
+    """,
+    "INSERT INTO type_categories (id, title, creator_id) SELECT i, 'type' || i, i FROM generate_series(1, 10) i",
+    "INSERT INTO region_categories (id, title, creator_id) SELECT i, 'region' || i, i FROM generate_series(1, 10) i",
+    """
+    INSERT INTO posts (id, title, description, created_at, version, type_category_id, region_category_id, creator_id)
+    SELECT i, 'post ' || i, repeat('description ', 20), timestamp '2024-01-01' + i * interval '1 minute', 1,
+           i % 10 + 1, i % 7 + 1, i % 50 + 1
+    FROM generate_series(1, :posts) i
+    """,
+    """
+    INSERT INTO post_files (post_id, ordinal, original_name, stored_key, size, content_type, sha256, created_at)
+    SELECT p, o, 'file' || p || '_' || o || '.pdf', 'public/' || md5(p || '-' || o) || '.pdf', 1024 * (p % 500 + 1),
+           'application/pdf', md5(p || ':' || o) || md5(o || ':' || p), timestamp '2024-01-01'
+    FROM generate_series(1, :posts) p, generate_series(0, 1) o
+    WHERE p % 3 = 0 AND (o = 0 OR p % 2 = 0)
+    """,
+]
+
+
+async def selectinload_page(db, size: int) -> dict:
+    # 예전 _list_posts (비교용 - ORM 객체 하이드레이션 + PostOut 생성)
+    Post = posts_models.Post
+    result = await db.execute(
+        select(Post)
+        .order_by(Post.created_at.desc(), Post.id.desc())
+        .limit(size)
+        .options(
+            selectinload(Post.creator),
+            selectinload(Post.type_category).selectinload(type_categories_models.TypeCategory.creator),
+            selectinload(Post.region_category).selectinload(region_categories_models.RegionCategory.creator),
+            selectinload(Post.files),
+        )
+    )
+    posts = result.scalars().all()
+    items = [
+        posts_schemas.PostOut.model_validate({
+            'id': p.id,
+            'title': p.title,
+            'description': p.description,
+            'version': p.version,
+            'files': p.files,
+            'file_paths': [f.stored_key for f in p.files] or None,
+            'created_at': p.created_at,
+            'updated_at': p.updated_at,
+            'creator': p.creator,
+            'type_category': p.type_category,
+            'region_category': p.region_category,
+        }, from_attributes=True)
+        for p in posts
+    ]
+    total = await db.scalar(select(func.count()).select_from(Post))
+    return {'items': items, 'total': total, 'page': 1, 'size': size, 'total_pages': -(-total // size)}
+
+
+async def projection_page(db, size: int) -> dict:
+    return await PostsServices(db).list_posts(size=size)
+
+
+async def run_case(sessions, size: int, repeat: int, list_page) -> tuple[float, float, int, int]:
+    async def once():
+        async with sessions() as db:
+            return posts_schemas.PostsPageOut.model_validate(await list_page(db, size))  # response_model 검증까지
+
+    median, best = await timed(once, repeat)
+
+    # 메모리는 시간과 따로 한 번 측정 (tracemalloc 이 켜져 있으면 느려지므로)
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        page = await once()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(page.items) == size
+    return median, best, peak - before, current - before
+
+
+async def main(posts: int, sizes: list[int], repeat: int):
+    async with scratch_engine() as engine:
+        async with engine.begin() as conn:
+            for statement in SEED:
+                await conn.execute(text(statement), {'posts': posts} if ':posts' in statement else {})
+        await analyze(engine)
+        sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+        # 다른 DB(스키마)의 카테고리가 남아 있지 않도록 - 첫 요청에서 임시 스키마의 카테고리로 적재됨
+        categories_cache.type_categories.invalidate()
+        categories_cache.region_categories.invalidate()
+
+        print(f'{"size":>5} {"method":<12} {"median ms":>10} {"best ms":>9} {"peak KB":>9} {"alloc KB":>9}')
+        for size in sizes:
+            for name, list_page in (('selectinload', selectinload_page), ('projection', projection_page)):
+                median, best, peak, allocated = await run_case(sessions, size, repeat, list_page)
+                print(f'{size:>5} {name:<12} {median:>10.2f} {best:>9.2f} {peak / 1024:>9.1f} {allocated / 1024:>9.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--posts', type=int, default=20000)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.posts, args.sizes, args.repeat))
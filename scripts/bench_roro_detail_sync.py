@@ -0,0 +1,114 @@
+# scripts/bench_roro_detail_sync.py (RoRo 디테일 동기화 벤치마크)
+# patch_progress_roro 의 디테일(차량) 동기화를 예전 방식(행마다 UPDATE / add / session.delete)과
+# 지금 방식(ProgressRoRoServices._sync_details - DELETE 1 + executemany UPDATE 1 + multi-row INSERT 1)으로 비교
+# - 디테일 N 행(기본 10/100/1000)인 부킹에서 80% 수정, 20% 삭제, 새 행 20% 추가 (한 번의 PATCH)
+# - 문장 수는 app.sql_instrumentation 으로, 시간은 부킹마다 새로 만든 데이터로 측정 (트랜잭션은 롤백)
+#
+# 사용법: BENCH_DATABASE_URL=postgresql+asyncpg://... python -m scripts.bench_roro_detail_sync [--rows 10 100 1000] [--repeat 20]
+
+import argparse
+import asyncio
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app import sql_instrumentation
+from app.progress_detail_roro import progress_detail_roro_models, progress_detail_roro_schemas
+from app.progress_detail_roro.progress_detail_roro_services import ProgressRoRoServices
+from scripts.bench_db import scratch_engine, timed
+
+Detail = progress_detail_roro_models.ProgressRoRoDetail
+
+
+async def per_row_sync(db, progress_roro_id: int, incoming):
+    # 예전 patch_progress_roro 의 디테일 동기화 (비교용으로 그대로 옮김)
+    incoming_ids = set()
+    new_details = []
+    for detail in incoming:
+        if detail.id:
+            await db.execute(update(Detail).where(Detail.id == detail.id).values(**detail.model_dump(exclude_unset=True)))
+            incoming_ids.add(detail.id)
+        else:
+            new_detail = Detail(**detail.model_dump(exclude_unset=True), progress_detail_roro_id=progress_roro_id)
+            db.add(new_detail)
+            new_details.append(new_detail)
+    db_details = await db.execute(select(Detail).where(Detail.progress_detail_roro_id == progress_roro_id))
+    new_ids = {id(d) for d in new_details}
+    for db_detail in db_details.scalars().all():
+        if db_detail.id not in incoming_ids and id(db_detail) not in new_ids:
+            await db.delete(db_detail)
+    await db.flush()
+
+
+def payload(existing_ids: list[int]):
+    # 80% 유지(값 수정), 20% 삭제, 기존 수의 20% 만큼 새 행
+    keep = existing_ids[: len(existing_ids) * 4 // 5]
+    details = [
+        progress_detail_roro_schemas.ProgressDetailRoRoDetailUpdate(
+            id=detail_id, MODEL='K5', CHASSISNo=f'KNA{detail_id:08d}', EL=True, HBL='HBL-2')
+        for detail_id in keep
+    ]
+    details += [
+        progress_detail_roro_schemas.ProgressDetailRoRoDetailUpdate(
+            MODEL='SORENTO', CHASSISNo=f'NEW{n:08d}', EL=False, HBL='HBL-2')
+        for n in range(max(1, len(existing_ids) // 5))
+    ]
+    return details
+
+
+async def run_case(sessions, rows: int, repeat: int, sync) -> tuple[float, float, int]:
+    statements = []
+
+    async def once():
+        async with sessions() as db:
+            roro_id = await db.scalar(
+                insert(progress_detail_roro_models.ProgressRoRo).values(BKNo='BENCH').returning(
+                    progress_detail_roro_models.ProgressRoRo.id))
+            ids = list((await db.scalars(
+                insert(Detail).values([
+                    {'progress_detail_roro_id': roro_id, 'MODEL': 'K5', 'CHASSISNo': f'KNA{n:08d}', 'EL': False,
+                     'HBL': 'HBL-1'}
+                    for n in range(rows)
+                ]).returning(Detail.id)
+            )).all())
+            incoming = payload(ids)
+
+            stats = sql_instrumentation.RequestSqlStats()
+            token = sql_instrumentation._current.set(stats)
+            try:
+                await sync(db, roro_id, incoming)
+            finally:
+                sql_instrumentation._current.reset(token)
+            statements.append(stats.count)
+            await db.rollback()
+
+    median, best = await timed(once, repeat)  # 데이터 준비 시간도 포함되므로 두 방식의 차이를 볼 것
+    return median, best, statements[-1]
+
+
+async def main(rows_list: list[int], repeat: int):
+    async with scratch_engine() as engine:
+        sql_instrumentation.instrument(engine)
+        sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+        async def set_based(db, roro_id, incoming):
+            await ProgressRoRoServices(db)._sync_details(roro_id, incoming)
+
+        # 데이터 준비(INSERT)만 한 기준 시간 - 위 두 방식의 시간에서 빼서 동기화 자체의 시간을 봄
+        async def setup_only(db, roro_id, incoming):
+            return None
+
+        print(f'{"rows":>6} {"method":<10} {"statements":>10} {"median ms":>10} {"best ms":>9}')
+        for rows in rows_list:
+            base, _, _ = await run_case(sessions, rows, repeat, setup_only)
+            for name, sync in (('per-row', per_row_sync), ('set-based', set_based)):
+                median, best, count = await run_case(sessions, rows, repeat, sync)
+                print(f'{rows:>6} {name:<10} {count:>10} {median - base:>10.1f} {best - base:>9.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,105 @@
+# scripts/bench_roro_summary.py (RoRo 집계 뷰 벤치마크)
+# 대시보드 집계를 progress_detail_roro 에서 매번 직접 계산(live)하는 것과
+# 집계 materialized view(roro_summary, alembic e4c9a7d2b813)에서 읽는 것, 그리고 뷰 갱신(REFRESH ... CONCURRENTLY) 비용을 비교
+# - 뷰는 마이그레이션의 upgrade() 를 그대로 실행해서 만듦 (정의를 여기에 따로 적지 않음)
+# - 조회 예: 최근 12개월 월별 합계 (ReportsServices.roro_summary(group_by=['month'], ...))
+# - 손익분기: 갱신 1번 비용 / (live - view) = 갱신 주기(REPORTS_REFRESH_SECONDS) 동안 이만큼 조회되면 뷰가 이득
+#
+# 사용법: BENCH_DATABASE_URL=postgresql+asyncpg://... python -m scripts.bench_roro_summary [--bookings 200000] [--repeat 20]
+
+import argparse
+import asyncio
+import importlib.util
+import time
+from datetime import datetime
+from pathlib import Path
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.progress_detail_roro import progress_detail_roro_models
+from app.reports import reports_refresh, reports_services
+from scripts.bench_db import analyze, scratch_engine, timed
+
+VIEW_MIGRATION = Path(__file__).resolve().parent.parent / 'alembic' / 'versions' / 'e4c9a7d2b813_roro_summary_view.py'
+MONTH_FROM, MONTH_TO = '2025-01', '2025-12'
+
+# 거래처/도착지/화주 조합이 실제 장부처럼 반복되도록 (partner 30, destination 20, shipper 300, ETD 3년)
+SEED = """
+    INSERT INTO progress_detail_roro
+        ("BKNo", "PARTNER", "DESTINATION", "SHIPPER", "ETD",
+         "SMALL", "S_SUV", "SUV", "RV_CARGO", "SPECIAL", "CBM", "SELL", "RATE", "PROFIT_USD", "PROFIT_KRW", version)
+    SELECT 'BK' || i, 'partner' || i % 30, 'destination' || i % 20, 'shipper' || i % 300,
+           CASE WHEN i % 50 = 0 THEN NULL ELSE timestamp '2024-01-01' + (i % 1095) * interval '1 day' END,
+           i % 5, i % 3, i % 4, i % 2, i % 7 / 6, (i % 40) * 1.5, 1000 + i % 9000, 1300 + i % 100,
+           i % 700 - 100, (i % 700 - 100) * 1350.0, 1
+    FROM generate_series(1, :bookings) i
+"""
+
+
+def _create_summary_view(sync_conn):
+    # alembic 마이그레이션 파일의 upgrade() 를 이 커넥션에서 실행
+    spec = importlib.util.spec_from_file_location('roro_summary_view', VIEW_MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with Operations.context(MigrationContext.configure(sync_conn)):
+        migration.upgrade()
+
+
+def live_summary():
+    # 뷰 없이 같은 결과를 원본 테이블에서 매번 집계 (ETD 범위로 거르므로 ix_progress_detail_roro_etd_id 를 쓸 수 있음)
+    roro = progress_detail_roro_models.ProgressRoRo
+    month = func.to_char(roro.ETD, 'YYYY-MM').label('month')
+    return (
+        select(
+            month,
+            func.count().label('bookings'),
+            *(func.coalesce(func.sum(getattr(roro, c.upper())), 0).label(c.upper())
+              for c in reports_services.SUMMARY_SUM_COLUMNS),
+        )
+        .where(roro.ETD >= datetime(2025, 1, 1), roro.ETD < datetime(2026, 1, 1))
+        .group_by(month)
+        .order_by(month)
+    )
+
+
+async def main(bookings: int, repeat: int):
+    async with scratch_engine() as engine:
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            await conn.execute(text(SEED), {'bookings': bookings})
+            await conn.run_sync(_create_summary_view)
+        await analyze(engine)
+        print(f'bookings {bookings}, 준비 {time.perf_counter() - started:.1f}s')
+
+        sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+        async with sessions() as db:
+            live_rows = (await db.execute(live_summary())).all()
+            view_rows = (await reports_services.ReportsServices(db).roro_summary(
+                ['month'], month_from=MONTH_FROM, month_to=MONTH_TO))['rows']
+            assert [(r.month, r.bookings) for r in live_rows] == [(r['month'], r['bookings']) for r in view_rows]
+
+            live_ms, live_best = await timed(lambda: db.execute(live_summary()), repeat)
+            view_ms, view_best = await timed(
+                lambda: reports_services.ReportsServices(db).roro_summary(
+                    ['month'], month_from=MONTH_FROM, month_to=MONTH_TO),
+                repeat,
+            )
+        refresh_ms, refresh_best = await timed(lambda: reports_refresh.refresh_view(engine, 'roro_summary'), max(3, repeat // 4))
+
+        print(f'{"":<28} {"median ms":>10} {"best ms":>9}')
+        print(f'{"live (progress_detail_roro)":<28} {live_ms:>10.1f} {live_best:>9.1f}')
+        print(f'{"view (roro_summary)":<28} {view_ms:>10.1f} {view_best:>9.1f}')
+        print(f'{"REFRESH ... CONCURRENTLY":<28} {refresh_ms:>10.1f} {refresh_best:>9.1f}')
+        if live_ms > view_ms:
+            print(f'손익분기: 갱신 주기마다 조회 {refresh_ms / (live_ms - view_ms):.1f} 번 이상이면 뷰가 이득')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bookings', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.bookings, args.repeat))
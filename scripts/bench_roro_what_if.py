@@ -0,0 +1,102 @@
+# scripts/bench_roro_what_if.py (RoRo what-if 분석 벤치마크)
+# POST /reports/roro/what-if 의 서비스 호출(ReportsServices.roro_what_if)을 부킹 N 건(기본 10만)에서 측정
+# - 전체(array_agg 1행 읽기 + 배열 변환 + 계산)와 계산만(reports_analytics.what_if, 이미 만든 배열)을 나눠서 출력
+# - ProgressRoRo ORM 객체가 하나도 만들어지지 않는지(load 이벤트 0번)와 tracemalloc 최대 메모리도 확인
+# - 가정값 예: RATE=1350 고정, BUY_SUV 5% 인상, group_by 는 [month] 와 [PARTNER, month]
+#
+# 사용법: BENCH_DATABASE_URL=postgresql+asyncpg://... python -m scripts.bench_roro_what_if [--bookings 100000] [--repeat 10]
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+import numpy as np
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.progress_detail_roro import progress_detail_roro_models
+from app.progress_detail_roro.progress_detail_roro_profit import PROFIT_FIELDS
+from app.reports import reports_analytics, reports_schemas
+from app.reports.reports_services import ReportsServices
+from scripts.bench_db import analyze, scratch_engine, timed
+
+# 공식에 쓰이는 컬럼을 모두 채움 (일부는 NULL, RATE 0 도 섞음), 거래처 30 / 도착지 20 / ETD 3년
+SEED = """
+    INSERT INTO progress_detail_roro
+        ("BKNo", "PARTNER", "DESTINATION", "ETD",
+         "SMALL", "BUY_SMALL", "S_SUV", "BUY_S_SUV", "SUV", "BUY_SUV", "RV_CARGO", "BUY_RV_CARGO",
+         "SPECIAL", "BUY_SPECIAL", "CBM", "BUY_CBM", "SELL", "HC", "WFG", "SECURITY", "CARRIER",
+         "PARTNER_FEE", "OTHER", "RATE", version)
+    SELECT 'BK' || i, CASE WHEN i % 97 = 0 THEN NULL ELSE 'partner' || i % 30 END, 'destination' || i % 20,
+           CASE WHEN i % 50 = 0 THEN NULL ELSE timestamp '2024-01-01' + (i % 1095) * interval '1 day' END,
+           i % 5, 300 + i % 50, i % 3, 450 + i % 70, i % 4, 600 + i % 90, i % 2, 800, i % 7 / 6, 1200,
+           (i % 40) * 1.5, 35, 1000 + i % 9000, 30000, 15000, CASE WHEN i % 11 = 0 THEN NULL ELSE 5000 END, 20000,
+           i % 3 * 10, i % 100, CASE WHEN i % 200 = 0 THEN 0 ELSE 1300 + i % 100 END, 1
+    FROM generate_series(1, :bookings) i
+"""
+
+CASES = [
+    reports_schemas.WhatIfRequest(group_by=['month'], values={'RATE': 1350}, multipliers={'BUY_SUV': 1.05}),
+    reports_schemas.WhatIfRequest(group_by=['PARTNER', 'month'], values={'RATE': 1350}, multipliers={'BUY_SUV': 1.05}),
+]
+
+
+def random_arrays(size: int, keys: list[str]):
+    # 계산만 측정할 때 쓰는 같은 크기의 배열 (DB 를 거치지 않음)
+    rng = np.random.default_rng(1)
+    columns = {f: rng.uniform(0, 2000, size) for f in PROFIT_FIELDS}
+    labels = {'PARTNER': [f'partner{i}' for i in range(30)] + [''], 'DESTINATION': [f'destination{i}' for i in range(20)],
+              'month': [f'{y}-{m:02d}' for y in (2024, 2025, 2026) for m in range(1, 13)] + ['']}
+    return columns, {k: rng.choice(np.array(labels[k], dtype=str), size) for k in keys}
+
+
+async def main(bookings: int, repeat: int):
+    loads = 0
+
+    def count_load(target, context):
+        nonlocal loads
+        loads += 1
+
+    event.listen(progress_detail_roro_models.ProgressRoRo, 'load', count_load)
+
+    async with scratch_engine() as engine:
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            await conn.execute(text(SEED), {'bookings': bookings})
+        await analyze(engine)
+        print(f'bookings {bookings}, 준비 {time.perf_counter() - started:.1f}s')
+
+        sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+        print(f'{"group_by":<16} {"groups":>6} {"total ms":>9} {"best ms":>8} {"compute ms":>10} {"peak MB":>8} {"ORM rows":>8}')
+        for payload in CASES:
+            async with sessions() as db:
+                loads = 0
+                result = await ReportsServices(db).roro_what_if(payload)
+                assert result['bookings'] == bookings
+                median, best = await timed(lambda: ReportsServices(db).roro_what_if(payload), repeat)
+
+                tracemalloc.start()
+                try:
+                    await ReportsServices(db).roro_what_if(payload)
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+
+            columns, keys = random_arrays(bookings, payload.group_by)
+
+            async def compute():
+                reports_analytics.what_if(columns, keys, payload.values, payload.multipliers)
+
+            compute_ms, _ = await timed(compute, repeat)
+            name = ','.join(payload.group_by)
+            print(f'{name:<16} {len(result["groups"]):>6} {median:>9.1f} {best:>8.1f} {compute_ms:>10.1f} '
+                  f'{peak / 2**20:>8.1f} {loads:>8}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bookings', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.bookings, args.repeat))
@@ -0,0 +1,157 @@
+# scripts/bench_uploads.py (첨부파일 업로드 벤치마크)
+# 예전 업로드 방식과 지금 방식(posts_uploads.receive_upload)의 처리량과, 업로드 중 이벤트 루프 지연을 비교
+# - spooled: File()/UploadFile 로 받은 뒤(Starlette 가 임시파일에 먼저 씀) shutil.copyfileobj 로 이벤트 루프에서 저장 (예전 create_post)
+# - streaming: 본문 청크를 바로 저장소 임시파일에 쓰고 sha256 계산, 쓰기/해시는 스레드에서 (posts_uploads)
+# - 서버는 실제 uvicorn 을 별도 프로세스로 띄우고(클라이언트가 GIL 을 잡아서 생기는 지연이 섞이지 않도록),
+#   서버 이벤트 루프에서 10ms 마다 깨어나는 작업이 늦어진 시간을 기록 → 업로드 중 다른 요청(목록 조회 등)이 기다려야 하는 시간
+# - 저장 위치는 임시 폴더 (public/ 은 건드리지 않음), 파일 내용은 요청마다 달라서 중복 제거가 일어나지 않음
+#
+# 사용법: python -m scripts.bench_uploads [--size-mb 64] [--concurrency 4] [--rounds 3]
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import shutil
+import socket
+import statistics
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, File, Request, UploadFile
+
+from app.posts import posts_storage, posts_uploads
+
+PROBE_SECONDS = 0.01
+
+
+def build_app(upload_dir: str) -> FastAPI:
+    lags: list[float] = []
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        async def probe():
+            # 깨어나야 할 시각보다 늦어진 만큼이 이벤트 루프가 막혀 있던 시간
+            while True:
+                expected = time.perf_counter() + PROBE_SECONDS
+                await asyncio.sleep(PROBE_SECONDS)
+                lags.append(time.perf_counter() - expected)
+
+        task = asyncio.create_task(probe())
+        yield
+        task.cancel()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.post('/spooled')
+    async def spooled(files: list[UploadFile] = File(...)):
+        # 예전 create_post 의 저장 코드
+        for file in files:
+            saved_path = os.path.join(upload_dir, f'{uuid.uuid4()}_{file.filename}')
+            with open(saved_path, 'wb') as buffer:
+                shutil.copyfileobj(file.file, buffer)
+        return {}
+
+    @app.post('/streaming')
+    async def streaming(request: Request):
+        await posts_uploads.receive_upload(request, 'files')
+        return {}
+
+    @app.post('/_lags')
+    async def take_lags():
+        # 지난 호출 이후 기록된 지연 (초)
+        taken = lags[:]
+        lags.clear()
+        return taken
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run_path(client: httpx.AsyncClient, path: str, payload: bytes, concurrency: int, rounds: int,
+                   upload_dir: str) -> dict:
+    async def upload(content: bytes, n: int):
+        response = await client.post(path, files={'files': (f'bl_scan_{n}.pdf', content, 'application/pdf')})
+        response.raise_for_status()
+
+    seconds, window = [], []
+    for r in range(rounds):
+        # 앞부분만 바꿔서 요청마다 다른 내용 (sha256 중복 제거 방지)
+        contents = [f'{path}-{r}-{i}-{uuid.uuid4()}'.encode().ljust(64, b'-') + payload for i in range(concurrency)]
+        await client.post('/_lags')
+        started = time.perf_counter()
+        await asyncio.gather(*(upload(content, i) for i, content in enumerate(contents)))
+        seconds.append(time.perf_counter() - started)
+        window += (await client.post('/_lags')).json()
+        await asyncio.to_thread(_clear, upload_dir)
+    megabytes = len(payload) * concurrency / (1024 * 1024)
+    return {
+        'mb_per_s': megabytes / statistics.median(seconds),
+        'lag_p50': percentile(window, 0.5) * 1000,
+        'lag_p99': percentile(window, 0.99) * 1000,
+        'lag_max': max(window) * 1000,
+    }
+
+
+def _clear(upload_dir: str):
+    # 라운드마다 받은 파일 삭제 (디스크 사용량 제한)
+    for root, _, files in os.walk(upload_dir):
+        for name in files:
+            os.remove(os.path.join(root, name))
+
+
+async def main(size_mb: int, concurrency: int, rounds: int):
+    upload_dir = tempfile.mkdtemp(prefix='bench_uploads_')
+    posts_storage.UPLOAD_DIR = upload_dir
+    posts_storage.OBJECTS_DIR = os.path.join(upload_dir, 'objects')
+    posts_storage.TMP_DIR = os.path.join(posts_storage.OBJECTS_DIR, 'tmp')
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(build_app(upload_dir), port=port, log_level='warning'))
+    process = multiprocessing.get_context('fork').Process(target=server.run, daemon=True)  # 저장 위치 설정을 그대로 물려받음
+    process.start()
+
+    payload = os.urandom(size_mb * 1024 * 1024)
+    try:
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', timeout=None) as client:
+            while True:
+                try:
+                    await client.post('/_lags')
+                    break
+                except httpx.ConnectError:
+                    await asyncio.sleep(0.05)
+            await asyncio.sleep(0.5)  # 대기 상태의 지연 기준값
+            idle = (await client.post('/_lags')).json()
+            print(f'{size_mb}MB x {concurrency} 동시 업로드, {rounds} 라운드 (대기 중 루프 지연 p99 {percentile(idle, 0.99) * 1000:.1f}ms)')
+            print(f'{"path":<10} {"MB/s":>8} {"lag p50 ms":>11} {"lag p99 ms":>11} {"lag max ms":>11}')
+            for path in ('/spooled', '/streaming'):
+                result = await run_path(client, path, payload, concurrency, rounds, upload_dir)
+                print(f'{path.strip("/"):<10} {result["mb_per_s"]:>8.1f} {result["lag_p50"]:>11.1f} '
+                      f'{result["lag_p99"]:>11.1f} {result["lag_max"]:>11.1f}')
+    finally:
+        process.terminate()
+        process.join()
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.size_mb, args.concurrency, args.rounds))
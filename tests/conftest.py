@@ -0,0 +1,78 @@
+# tests/conftest.py
+# 공통 fixture
+# - storage: 첨부파일 저장소를 임시 폴더로
+# - db / db_engine: TEST_DATABASE_URL(postgresql+asyncpg://...) 이 있을 때만, 없으면 DB 테스트는 건너뜀
+#   (테스트 시작 시 그 DB 의 테이블을 전부 지우고 create_all 로 다시 만듦 - 운영/개발 DB 를 지정하지 말 것)
+
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.categories import categories_cache
+from app.posts import posts_storage
+# create_all 이 모든 테이블을 만들도록 모델 등록 (alembic/env.py 와 같은 목록)
+from app.users import users_models  # noqa: F401
+from app.posts import posts_models  # noqa: F401
+from app.progress import progress_models  # noqa: F401
+from app.progress_detail_roro import progress_detail_roro_models  # noqa: F401
+from app.replies import replies_models  # noqa: F401
+from app.categories.type_categories import type_categories_models  # noqa: F401
+from app.categories.region_categories import region_categories_models  # noqa: F401
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    # 첨부파일 저장소(public/, public/objects/)를 테스트 임시 폴더로
+    upload_dir = tmp_path / 'public'
+    upload_dir.mkdir()
+    monkeypatch.setattr(posts_storage, 'UPLOAD_DIR', str(upload_dir))
+    monkeypatch.setattr(posts_storage, 'OBJECTS_DIR', str(upload_dir / 'objects'))
+    monkeypatch.setattr(posts_storage, 'TMP_DIR', str(upload_dir / 'objects' / 'tmp'))
+    return upload_dir
+
+
+@pytest.fixture(scope='session')
+def database_url():
+    if not TEST_DATABASE_URL:
+        pytest.skip('TEST_DATABASE_URL 이 없어서 DB 테스트는 건너뜀')
+
+    async def recreate():
+        engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+    asyncio.run(recreate())
+    return TEST_DATABASE_URL
+
+
+@pytest.fixture
+async def db_engine(database_url):
+    # 테스트마다 새 엔진 (테스트마다 이벤트 루프가 달라서 커넥션을 재사용하지 않음), 시작할 때 모든 테이블 비움
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    tables = ', '.join(table.name for table in Base.metadata.sorted_tables)
+    async with engine.begin() as conn:
+        await conn.execute(text(f'TRUNCATE {tables} RESTART IDENTITY CASCADE'))
+    categories_cache.type_categories.invalidate()
+    categories_cache.region_categories.invalidate()
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(db_engine):
+    async with async_sessionmaker(bind=db_engine, expire_on_commit=False)() as session:
+        yield session
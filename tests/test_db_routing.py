@@ -0,0 +1,53 @@
+# tests/test_db_routing.py
+# read-your-writes 쿠키 - 쓰기가 성공하면 primary 로 고정, read_only 라우터/실패한 요청/조회는 고정하지 않음
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app import database, db_routing
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(database, 'replica_engine', object())  # 복제본이 있는 것처럼 (연결은 하지 않음)
+
+    app = FastAPI()
+    app.middleware('http')(db_routing.read_your_writes_middleware)
+
+    @app.get('/items')
+    async def list_items():
+        return []
+
+    @app.post('/items')
+    async def create_item():
+        return {}
+
+    @app.post('/items/fail')
+    async def create_item_fail():
+        raise HTTPException(status_code=400)
+
+    @app.post('/items/preview', dependencies=[Depends(db_routing.read_only)])
+    async def preview_items():
+        return {}
+
+    return TestClient(app)
+
+
+def pinned(response) -> bool:
+    return db_routing.READ_PRIMARY_COOKIE in response.cookies
+
+
+def test_successful_write_pins_to_primary(client):
+    assert pinned(client.post('/items'))
+
+
+def test_read_failed_write_and_read_only_post_do_not_pin(client):
+    assert not pinned(client.get('/items'))
+    assert not pinned(client.post('/items/fail'))
+    assert not pinned(client.post('/items/preview'))
+
+
+def test_no_replica_never_pins(client, monkeypatch):
+    monkeypatch.setattr(database, 'replica_engine', None)
+    assert not pinned(client.post('/items'))
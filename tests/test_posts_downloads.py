@@ -0,0 +1,221 @@
+# tests/test_posts_downloads.py
+# 첨부파일 다운로드 - 조건부 GET(304) / Range(206, 이어받기, 여러 구간, 416) / 리버스 프록시 전송(offload)
+
+import hashlib
+import inspect
+import threading
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from starlette import responses
+from starlette.datastructures import Headers
+
+from app.posts import posts_downloads
+
+CONTENT = bytes(range(256)) * 40  # 10240 바이트
+
+
+@pytest.fixture
+def stored(storage):
+    path = storage / 'invoice.pdf'
+    path.write_bytes(CONTENT)
+    return SimpleNamespace(
+        original_name='invoice.pdf',
+        stored_key=str(path),
+        content_type='application/pdf',
+        sha256=hashlib.sha256(CONTENT).hexdigest(),
+        created_at=datetime(2024, 5, 1, 9, 30),
+    )
+
+
+@pytest.fixture
+def client(stored):
+    app = FastAPI()
+
+    @app.api_route('/download', methods=['GET', 'HEAD'])
+    async def download(request: Request):
+        return await posts_downloads.attachment_response(stored, Path(stored.stored_key), request.headers)
+
+    return TestClient(app)
+
+
+def test_full_download_has_validators(client, stored):
+    response = client.get('/download')
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers['etag'] == f'"{stored.sha256}"'
+    assert response.headers['last-modified'] == 'Wed, 01 May 2024 09:30:00 GMT'
+    assert response.headers['cache-control'] == posts_downloads.CACHE_IMMUTABLE
+    assert response.headers['accept-ranges'] == 'bytes'
+    assert response.headers['content-disposition'] == 'attachment; filename="invoice.pdf"'
+
+
+@pytest.mark.parametrize('headers', [
+    {'If-None-Match': 'W/"other", "{sha256}"'},
+    {'If-None-Match': '*'},
+    {'If-Modified-Since': 'Wed, 01 May 2024 09:30:00 GMT'},
+])
+def test_not_modified(client, stored, headers):
+    headers = {name: value.format(sha256=stored.sha256) for name, value in headers.items()}
+
+    response = client.get('/download', headers=headers)
+
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['etag'] == f'"{stored.sha256}"'
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since(client):
+    response = client.get('/download', headers={
+        'If-None-Match': '"other"',
+        'If-Modified-Since': 'Wed, 01 May 2024 09:30:00 GMT',
+    })
+
+    assert response.status_code == 200
+
+
+def test_not_modified_does_not_need_the_file(client, stored):
+    Path(stored.stored_key).unlink()
+
+    assert client.get('/download', headers={'If-None-Match': f'"{stored.sha256}"'}).status_code == 304
+    assert client.get('/download').status_code == 404
+
+
+def test_single_range(client):
+    response = client.get('/download', headers={'Range': 'bytes=100-199'})
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[100:200]
+    assert response.headers['content-range'] == f'bytes 100-199/{len(CONTENT)}'
+    assert response.headers['content-type'] == 'application/pdf'
+
+
+def test_resume_with_matching_if_range(client, stored):
+    response = client.get('/download', headers={'Range': 'bytes=4096-', 'If-Range': f'"{stored.sha256}"'})
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[4096:]
+
+
+def test_resume_with_changed_if_range_sends_whole_file(client):
+    response = client.get('/download', headers={'Range': 'bytes=4096-', 'If-Range': '"changed"'})
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_multiple_ranges(client):
+    response = client.get('/download', headers={'Range': 'bytes=0-9, 5000-5009'})
+
+    assert response.status_code == 206
+    content_type = response.headers['content-type']
+    assert content_type.startswith('multipart/byteranges; boundary=')
+    assert 'content-range' not in response.headers  # boundary 가 Content-Range 에 들어가지 않음
+    boundary = content_type.split('boundary=')[1]
+    assert response.content == (
+        f'--{boundary}\r\nContent-Type: application/pdf\r\nContent-Range: bytes 0-9/{len(CONTENT)}\r\n\r\n'.encode()
+        + CONTENT[0:10]
+        + f'\r\n--{boundary}\r\nContent-Type: application/pdf\r\nContent-Range: bytes 5000-5009/{len(CONTENT)}\r\n\r\n'.encode()
+        + CONTENT[5000:5010]
+        + f'\r\n--{boundary}--\r\n'.encode()
+    )
+    assert int(response.headers['content-length']) == len(response.content)
+
+
+def test_multiple_ranges_head(client):
+    response = client.head('/download', headers={'Range': 'bytes=0-9, 5000-5009'})
+
+    assert response.status_code == 206
+    assert response.content == b''
+    assert response.headers['content-type'].startswith('multipart/byteranges; boundary=')
+    assert int(response.headers['content-length']) == len(client.get('/download', headers={'Range': 'bytes=0-9, 5000-5009'}).content)
+
+
+def test_range_not_satisfiable(client):
+    response = client.get('/download', headers={'Range': f'bytes={len(CONTENT)}-'})
+
+    assert response.status_code == 416
+    assert response.headers['content-range'].endswith(f'*/{len(CONTENT)}')
+
+
+def test_head_sends_headers_only(client):
+    response = client.head('/download')
+
+    assert response.status_code == 200
+    assert response.content == b''
+    assert response.headers['content-length'] == str(len(CONTENT))
+
+
+@pytest.mark.anyio
+async def test_file_check_runs_off_the_event_loop(stored):
+    checked_in = []
+
+    class MissingPath:
+        def exists(self):
+            checked_in.append(threading.current_thread())
+            return False
+
+    with pytest.raises(HTTPException) as error:
+        await posts_downloads.attachment_response(stored, MissingPath(), Headers())
+
+    assert error.value.status_code == 404
+    assert checked_in and checked_in[0] is not threading.main_thread()
+
+
+@pytest.mark.parametrize('method', ['GET', 'HEAD'])
+def test_x_accel_redirect(client, stored, monkeypatch, method):
+    monkeypatch.setattr(posts_downloads, 'DOWNLOAD_OFFLOAD', posts_downloads.OFFLOAD_X_ACCEL_REDIRECT)
+
+    response = client.request(method, '/download', headers={'Range': 'bytes=0-9'})
+
+    assert response.status_code == 200  # Range 는 nginx 가 처리
+    assert response.content == b''
+    assert response.headers['x-accel-redirect'] == '/protected/invoice.pdf'
+    assert 'x-sendfile' not in response.headers
+    assert response.headers['content-type'] == 'application/pdf'
+    assert response.headers['content-disposition'] == 'attachment; filename="invoice.pdf"'
+    assert response.headers['cache-control'] == posts_downloads.CACHE_IMMUTABLE
+    assert 'etag' not in response.headers and 'content-length' not in response.headers
+
+
+def test_x_sendfile(client, stored, monkeypatch):
+    monkeypatch.setattr(posts_downloads, 'DOWNLOAD_OFFLOAD', posts_downloads.OFFLOAD_X_SENDFILE)
+
+    response = client.get('/download')
+
+    assert response.status_code == 200
+    assert response.content == b''
+    assert response.headers['x-sendfile'] == stored.stored_key
+    assert 'x-accel-redirect' not in response.headers
+    assert response.headers['content-disposition'] == 'attachment; filename="invoice.pdf"'
+
+
+def test_offload_quotes_non_ascii_paths(storage, monkeypatch):
+    path = storage / '선적 서류.pdf'
+
+    monkeypatch.setattr(posts_downloads, 'DOWNLOAD_OFFLOAD', posts_downloads.OFFLOAD_X_ACCEL_REDIRECT)
+    assert posts_downloads.offload_headers(path) == {
+        'X-Accel-Redirect': '/protected/%EC%84%A0%EC%A0%81%20%EC%84%9C%EB%A5%98.pdf',
+    }
+    monkeypatch.setattr(posts_downloads, 'DOWNLOAD_OFFLOAD', posts_downloads.OFFLOAD_X_SENDFILE)
+    assert posts_downloads.offload_headers(path)['X-Sendfile'].endswith('/%EC%84%A0%EC%A0%81%20%EC%84%9C%EB%A5%98.pdf')
+
+
+@pytest.mark.parametrize('mode', [posts_downloads.OFFLOAD_X_ACCEL_REDIRECT, posts_downloads.OFFLOAD_X_SENDFILE])
+def test_offload_keeps_not_modified_and_missing_file(client, stored, monkeypatch, mode):
+    monkeypatch.setattr(posts_downloads, 'DOWNLOAD_OFFLOAD', mode)
+
+    assert client.get('/download', headers={'If-None-Match': f'"{stored.sha256}"'}).status_code == 304
+    Path(stored.stored_key).unlink()
+    assert client.get('/download').status_code == 404
+
+
+def test_multiple_ranges_override_matches_starlette():
+    # AttachmentFileResponse 가 감싸는 내부 메서드의 인자가 그대로인지 (import 시에도 확인함)
+    parameters = inspect.signature(responses.FileResponse._handle_multiple_ranges).parameters
+    assert list(parameters) == posts_downloads._MULTIPLE_RANGES_PARAMETERS
@@ -0,0 +1,126 @@
+# tests/test_posts_services.py
+# 게시글 서비스 (TEST_DATABASE_URL 이 있을 때만)
+# - 목록 조회의 SQL 개수는 페이지 크기와 상관없이 일정 (N+1 없음)
+# - 수정/삭제 - 첨부파일 정리 (DB 에 저장된 sha256 으로 저장소에서 지우므로 파일을 다시 읽지 않음)
+
+import os
+
+import pytest
+from sqlalchemy import text
+
+from app import sql_instrumentation
+from app.categories.region_categories import region_categories_models
+from app.categories.type_categories import type_categories_models
+from app.posts import posts_services, posts_storage, posts_uploads
+from app.users import users_models
+
+pytestmark = pytest.mark.anyio
+
+
+def store(content: bytes, filename: str) -> posts_uploads.StoredFile:
+    # 업로드와 같은 경로로 저장소에 등록 (임시파일 → 객체 + 하드링크)
+    temp_path = posts_storage.new_temp_path()
+    with open(temp_path, 'wb') as f:
+        f.write(content)
+    sha256 = posts_storage.hash_file(temp_path)
+    path = posts_storage.new_link_path(filename)
+    posts_storage.commit(temp_path, sha256, path)
+    return posts_uploads.StoredFile(path=path, filename=filename, size=len(content), sha256=sha256)
+
+
+@pytest.fixture
+async def author(db):
+    user = users_models.User(username='writer', email='writer@example.com', hashed_password='x')
+    db.add(user)
+    await db.flush()
+    db.add_all([
+        type_categories_models.TypeCategory(id=1, title='수출', creator_id=user.id),
+        region_categories_models.RegionCategory(id=1, title='중동', creator_id=user.id),
+    ])
+    await db.commit()
+    return user
+
+
+async def create(db, author, files):
+    return await posts_services.PostsServices(db).create_post(
+        author, title='B/L', description='첨부', type_category=1, region_category=1, files=files,
+    )
+
+
+async def test_delete_releases_objects_without_rehashing(db, author, storage, monkeypatch):
+    only = store(b'invoice', 'invoice.pdf')
+    shared = store(b'packing list', 'packing.pdf')
+    other_post = store(b'packing list', 'copy.pdf')  # 다른 글이 같은 내용을 참조
+    post = await create(db, author, [only, shared])
+    await create(db, author, [other_post])
+
+    monkeypatch.setattr(posts_storage, 'hash_file', lambda path: pytest.fail(f'{path} 를 다시 해시함'))
+    await posts_services.PostsServices(db).delete_post(author, post['id'])
+
+    assert not os.path.exists(only.path) and not os.path.exists(shared.path)
+    assert not os.path.exists(posts_storage.object_path(only.sha256))  # 마지막 참조 → 내용도 삭제
+    assert os.path.exists(posts_storage.object_path(shared.sha256))  # 다른 글이 참조 → 내용은 남음
+    assert os.stat(other_post.path).st_nlink == 2
+
+
+async def test_update_releases_dropped_files_without_rehashing(db, author, storage, monkeypatch):
+    kept = store(b'invoice', 'invoice.pdf')
+    dropped = store(b'old scan', 'scan.pdf')
+    post = await create(db, author, [kept, dropped])
+
+    monkeypatch.setattr(posts_storage, 'hash_file', lambda path: pytest.fail(f'{path} 를 다시 해시함'))
+    updated = await posts_services.PostsServices(db).update_post(
+        author, post['id'], title='B/L', description='첨부', type_category=1, region_category=1,
+        keep_file_paths=[kept.path], new_file_paths=[],
+    )
+
+    assert updated['file_paths'] == [kept.path]
+    assert os.path.exists(kept.path)
+    assert not os.path.exists(dropped.path)
+    assert not os.path.exists(posts_storage.object_path(dropped.sha256))
+
+
+@pytest.fixture
+def sql_stats(db_engine):
+    sql_instrumentation.instrument(db_engine)
+
+
+async def count_statements(call):
+    # 요청 미들웨어처럼 현재 컨텍스트에 통계를 걸고 그 동안 실행된 SQL 을 셈
+    stats = sql_instrumentation.RequestSqlStats()
+    token = sql_instrumentation._current.set(stats)
+    try:
+        return await call(), stats
+    finally:
+        sql_instrumentation._current.reset(token)
+
+
+@pytest.mark.parametrize('count', ['exact', 'none'])
+async def test_listing_statement_count_does_not_grow_with_page_size(db, author, sql_stats, count):
+    # 작성자 여럿, 글마다 첨부파일 2개 - 작성자/카테고리/파일을 글마다 따로 조회하면 페이지 크기만큼 SQL 이 늘어남
+    await db.execute(text(
+        "INSERT INTO users (id, username, email, hashed_password)"
+        " SELECT i, 'user' || i, 'user' || i || '@example.com', 'x' FROM generate_series(100, 119) i"
+    ))
+    await db.execute(text(
+        "INSERT INTO posts (title, description, created_at, creator_id, type_category_id, region_category_id)"
+        " SELECT 'post ' || i, 'description', timestamp '2024-01-01' + i * interval '1 minute', 100 + i % 20, 1, 1"
+        " FROM generate_series(1, 60) i"
+    ))
+    await db.execute(text(
+        "INSERT INTO post_files (post_id, ordinal, original_name, stored_key)"
+        " SELECT p.id, n, 'file' || n || '.pdf', 'public/' || p.id || '_' || n FROM posts p, generate_series(0, 1) n"
+    ))
+    await db.commit()
+    service = posts_services.PostsServices(db)
+    await service.list_posts(size=1, count=count)  # 카테고리 캐시 적재 (서버 시작 후 한 번)
+
+    _, small = await count_statements(lambda: service.list_posts(size=5, count=count))
+    page, large = await count_statements(lambda: service.list_posts(size=50, count=count))
+    _, keyset = await count_statements(lambda: service.list_posts(size=50, count=count, cursor=page['next_cursor']))
+
+    assert len(page['items']) == 50 and all(len(item['files']) == 2 for item in page['items'])
+
+    assert small.count == large.count == keyset.count
+    assert small.count <= 3  # 목록(JOIN) + 첨부파일(IN) + count
+    assert large.suspected_n_plus_one() == []
@@ -0,0 +1,110 @@
+# tests/test_posts_uploads.py
+# multipart 스트리밍 업로드 - 저장/중복 제거/크기 제한/검증 실패 시 정리
+
+import hashlib
+import os
+import threading
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.posts import posts_schemas, posts_storage, posts_uploads
+
+
+@pytest.fixture
+def client(storage):
+    app = FastAPI()
+
+    @app.post('/posts')
+    async def create_post(request: Request):
+        upload = await posts_uploads.receive_upload(request, 'files')
+        form = await posts_uploads.validate_form(upload, posts_schemas.PostCreateForm)
+        return {
+            'title': form.title,
+            'files': [
+                {'path': f.path, 'filename': f.filename, 'size': f.size, 'sha256': f.sha256,
+                 'content_type': f.content_type, 'deduplicated': f.deduplicated}
+                for f in upload.files
+            ],
+        }
+
+    return TestClient(app)
+
+
+FORM = {'title': '인보이스', 'description': '3월', 'type_category': '1', 'region_category': '2'}
+
+
+def stored_files(storage) -> list[str]:
+    return sorted(entry.name for entry in os.scandir(storage) if entry.is_file())
+
+
+def test_streams_files_into_the_store(client, storage):
+    data = os.urandom(300_000)
+    response = client.post('/posts', data=FORM, files=[
+        ('files', ('scan.pdf', data, 'application/pdf')),
+        ('files', ('copy.pdf', data, 'application/pdf')),
+        ('ignored', ('other.txt', b'x', 'text/plain')),  # 받지 않는 이름의 파일
+    ])
+
+    assert response.status_code == 200, response.text
+    first, second = response.json()['files']
+    assert first['filename'] == 'scan.pdf' and first['content_type'] == 'application/pdf'
+    assert first['size'] == len(data)
+    assert first['sha256'] == hashlib.sha256(data).hexdigest()
+    assert (first['deduplicated'], second['deduplicated']) == (False, True)
+    # 두 경로가 같은 객체의 하드링크 (객체 1 + 경로 2)
+    assert os.stat(first['path']).st_nlink == 3
+    assert os.stat(first['path']).st_ino == os.stat(posts_storage.object_path(first['sha256'])).st_ino
+    assert os.listdir(posts_storage.TMP_DIR) == []
+
+
+def test_invalid_form_removes_saved_files_off_the_event_loop(client, storage, monkeypatch):
+    threads = []
+    remove_files = posts_uploads.remove_files
+
+    def recording_remove_files(files):
+        threads.append(threading.current_thread())
+        remove_files(files)
+
+    monkeypatch.setattr(posts_uploads, 'remove_files', recording_remove_files)
+    response = client.post('/posts', data={**FORM, 'type_category': 'abc'}, files=[
+        ('files', ('scan.pdf', b'%PDF-1.7', 'application/pdf')),
+    ])
+
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['loc'] == ['body', 'type_category']
+    assert len(threads) == 1 and threads[0] is not threading.main_thread()
+    assert threads[0] is not threading.current_thread()  # TestClient 의 이벤트 루프 스레드도 아님
+    assert stored_files(storage) == []
+    assert [name for _, _, names in os.walk(posts_storage.OBJECTS_DIR) for name in names] == []
+
+
+def test_file_over_limit_is_rejected_and_removed(client, storage, monkeypatch):
+    monkeypatch.setattr(posts_uploads, 'UPLOAD_MAX_FILE_BYTES', 1000)
+    response = client.post('/posts', data=FORM, files=[('files', ('big.bin', b'x' * 5000, 'application/octet-stream'))])
+
+    assert response.status_code == 413
+    assert response.json()['detail'] == posts_uploads.ERROR_FILE_TOO_LARGE
+    assert stored_files(storage) == []
+    assert os.listdir(posts_storage.TMP_DIR) == []
+
+
+def test_request_over_limit_is_rejected_before_reading(client, storage, monkeypatch):
+    monkeypatch.setattr(posts_uploads, 'UPLOAD_MAX_REQUEST_BYTES', 100)
+    response = client.post('/posts', data=FORM, files=[('files', ('a.bin', b'x' * 500, 'application/octet-stream'))])
+
+    assert response.status_code == 413
+    assert response.json()['detail'] == posts_uploads.ERROR_REQUEST_TOO_LARGE
+    assert stored_files(storage) == []
+
+
+def test_truncated_body_is_rejected(client, storage):
+    body = (
+        b'--xyz\r\nContent-Disposition: form-data; name="files"; filename="a.txt"\r\n'
+        b'Content-Type: text/plain\r\n\r\nhello'
+    )
+    response = client.post('/posts', content=body, headers={'Content-Type': 'multipart/form-data; boundary=xyz'})
+
+    assert response.status_code == 400
+    assert stored_files(storage) == []
@@ -0,0 +1,120 @@
+# tests/test_progress_detail_roro_profit.py
+# NumPy 로 한 번에 계산한 이익이 예전 부킹 하나씩 계산하던 공식과 같은지 확인
+
+import math
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from app.progress_detail_roro import progress_detail_roro_profit as profit
+
+
+def scalar_profit(item, rate=...):
+    # 벡터화 이전의 부킹 하나씩 계산하던 공식 (비어 있는 값은 0, RATE 가 0/None 이면 USD 는 None)
+    def value(name):
+        return getattr(item, name) or 0
+
+    rate = value('RATE') if rate is ... else (rate or 0)
+    buy = (
+        value('SMALL') * value('BUY_SMALL')
+        + value('S_SUV') * value('BUY_S_SUV')
+        + value('SUV') * value('BUY_SUV')
+        + value('RV_CARGO') * value('BUY_RV_CARGO')
+        + value('SPECIAL') * value('BUY_SPECIAL')
+        + value('CBM') * value('BUY_CBM')
+    )
+    other = value('HC') + value('WFG') + value('SECURITY') + value('CARRIER') + value('PARTNER_FEE') * rate
+    margin = value('SELL') - buy
+    usd = margin + (other // rate) - value('OTHER') if rate else None
+    krw = margin * rate + other + value('OTHER')
+    return usd, krw
+
+
+def booking(**values):
+    return SimpleNamespace(**{field: values.get(field) for field in profit.PROFIT_FIELDS})
+
+
+def random_booking(rng: random.Random):
+    def pick():
+        kind = rng.random()
+        if kind < 0.15:
+            return None
+        if kind < 0.25:
+            return 0
+        if kind < 0.55:
+            return rng.randint(-50, 5000)
+        return round(rng.uniform(-1000, 100000), rng.choice((0, 1, 2, 3)))
+
+    values = {field: pick() for field in profit.PROFIT_FIELDS}
+    values['RATE'] = rng.choice((None, 0, 0.0, 1, 1300, 1385.5, 1392.37, rng.uniform(900, 1500)))
+    return booking(**values)
+
+
+def assert_same(actual, expected):
+    usd, krw = actual
+    expected_usd, expected_krw = expected
+    if expected_usd is None:
+        assert usd is None
+    else:
+        assert usd == pytest.approx(expected_usd, rel=1e-12, abs=1e-9)
+    assert krw == pytest.approx(expected_krw, rel=1e-12, abs=1e-9)
+
+
+def test_matches_scalar_formula_on_mixed_inputs():
+    rng = random.Random(20240501)
+    items = [random_booking(rng) for _ in range(2000)]
+
+    results = profit.compute_profits(items)
+
+    assert len(results) == len(items)
+    for item, result in zip(items, results):
+        assert_same(result, scalar_profit(item))
+
+
+def test_matches_scalar_formula_with_rate_override():
+    rng = random.Random(7)
+    items = [random_booking(rng) for _ in range(500)]
+    rates = [rng.choice((None, 0, 1300, 1401.25)) for _ in items]
+
+    results = profit.compute_profits(items, rates=rates)
+
+    for item, rate, result in zip(items, rates, results):
+        assert_same(result, scalar_profit(item, rate))
+
+
+@pytest.mark.parametrize('rate', [None, 0, 0.0])
+def test_empty_or_zero_rate_keeps_krw(rate):
+    item = booking(SMALL=2, BUY_SMALL=500, SELL=1500, HC=30000, OTHER=100, RATE=rate)
+
+    usd, krw = profit.compute_profits([item])[0]
+
+    assert usd is None
+    assert krw == 30000 + 100  # margin * RATE(0) + 기타 + OTHER
+
+
+def test_floor_division_rounds_toward_negative_infinity():
+    # 기타(원화) // RATE 는 파이썬 // 처럼 내림 (음수도 0 쪽이 아니라 아래로)
+    positive = booking(HC=2999, RATE=1000)
+    negative = booking(HC=-2999, RATE=1000)
+    fractional = booking(HC=1000.5, WFG=0.1, SECURITY=0.2, RATE=0.3)
+
+    results = profit.compute_profits([positive, negative, fractional])
+
+    assert results[0][0] == 2
+    assert results[1][0] == -3
+    assert results[2][0] == scalar_profit(fractional)[0]
+
+
+def test_no_items():
+    assert profit.compute_profits([]) == []
+
+
+def test_profit_arrays_marks_zero_rate_as_nan():
+    items = [booking(SELL=10, RATE=0), booking(SELL=10, RATE=2)]
+
+    usd, krw = profit.profit_arrays(profit.columns_from_rows(items))
+
+    assert math.isnan(usd[0])
+    assert usd[1] == 10
+    assert krw.tolist() == [0, 20]
@@ -0,0 +1,139 @@
+# tests/test_query_plans.py
+# 목록/하위 행 조회가 복합 인덱스를 타는지 EXPLAIN (FORMAT JSON) 으로 확인 (TEST_DATABASE_URL 이 있을 때만)
+# - 데이터를 넉넉히 넣고 ANALYZE 한 뒤 실제 서비스가 만드는 쿼리 모양 그대로 실행 계획을 봄
+# - 인덱스를 지우거나 쿼리의 WHERE/ORDER BY 를 바꿔서 인덱스를 못 타게 되면 실패
+
+from datetime import date
+
+import pytest
+from sqlalchemy import select, text
+
+from app.posts import posts_models, posts_services
+from app.progress_detail_roro import progress_detail_roro_models, progress_detail_roro_schemas
+from app.progress_detail_roro.progress_detail_roro_services import ProgressRoRoServices
+from app.replies import replies_models
+
+pytestmark = pytest.mark.anyio
+
+INDEX_SCANS = ('Index Scan', 'Index Only Scan', 'Bitmap Index Scan')  # 몇 행만 찾는 조회는 bitmap 도 정상
+
+SEED = [
+    "INSERT INTO users (id, username, email, hashed_password, role)"
+    " SELECT i, 'user' || i, 'user' || i || '@example.com', 'x', 'staff' FROM generate_series(1, 50) i",
+    "INSERT INTO type_categories (id, title) SELECT i, 'type' || i FROM generate_series(1, 40) i",
+    "INSERT INTO region_categories (id, title) SELECT i, 'region' || i FROM generate_series(1, 40) i",
+    "INSERT INTO posts (id, title, description, created_at, creator_id, type_category_id, region_category_id)"
+    " SELECT i, 'post ' || i, 'description ' || i, timestamp '2024-01-01' + i * interval '1 minute',"
+    " i % 50 + 1, i % 40 + 1, (i / 7) % 40 + 1 FROM generate_series(1, 5000) i",
+    "INSERT INTO replies (description, created_at, creator_id, post_id)"
+    " SELECT 'reply ' || i, timestamp '2024-01-01' + i * interval '1 minute', i % 50 + 1, i % 500 + 1"
+    " FROM generate_series(1, 5000) i",
+    "INSERT INTO progress (id, title) SELECT i, 'progress ' || i FROM generate_series(1, 500) i",
+    # 장부: 생성 순서와 출항일(ETD, 3년)은 따로 움직이고, 파트너 30곳, LINE 은 선사 400곳 중 하나
+    "INSERT INTO progress_detail_roro (id, progress_id, created_at, \"ETD\", \"PARTNER\", \"LINE\")"
+    " SELECT i, i % 500 + 1, timestamp '2024-01-01' + i * interval '1 minute',"
+    " timestamp '2023-01-01' + (i * 7 % 1095) * interval '1 day', 'partner' || i % 30, ARRAY['line' || i % 400]"
+    " FROM generate_series(1, 20000) i",
+    "INSERT INTO progress_detail_roro_detail (progress_detail_roro_id, \"MODEL\")"
+    " SELECT i % 5000 + 1, 'model' FROM generate_series(1, 15000) i",
+    "ANALYZE",
+]
+
+
+@pytest.fixture
+async def seeded(db):
+    for statement in SEED:
+        await db.execute(text(statement))
+    await db.commit()
+    return db
+
+
+def index_scans(plan: dict) -> set[str]:
+    # 실행 계획 트리에서 인덱스를 쓴 노드의 인덱스 이름
+    found = set()
+    if plan.get('Node Type') in INDEX_SCANS:
+        found.add(plan['Index Name'])
+    for child in plan.get('Plans', []):
+        found |= index_scans(child)
+    return found
+
+
+async def explain(db, statement) -> set[str]:
+    # 앱과 같은 드라이버(asyncpg)로 컴파일해서 파라미터도 앱처럼 바인딩 ($1::VARCHAR[] 등 타입이 같아야 같은 계획)
+    conn = await db.connection()
+    compiled = statement.compile(dialect=conn.dialect, compile_kwargs={'render_postcompile': True})  # IN (...) 펼침
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    plan = (await conn.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {compiled}', params)).scalar()
+    return index_scans(plan[0]['Plan'])
+
+
+def latest_posts(*filters):
+    # 게시글 목록 (PostsServices._list_posts 의 첫 페이지와 같은 모양)
+    post = posts_models.Post
+    return (
+        posts_services._post_out_query()
+        .where(*filters)
+        .order_by(post.created_at.desc(), post.id.desc())
+        .limit(11)
+    )
+
+
+@pytest.mark.parametrize('filters, index', [
+    ((), 'ix_posts_created_at_id'),
+    ((posts_models.Post.creator_id == 7,), 'ix_posts_creator_id_created_at_id'),
+    ((posts_models.Post.type_category_id == 3,), 'ix_posts_type_category_id_created_at_id'),
+    ((posts_models.Post.region_category_id == 5,), 'ix_posts_region_category_id_created_at_id'),
+])
+async def test_post_listing_uses_composite_index(seeded, filters, index):
+    assert index in await explain(seeded, latest_posts(*filters))
+
+
+async def test_reply_listing_uses_composite_index(seeded):
+    reply = replies_models.Reply
+    statement = (
+        select(reply)
+        .where(reply.post_id == 42)
+        .order_by(reply.created_at.desc(), reply.id.desc())
+        .limit(11)
+    )
+
+    assert 'ix_replies_post_id_created_at_id' in await explain(seeded, statement)
+
+
+async def test_roro_by_progress_uses_index(seeded):
+    roro = progress_detail_roro_models.ProgressRoRo
+    statement = select(roro.id).where(roro.progress_id == 42).order_by(roro.id)
+
+    assert 'ix_progress_detail_roro_progress_id' in await explain(seeded, statement)
+
+
+async def test_roro_details_by_parent_use_index(seeded):
+    detail = progress_detail_roro_models.ProgressRoRoDetail
+    statement = select(detail.progress_detail_roro_id, detail.id).where(
+        detail.progress_detail_roro_id.in_([3, 42, 512]))
+
+    assert 'ix_progress_detail_roro_detail_progress_detail_roro_id' in await explain(seeded, statement)
+
+
+def ledger_page(sort: str = 'latest', **filters):
+    # 전체 부킹 장부 첫 페이지 (ProgressRoRoServices.list_roro_ledger 와 같은 조건/정렬)
+    roro = progress_detail_roro_models.ProgressRoRo
+    conditions = ProgressRoRoServices._ledger_filters(progress_detail_roro_schemas.RoRoLedgerFilters(**filters))
+    if sort == 'etd':
+        conditions.append(roro.ETD.is_not(None))
+    stmt, _, _ = ProgressRoRoServices._ledger_query(conditions, 50, None, sort, None)
+    return stmt
+
+
+@pytest.mark.parametrize('sort, filters, index', [
+    ('latest', {}, 'ix_progress_detail_roro_created_at_id'),
+    ('etd', {'etd_from': date(2024, 3, 1), 'etd_to': date(2024, 3, 31)}, 'ix_progress_detail_roro_etd_id'),
+    ('latest', {'partner': 'partner7', 'etd_from': date(2024, 3, 1), 'etd_to': date(2024, 3, 31)},
+     'ix_progress_detail_roro_partner_etd'),
+    ('latest', {'line': 'line42'}, 'ix_progress_detail_roro_line'),
+])
+async def test_roro_ledger_uses_index(seeded, sort, filters, index):
+    statement = ledger_page(sort, **filters)
+
+    assert index in await explain(seeded, statement)
+    assert (await seeded.execute(statement)).all()  # 앱과 같은 바인딩으로 실행도 됨 (LINE @> 등)
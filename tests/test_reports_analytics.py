@@ -0,0 +1,151 @@
+# tests/test_reports_analytics.py
+# NumPy 로 계산한 what-if 그룹 합계가 부킹 하나씩 파이썬으로 묶어서(groupby) 계산한 결과와 같은지 확인
+
+import random
+
+import numpy as np
+import pytest
+
+from app.progress_detail_roro.progress_detail_roro_profit import PROFIT_FIELDS
+from app.reports import reports_analytics
+from tests.test_progress_detail_roro_profit import random_booking, scalar_profit
+
+
+def to_arrays(items, keys: dict[str, list[str]]):
+    # 부킹 목록 → roro_what_if 가 DB 에서 만드는 것과 같은 배열 (숫자 None → 0, 키 NULL → '')
+    columns = {f: np.array([getattr(i, f) or 0 for i in items], dtype=np.float64) for f in PROFIT_FIELDS}
+    return columns, {name: np.array(values, dtype=str) for name, values in keys.items()}
+
+
+def scenario_booking(item, values: dict, multipliers: dict):
+    # 가정값을 부킹 하나에 적용 (배수 먼저, 고정값이 우선)
+    changed = {f: getattr(item, f) or 0 for f in PROFIT_FIELDS}
+    for field, multiplier in multipliers.items():
+        changed[field] *= multiplier
+    changed.update(values)
+    return type(item)(**changed)
+
+
+def reference_what_if(items, keys: dict[str, list[str]], values: dict, multipliers: dict) -> dict:
+    # 파이썬 dict 로 그룹을 묶는 기준 구현 (그룹 순서 = 키 값 튜플의 정렬 순서)
+    groups = {}
+    for row, item in enumerate(items):
+        group = groups.setdefault(tuple(keys[name][row] for name in keys), {
+            'bookings': 0, 'sell': 0.0, 'profit_usd': 0.0, 'profit_krw': 0.0,
+            'scenario_profit_usd': 0.0, 'scenario_profit_krw': 0.0, 'zero_rate': 0,
+        })
+        usd, krw = scalar_profit(item)
+        scenario_usd, scenario_krw = scalar_profit(scenario_booking(item, values, multipliers))
+        group['bookings'] += 1
+        group['sell'] += getattr(item, 'SELL') or 0
+        group['profit_usd'] += usd or 0
+        group['profit_krw'] += krw
+        group['scenario_profit_usd'] += scenario_usd or 0
+        group['scenario_profit_krw'] += scenario_krw
+        group['zero_rate'] += scenario_usd is None
+    return {
+        'bookings': len(items),
+        'groups': [
+            {
+                'key': {name: value or None for name, value in zip(keys, key)},
+                **group,
+                'delta_profit_usd': group['scenario_profit_usd'] - group['profit_usd'],
+                'delta_profit_krw': group['scenario_profit_krw'] - group['profit_krw'],
+            }
+            for key, group in sorted(groups.items())
+        ],
+    }
+
+
+def assert_same(actual: dict, expected: dict):
+    assert actual['bookings'] == expected['bookings']
+    assert [g['key'] for g in actual['groups']] == [g['key'] for g in expected['groups']]
+    for group, expected_group in zip(actual['groups'], expected['groups']):
+        for name, value in expected_group.items():
+            if name == 'key':
+                continue
+            assert group[name] == pytest.approx(value, rel=1e-9, abs=1e-6), name
+
+
+def random_keys(rng: random.Random, size: int) -> dict[str, list[str]]:
+    return {
+        'PARTNER': [rng.choice(('', 'partner1', 'partner2', 'partner3')) for _ in range(size)],
+        'month': [rng.choice(('', '2025-01', '2025-02', '2024-12')) for _ in range(size)],
+    }
+
+
+@pytest.mark.parametrize('group_by', [['month'], ['PARTNER', 'month'], ['month', 'PARTNER'], []])
+def test_what_if_matches_python_groupby(group_by):
+    rng = random.Random(20250301)
+    items = [random_booking(rng) for _ in range(1000)]
+    all_keys = random_keys(rng, len(items))
+    keys = {name: all_keys[name] for name in group_by}
+    values, multipliers = {'RATE': 1350}, {'BUY_SUV': 1.05, 'SELL': 0.9}
+
+    columns, key_arrays = to_arrays(items, keys)
+    result = reports_analytics.what_if(columns, key_arrays, values, multipliers)
+
+    assert_same(result, reference_what_if(items, keys, values, multipliers))
+
+
+def test_group_codes_multi_key_labels():
+    keys = {
+        'PARTNER': np.array(['b', 'a', '', 'b', 'a'], dtype=str),
+        'month': np.array(['2025-02', '2025-01', '2025-01', '2025-02', ''], dtype=str),
+    }
+
+    group_index, labels = reports_analytics.group_codes(keys, 5)
+
+    # 정렬된 (PARTNER, month) 조합 순서, '' 은 None
+    assert labels == [
+        {'PARTNER': None, 'month': '2025-01'},
+        {'PARTNER': 'a', 'month': None},
+        {'PARTNER': 'a', 'month': '2025-01'},
+        {'PARTNER': 'b', 'month': '2025-02'},
+    ]
+    assert group_index.tolist() == [3, 2, 0, 3, 1]
+
+
+def test_group_codes_without_keys_is_one_group():
+    group_index, labels = reports_analytics.group_codes({}, 3)
+
+    assert group_index.tolist() == [0, 0, 0]
+    assert labels == [{}]
+
+
+def test_apply_overrides_replaces_and_scales_without_touching_input():
+    columns = {'RATE': np.array([0.0, 1300.0]), 'BUY_SUV': np.array([10.0, 20.0]), 'SELL': np.array([1.0, 2.0])}
+
+    scenario = reports_analytics.apply_overrides(columns, {'RATE': 1350}, {'BUY_SUV': 1.5, 'RATE': 2})
+
+    assert scenario['RATE'].tolist() == [1350, 1350]  # 고정값이 배수보다 우선
+    assert scenario['BUY_SUV'].tolist() == [15, 30]
+    assert scenario['SELL'] is columns['SELL']  # 바뀌지 않는 컬럼은 공유
+    assert columns['RATE'].tolist() == [0, 1300] and columns['BUY_SUV'].tolist() == [10, 20]
+
+
+def test_zero_rate_counts_bookings_left_out_of_usd():
+    rng = random.Random(3)
+    items = [random_booking(rng) for _ in range(200)]
+    keys = {'PARTNER': [rng.choice(('p1', 'p2')) for _ in items]}
+    columns, key_arrays = to_arrays(items, keys)
+
+    unchanged = reports_analytics.what_if(columns, key_arrays, {}, {})
+    no_rate = reports_analytics.what_if(columns, key_arrays, {'RATE': 0}, {})
+
+    for group in unchanged['groups']:
+        partner = group['key']['PARTNER']
+        expected = sum(1 for item, p in zip(items, keys['PARTNER']) if p == partner and not item.RATE)
+        assert group['zero_rate'] == expected
+    for group in no_rate['groups']:
+        assert group['zero_rate'] == group['bookings']
+        assert group['scenario_profit_usd'] == 0
+    assert_same(no_rate, reference_what_if(items, keys, {'RATE': 0}, {}))
+
+
+@pytest.mark.parametrize('group_by', [['month'], ['PARTNER', 'month'], []])
+def test_empty_input(group_by):
+    columns = {f: np.array([], dtype=np.float64) for f in PROFIT_FIELDS}
+    keys = {name: np.array([], dtype=str) for name in group_by}
+
+    assert reports_analytics.what_if(columns, keys, {'RATE': 1350}, {'SELL': 1.1}) == {'bookings': 0, 'groups': []}
@@ -0,0 +1,48 @@
+# tests/test_sql_instrumentation.py
+# SQL 계측 - 실패한 SQL 이 있어도 다음 SQL 의 시간/개수가 어긋나지 않는지 (sqlite 동기 엔진으로 확인)
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import StaticPool
+
+from app import sql_instrumentation
+
+
+@pytest.fixture
+def engine():
+    sync_engine = create_engine('sqlite://', poolclass=StaticPool)  # 커넥션 하나를 계속 재사용 (풀과 같은 상황)
+    sql_instrumentation.instrument(SimpleNamespace(sync_engine=sync_engine))
+    yield sync_engine
+    sync_engine.dispose()
+
+
+@pytest.fixture
+def stats():
+    stats = sql_instrumentation.RequestSqlStats()
+    token = sql_instrumentation._current.set(stats)
+    yield stats
+    sql_instrumentation._current.reset(token)
+
+
+def test_records_each_statement(engine, stats):
+    with engine.connect() as conn:
+        for i in range(3):
+            conn.execute(text('SELECT :i'), {'i': i})
+
+    assert stats.count == 3
+    assert stats.total_seconds >= stats.slowest_seconds > 0
+
+
+def test_failed_statement_leaves_no_state_on_the_connection(engine, stats):
+    with engine.connect() as conn:
+        with pytest.raises(exc.OperationalError):
+            conn.execute(text('SELECT * FROM missing_table'))
+        conn.execute(text('SELECT 1'))
+        info = dict(conn.info)
+
+    assert stats.count == 1  # 실패한 SQL 은 기록하지 않음, 다음 SQL 은 정상 기록
+    assert stats.slowest_statement == 'SELECT 1'
+    assert not any('sql_started' in str(key) for key in info)
+